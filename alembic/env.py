@@ -8,7 +8,7 @@ from logging.config import fileConfig
 from alembic import context
 
 from app.config.settings import get_settings
-from app.db.database import postgres_client
+from app.db.database import get_postgres_client
 from sqlmodel import SQLModel
 from sqlalchemy import types
 
@@ -86,16 +86,27 @@ def run_migrations_online() -> None:
     #     poolclass=pool.NullPool,
     # )
 
+    # A connection passed in config.attributes (e.g. by the test suite, to
+    # migrate its template database) takes precedence over the app database
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        do_run_migrations(connection)
+        return
+
     # with connectable.connect() as connection:
-    with postgres_client.engine.connect() as connection:
-        context.configure(
-            connection=connection,
-            target_metadata=target_metadata,
-            render_item=render_item,
-        )
-
-        with context.begin_transaction():
-            context.run_migrations()
+    with get_postgres_client().engine.connect() as connection:
+        do_run_migrations(connection)
+
+
+def do_run_migrations(connection) -> None:
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        render_item=render_item,
+    )
+
+    with context.begin_transaction():
+        context.run_migrations()
 
 
 if context.is_offline_mode():
@@ -0,0 +1,41 @@
+"""Add (create_at, id) index for keyset pagination
+
+Revision ID: a1c3e5f7b9d2
+Revises: 366bca4c5cd9
+Create Date: 2026-10-18 09:12:31.402117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a1c3e5f7b9d2'
+down_revision: Union[str, Sequence[str], None] = '366bca4c5cd9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY cannot run inside a transaction and avoids locking writes
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_user_create_at_id',
+            'user',
+            ['create_at', 'id'],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_user_create_at_id',
+            table_name='user',
+            postgresql_concurrently=True,
+        )
@@ -0,0 +1,53 @@
+"""Add user token generation for access token revocation
+
+Revision ID: b7d4f2a9c1e3
+Revises: a1c3e5f7b9d2
+Create Date: 2026-10-18 14:05:12.518730
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7d4f2a9c1e3'
+down_revision: Union[str, Sequence[str], None] = 'a1c3e5f7b9d2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # A constant default is stored in the catalog: no table rewrite
+    op.add_column(
+        'user',
+        sa.Column('token_generation', sa.Integer(), server_default='0', nullable=False),
+    )
+    op.add_column(
+        'user',
+        sa.Column('tokens_revoked_at', sa.DateTime(timezone=True), nullable=True),
+    )
+    # Workers load the recent revocations at startup; only revoked users are indexed
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_user_tokens_revoked_at',
+            'user',
+            ['tokens_revoked_at'],
+            unique=False,
+            postgresql_where=sa.text('tokens_revoked_at IS NOT NULL'),
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_user_tokens_revoked_at',
+            table_name='user',
+            postgresql_concurrently=True,
+        )
+    op.drop_column('user', 'tokens_revoked_at')
+    op.drop_column('user', 'token_generation')
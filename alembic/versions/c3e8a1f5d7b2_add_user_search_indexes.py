@@ -0,0 +1,77 @@
+"""Add trigram and lower(email) indexes for user search
+
+Revision ID: c3e8a1f5d7b2
+Revises: b7d4f2a9c1e3
+Create Date: 2026-10-18 15:21:47.093812
+
+"""
+import logging
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3e8a1f5d7b2'
+down_revision: Union[str, Sequence[str], None] = 'b7d4f2a9c1e3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+logger = logging.getLogger('alembic.runtime.migration')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # pg_trgm ships with the contrib package, which some servers lack: search
+    # still works there, substring queries just scan the table
+    trigram = op.get_bind().execute(
+        sa.text("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+    ).scalar() is not None
+    if trigram:
+        op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    else:
+        logger.warning('pg_trgm is not available: skipping the trigram indexes')
+
+    with op.get_context().autocommit_block():
+        # Prefix matches and their order; the "C" collation makes LIKE 'abc%'
+        # a range scan whatever the database collation
+        op.create_index(
+            'ix_user_lower_email',
+            'user',
+            [sa.text('(lower(email) COLLATE "C")'), 'id'],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+        if trigram:
+            op.create_index(
+                'ix_user_email_trgm',
+                'user',
+                ['email'],
+                unique=False,
+                postgresql_using='gin',
+                postgresql_ops={'email': 'gin_trgm_ops'},
+                postgresql_concurrently=True,
+            )
+            op.create_index(
+                'ix_user_full_name_trgm',
+                'user',
+                ['full_name'],
+                unique=False,
+                postgresql_using='gin',
+                postgresql_ops={'full_name': 'gin_trgm_ops'},
+                postgresql_concurrently=True,
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # The pg_trgm extension is left installed: other objects may use it
+    with op.get_context().autocommit_block():
+        for name in ('ix_user_full_name_trgm', 'ix_user_email_trgm', 'ix_user_lower_email'):
+            op.drop_index(
+                name,
+                table_name='user',
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
@@ -0,0 +1,49 @@
+"""Include update_at in the (create_at, id) index for page versions
+
+Revision ID: d9f2b6c4e8a1
+Revises: c3e8a1f5d7b2
+Create Date: 2026-10-18 16:40:03.771209
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd9f2b6c4e8a1'
+down_revision: Union[str, Sequence[str], None] = 'c3e8a1f5d7b2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _replace_index(include: list[str]) -> None:
+    # Build the new index next to the old one, then swap names: pagination
+    # keeps an index to use the whole time
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_user_create_at_id_new',
+            'user',
+            ['create_at', 'id'],
+            unique=False,
+            postgresql_include=include,
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            'ix_user_create_at_id',
+            table_name='user',
+            postgresql_concurrently=True,
+        )
+    op.execute(sa.text('ALTER INDEX ix_user_create_at_id_new RENAME TO ix_user_create_at_id'))
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Conditional GETs compute a page's version from this index alone
+    _replace_index(['update_at'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    _replace_index([])
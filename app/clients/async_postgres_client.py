@@ -0,0 +1,178 @@
+from typing import AsyncGenerator, Sequence
+from contextlib import asynccontextmanager
+
+from sqlalchemy import Executable, Row, text
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.clients.pool import PoolConfig, PoolMonitor
+from app.clients.replicas import (
+    Replica,
+    ReplicaConfig,
+    ReplicaSet,
+    reads_use_primary,
+)
+
+
+class AsyncPostgresClient:
+    """
+    Asyncio PostgreSQL database client. Mirrors PostgresClient but runs on
+    psycopg's async driver, so awaiting the database does not hold a
+    threadpool worker.
+    """
+
+    def __init__(
+        self,
+        database_url: str,
+        echo: bool = False,
+        pool: PoolConfig | None = None,
+        replicas: ReplicaConfig | None = None,
+    ):
+        """
+        Initialize the async PostgreSQL client with a database connection.
+
+        Args:
+            database_url: PostgreSQL connection string (postgresql+psycopg://)
+            echo: If True, SQL statements will be logged (useful for debugging)
+            pool: Connection pool settings (default: PoolConfig())
+            replicas: Read replicas for read-only calls (default: none)
+        """
+        self.database_url = database_url
+        self.pool_config = pool or PoolConfig()
+        self.engine = create_async_engine(
+            database_url,
+            echo=echo,
+            **self.pool_config.engine_kwargs(is_async=True),
+        )
+        self.pool_monitor = PoolMonitor(self.engine.sync_engine, self.pool_config)
+
+        self.replicas: ReplicaSet | None = None
+        if replicas and replicas.urls:
+            members = []
+            for url in replicas.urls:
+                engine = create_async_engine(
+                    url, echo=echo, **self.pool_config.engine_kwargs(is_async=True)
+                )
+                members.append(
+                    Replica(
+                        engine=engine,
+                        name=ReplicaSet.display_name(url),
+                        url=url,
+                        monitor=PoolMonitor(engine.sync_engine, self.pool_config),
+                    )
+                )
+            self.replicas = ReplicaSet(members, replicas)
+
+    @property
+    def engines(self) -> list[AsyncEngine]:
+        """The primary engine followed by the replica engines."""
+        replicas = self.replicas.replicas if self.replicas else []
+        return [self.engine] + [replica.engine for replica in replicas]
+
+    async def read_engine(self) -> AsyncEngine:
+        """Engine for a read-only call, see PostgresClient.read_engine."""
+        if self.replicas is None or reads_use_primary():
+            return self.engine
+        self.replicas.start_probing()
+        replica = self.replicas.choose()
+        return replica.engine if replica is not None else self.engine
+
+    async def get_session(self) -> AsyncGenerator[AsyncSession, None]:
+        """
+        Create and yield an async database session.
+
+        Yields:
+            AsyncSession: SQLModel async session for database operations
+        """
+        async with AsyncSession(self.engine, expire_on_commit=False) as session:
+            yield session
+
+    @asynccontextmanager
+    async def get_session_context(
+        self, read_only: bool = False
+    ) -> AsyncGenerator[AsyncSession, None]:
+        """
+        Async context manager for database sessions.
+        Automatically handles session lifecycle and cleanup.
+
+        Usage:
+            async with client.get_session_context() as session:
+                session.add(user)
+                await session.commit()
+
+        Args:
+            read_only: The block only reads, so it may run on a replica
+
+        Yields:
+            AsyncSession: SQLModel async session for database operations
+        """
+        engine = await self.read_engine() if read_only else self.engine
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            try:
+                yield session
+            finally:
+                await session.close()
+
+    async def stream(
+        self, statement: Executable, batch_size: int = 1000, read_only: bool = False
+    ) -> AsyncGenerator[Sequence[Row], None]:
+        """
+        Run a query through a server-side cursor and yield rows in batches.
+
+        Args:
+            statement: Core select to run
+            batch_size: Rows fetched from the server per round-trip
+            read_only: The statement only reads, so it may run on a replica
+
+        Yields:
+            Sequence[Row]: Consecutive batches of result rows
+        """
+        engine = await self.read_engine() if read_only else self.engine
+        async with engine.connect() as connection:
+            result = await connection.stream(statement)
+            async for partition in result.partitions(batch_size):
+                yield partition
+
+    async def notify(self, channel: str, payload: str) -> None:
+        """
+        Send a NOTIFY to every connection listening on the channel.
+
+        Args:
+            channel: Channel name
+            payload: Message text (Postgres limits it to 8000 bytes)
+        """
+        async with self.get_session_context() as session:
+            await session.exec(
+                text("SELECT pg_notify(:channel, :payload)"),
+                params={"channel": channel, "payload": payload},
+            )
+            await session.commit()
+
+    async def create_tables(self, metadata) -> None:
+        """
+        Create all tables defined in the metadata.
+
+        Args:
+            metadata: SQLModel metadata containing table definitions
+        """
+        async with self.engine.begin() as connection:
+            await connection.run_sync(metadata.create_all)
+
+    async def close(self) -> None:
+        """
+        Close the database engines and all their connections.
+        """
+        if self.replicas is not None:
+            self.replicas.stop_probing()
+        for engine in self.engines:
+            await engine.dispose()
+
+    def dispose_after_fork(self) -> None:
+        """
+        Drop the pooled connections inherited from the parent process.
+
+        For a forked child, see PostgresClient.dispose_after_fork. Forgetting
+        connections does no I/O, so this runs without an event loop.
+        """
+        for engine in self.engines:
+            engine.sync_engine.dispose(close=False)
@@ -0,0 +1,202 @@
+"""
+Connection pool configuration and monitoring shared by both Postgres clients.
+
+PoolConfig turns the DB_POOL_* settings into create_engine() arguments. The
+pool classes defined here time every checkout, and PoolMonitor hooks into
+the pool events to count checkouts, new connections, pings and timeouts and
+to track connection age, so an instance's pool can be sized from
+GET /internal/pool instead of guessed.
+"""
+
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Literal
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+# always: ping on every checkout; idle: only connections that sat in the pool
+# longer than pre_ping_idle_seconds; never: trust pooled connections
+PrePingStrategy = Literal["always", "idle", "never"]
+
+
+@dataclass(frozen=True)
+class PoolConfig:
+    """Connection pool settings of one engine."""
+
+    size: int = 5
+    max_overflow: int = 10
+    timeout: float = 30.0
+    recycle: int = 1800
+    pre_ping: PrePingStrategy = "idle"
+    pre_ping_idle_seconds: float = 30.0
+    # psycopg prepares a statement server-side after this many executions;
+    # None disables prepared statements (e.g. behind PgBouncer)
+    prepare_threshold: int | None = 5
+
+    def engine_kwargs(self, is_async: bool = False) -> dict[str, Any]:
+        """
+        Keyword arguments for create_engine()/create_async_engine().
+
+        Args:
+            is_async: Build the asyncio-compatible pool class
+        """
+        return {
+            "poolclass": MonitoredAsyncQueuePool if is_async else MonitoredQueuePool,
+            "pool_size": self.size,
+            "max_overflow": self.max_overflow,
+            "pool_timeout": self.timeout,
+            "pool_recycle": self.recycle,
+            "pool_pre_ping": self.pre_ping == "always",
+            "connect_args": {"prepare_threshold": self.prepare_threshold},
+        }
+
+
+class _MonitoredPoolMixin:
+    """Times Pool.connect() and reports it to the pool's monitor."""
+
+    monitor: "PoolMonitor | None" = None
+
+    def connect(self):
+        monitor = self.monitor
+        if monitor is None:
+            return super().connect()
+        started = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            monitor.record_timeout()
+            raise
+        monitor.record_wait(time.perf_counter() - started)
+        return connection
+
+    def recreate(self):
+        # engine.dispose() swaps in a fresh pool; keep reporting to the same
+        # monitor
+        pool = super().recreate()
+        pool.monitor = self.monitor
+        return pool
+
+
+class MonitoredQueuePool(_MonitoredPoolMixin, QueuePool):
+    pass
+
+
+class MonitoredAsyncQueuePool(_MonitoredPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+class PoolMonitor:
+    """
+    Pool usage counters of one engine.
+
+    Checkout wait is the time spent in Pool.connect(): waiting for a free
+    connection, opening a new one and pre-pinging it. Connection age is the
+    time since the connection was opened, sampled at each checkout.
+    """
+
+    def __init__(self, engine: Engine, config: PoolConfig):
+        """
+        Args:
+            engine: Sync engine to monitor (for async engines, .sync_engine)
+            config: The settings the engine's pool was built with
+        """
+        self.engine = engine
+        self.config = config
+        self._lock = threading.Lock()
+        self._checkouts = 0
+        self._connects = 0
+        self._invalidations = 0
+        self._timeouts = 0
+        self._pings = 0
+        self._ping_failures = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._age_total = 0.0
+        self._age_max = 0.0
+
+        engine.pool.monitor = self
+        event.listen(engine, "connect", self._on_connect)
+        event.listen(engine, "checkout", self._on_checkout)
+        event.listen(engine, "checkin", self._on_checkin)
+        event.listen(engine, "invalidate", self._on_invalidate)
+
+    def record_wait(self, seconds: float) -> None:
+        with self._lock:
+            self._wait_total += seconds
+            self._wait_max = max(self._wait_max, seconds)
+
+    def record_timeout(self) -> None:
+        with self._lock:
+            self._timeouts += 1
+
+    def stats(self) -> dict:
+        """Snapshot of the pool state, its configuration and the counters."""
+        pool = self.engine.pool
+        with self._lock:
+            checkouts = self._checkouts or 1
+            return {
+                "size": self.config.size,
+                "max_overflow": self.config.max_overflow,
+                "timeout": self.config.timeout,
+                "recycle": self.config.recycle,
+                "pre_ping": self.config.pre_ping,
+                "prepare_threshold": self.config.prepare_threshold,
+                "checked_out": pool.checkedout(),
+                "checked_in": pool.checkedin(),
+                "overflow": max(pool.overflow(), 0),
+                "checkouts": self._checkouts,
+                "connects": self._connects,
+                "invalidations": self._invalidations,
+                "timeouts": self._timeouts,
+                "pings": self._pings,
+                "ping_failures": self._ping_failures,
+                "checkout_wait_ms_avg": self._wait_total / checkouts * 1000,
+                "checkout_wait_ms_max": self._wait_max * 1000,
+                "connection_age_s_avg": self._age_total / checkouts,
+                "connection_age_s_max": self._age_max,
+            }
+
+    def _on_connect(self, dbapi_connection, connection_record) -> None:
+        connection_record.info["connected_at"] = time.monotonic()
+        with self._lock:
+            self._connects += 1
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy):
+        now = time.monotonic()
+        info = connection_record.info
+        if self.config.pre_ping == "idle":
+            checked_in_at = info.get("checked_in_at")
+            if (
+                checked_in_at is not None
+                and now - checked_in_at > self.config.pre_ping_idle_seconds
+            ):
+                self._ping(dbapi_connection)
+
+        age = now - info.get("connected_at", now)
+        with self._lock:
+            self._checkouts += 1
+            self._age_total += age
+            self._age_max = max(self._age_max, age)
+
+    def _on_checkin(self, dbapi_connection, connection_record) -> None:
+        connection_record.info["checked_in_at"] = time.monotonic()
+
+    def _on_invalidate(self, dbapi_connection, connection_record, exception) -> None:
+        with self._lock:
+            self._invalidations += 1
+
+    def _ping(self, dbapi_connection) -> None:
+        with self._lock:
+            self._pings += 1
+        try:
+            alive = self.engine.dialect.do_ping(dbapi_connection)
+        except self.engine.dialect.loaded_dbapi.Error:
+            alive = False
+        if not alive:
+            with self._lock:
+                self._ping_failures += 1
+            # The pool discards the connection and checks out another one
+            raise exc.DisconnectionError("Connection failed idle pre-ping")
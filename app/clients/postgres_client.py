@@ -1,7 +1,16 @@
+from sqlalchemy import Connection, Engine, Executable, Row, text
 from sqlmodel import create_engine, Session
-from typing import Generator
+from typing import Callable, Generator, Sequence
 from contextlib import contextmanager
 
+from app.clients.pool import PoolConfig, PoolMonitor
+from app.clients.replicas import (
+    Replica,
+    ReplicaConfig,
+    ReplicaSet,
+    reads_use_primary,
+)
+
 
 class PostgresClient:
     """
@@ -9,20 +18,104 @@ class PostgresClient:
     and providing session instances for data access operations.
     """
 
-    def __init__(self, database_url: str, echo: bool = False):
+    def __init__(
+        self,
+        database_url: str,
+        echo: bool = False,
+        pool: PoolConfig | None = None,
+        replicas: ReplicaConfig | None = None,
+    ):
         """
         Initialize the PostgreSQL client with a database connection.
 
         Args:
-            database_url: PostgreSQL connection string
+            database_url: PostgreSQL connection string (the primary)
             echo: If True, SQL statements will be logged (useful for debugging)
+            pool: Connection pool settings (default: PoolConfig())
+            replicas: Read replicas for read-only calls (default: none)
         """
         self.database_url = database_url
+        self.pool_config = pool or PoolConfig()
         self.engine = create_engine(
             database_url,
             echo=echo,
-            pool_pre_ping=True,
+            **self.pool_config.engine_kwargs(),
         )
+        self.pool_monitor = PoolMonitor(self.engine, self.pool_config)
+
+        self.replicas: ReplicaSet | None = None
+        if replicas and replicas.urls:
+            members = []
+            for url in replicas.urls:
+                engine = create_engine(
+                    url, echo=echo, **self.pool_config.engine_kwargs()
+                )
+                members.append(
+                    Replica(
+                        engine=engine,
+                        name=ReplicaSet.display_name(url),
+                        url=url,
+                        monitor=PoolMonitor(engine, self.pool_config),
+                    )
+                )
+            self.replicas = ReplicaSet(members, replicas)
+
+        # Set by bind(): every session and stream runs on this connection
+        self._connection: Connection | None = None
+
+    @property
+    def engines(self) -> list[Engine]:
+        """The primary engine followed by the replica engines."""
+        replicas = self.replicas.replicas if self.replicas else []
+        return [self.engine] + [replica.engine for replica in replicas]
+
+    def read_engine(self) -> Engine:
+        """
+        Engine for a read-only call: a replica within the lag limit, or the
+        primary when there is none or the caller must read its own writes.
+        Only the last lag measurements are read; measuring is left to the
+        replica set's background probe.
+        """
+        if self.replicas is None or reads_use_primary():
+            return self.engine
+        self.replicas.start_probing()
+        replica = self.replicas.choose()
+        return replica.engine if replica is not None else self.engine
+
+    @contextmanager
+    def bind(self, connection: Connection) -> Generator["PostgresClient", None, None]:
+        """
+        Run every session and stream of the client on one connection (tests).
+
+        Sessions join the connection's transaction through savepoints, so
+        their commits and rollbacks stay inside it and the caller can undo
+        everything the client wrote with a single rollback. Replicas are
+        bypassed while bound.
+
+        Args:
+            connection: Connection with a transaction already begun
+        """
+        self._connection = connection
+        try:
+            yield self
+        finally:
+            self._connection = None
+
+    def create_session(self, read_only: bool = False) -> Session:
+        """
+        Create a session on the primary, a replica or the bound connection.
+
+        Args:
+            read_only: The session only reads, so it may run on a replica
+        """
+        if self._connection is not None:
+            return Session(
+                self._connection,
+                expire_on_commit=False,
+                join_transaction_mode="create_savepoint",
+            )
+        engine = self.read_engine() if read_only else self.engine
+        return Session(engine, expire_on_commit=False)
 
     def get_session(self) -> Generator[Session, None, None]:
         """
@@ -31,11 +124,13 @@ class PostgresClient:
         Yields:
             Session: SQLModel session for database operations
         """
-        with Session(self.engine) as session:
+        with self.create_session() as session:
             yield session
 
     @contextmanager
-    def get_session_context(self) -> Generator[Session, None, None]:
+    def get_session_context(
+        self, read_only: bool = False
+    ) -> Generator[Session, None, None]:
         """
         Context manager for database sessions.
         Automatically handles session lifecycle and cleanup.
@@ -45,15 +140,85 @@ class PostgresClient:
                 session.add(user)
                 session.commit()
 
+        Args:
+            read_only: The block only reads, so it may run on a replica
+
         Yields:
             Session: SQLModel session for database operations
         """
-        with Session(self.engine) as session:
+        with self.create_session(read_only=read_only) as session:
             try:
                 yield session
             finally:
                 session.close()
 
+    def stream(
+        self, statement: Executable, batch_size: int = 1000, read_only: bool = False
+    ) -> Generator[Sequence[Row], None, None]:
+        """
+        Run a query through a server-side cursor and yield rows in batches.
+
+        Only batch_size rows are held in memory at a time, however large the
+        result is. Uses its own connection, so it can outlive the request's
+        session (e.g. while a StreamingResponse is being sent).
+
+        Args:
+            statement: Core select to run
+            batch_size: Rows fetched from the server per round-trip
+            read_only: The statement only reads, so it may run on a replica
+
+        Yields:
+            Sequence[Row]: Consecutive batches of result rows
+        """
+        if self._connection is not None:
+            yield from self._stream(self._connection, statement, batch_size)
+            return
+        engine = self.read_engine() if read_only else self.engine
+        with engine.connect() as connection:
+            yield from self._stream(connection, statement, batch_size)
+
+    @staticmethod
+    def _stream(
+        connection: Connection, statement: Executable, batch_size: int
+    ) -> Generator[Sequence[Row], None, None]:
+        result = connection.execution_options(
+            stream_results=True, yield_per=batch_size
+        ).execute(statement)
+        for partition in result.partitions():
+            yield partition
+
+    def commit(self, session: Session) -> None:
+        """
+        Commit the work done in a session from get_session_context().
+
+        Repositories call this instead of session.commit() so that a
+        UnitOfWork standing in for the client can defer the real commit.
+        """
+        session.commit()
+
+    def after_commit(self, callback: Callable[[], None]) -> None:
+        """
+        Run callback once the current write is committed, see
+        UnitOfWork.after_commit. Every call on the client commits its own
+        session, so that is right away.
+        """
+        callback()
+
+    def notify(self, channel: str, payload: str) -> None:
+        """
+        Send a NOTIFY to every connection listening on the channel.
+
+        Args:
+            channel: Channel name
+            payload: Message text (Postgres limits it to 8000 bytes)
+        """
+        with self.get_session_context() as session:
+            session.exec(
+                text("SELECT pg_notify(:channel, :payload)"),
+                params={"channel": channel, "payload": payload},
+            )
+            self.commit(session)
+
     def create_tables(self, metadata) -> None:
         """
         Create all tables defined in the metadata.
@@ -65,6 +230,19 @@ class PostgresClient:
 
     def close(self) -> None:
         """
-        Close the database engine and all its connections.
+        Close the database engines and all their connections.
+        """
+        if self.replicas is not None:
+            self.replicas.stop_probing()
+        for engine in self.engines:
+            engine.dispose()
+
+    def dispose_after_fork(self) -> None:
+        """
+        Drop the pooled connections inherited from the parent process.
+
+        For a forked child: the sockets still belong to the parent, so they
+        are forgotten rather than closed, which would end its sessions.
         """
-        self.engine.dispose()
+        for engine in self.engines:
+            engine.dispose(close=False)
@@ -0,0 +1,81 @@
+import logging
+import threading
+from typing import Callable
+
+from sqlalchemy.engine import make_url
+
+logger = logging.getLogger(__name__)
+
+
+class PostgresListener:
+    """
+    Background LISTEN on a Postgres channel.
+
+    Runs a daemon thread holding one dedicated autocommit connection and calls
+    on_message with the payload of every NOTIFY received on the channel.
+    Reconnects with a backoff if the connection drops.
+    """
+
+    def __init__(
+        self,
+        database_url: str,
+        channel: str,
+        on_message: Callable[[str], None],
+        reconnect_delay: float = 1.0,
+    ):
+        """
+        Args:
+            database_url: SQLAlchemy-style PostgreSQL URL (postgresql+psycopg://)
+            channel: Channel name to LISTEN on
+            on_message: Called with each notification payload
+            reconnect_delay: Seconds to wait before reconnecting after an error
+        """
+        self.conninfo = (
+            make_url(database_url)
+            .set(drivername="postgresql")
+            .render_as_string(hide_password=False)
+        )
+        self.channel = channel
+        self.on_message = on_message
+        self.reconnect_delay = reconnect_delay
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        """Start listening in a daemon thread."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name=f"pg-listen-{self.channel}", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout: float = 2.0) -> None:
+        """Stop the listener thread."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self) -> None:
+        # Imported in the listener thread, off the app's import path
+        import psycopg
+
+        while not self._stop.is_set():
+            try:
+                with psycopg.connect(self.conninfo, autocommit=True) as connection:
+                    connection.execute(f'LISTEN "{self.channel}"')
+                    while not self._stop.is_set():
+                        # Wake up regularly to notice stop()
+                        for notify in connection.notifies(timeout=1.0):
+                            self._dispatch(notify.payload)
+            except psycopg.Error:
+                logger.exception("LISTEN %s failed, reconnecting", self.channel)
+                self._stop.wait(self.reconnect_delay)
+
+    def _dispatch(self, payload: str) -> None:
+        try:
+            self.on_message(payload)
+        except Exception:
+            logger.exception("Handler for NOTIFY %s failed", self.channel)
@@ -0,0 +1,241 @@
+"""
+Read-replica selection shared by both Postgres clients.
+
+Clients send read-only calls to a replica picked by ReplicaSet (round-robin
+or least checked-out connections) and everything else to the primary.
+Replica lag is measured every check_interval_seconds by a background thread,
+on connections of its own bounded by probe_timeout_seconds, so a replica
+that stops answering never holds up a request. Replicas that lag more than
+max_lag_seconds, cannot be reached or have not been measured recently are
+skipped, and reads fall back to the primary when none is left.
+"""
+
+import logging
+import math
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Generator, Literal, Sequence
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.pool import NullPool
+
+logger = logging.getLogger(__name__)
+
+ReplicaStrategy = Literal["round_robin", "least_connections"]
+
+# Seconds the replica is behind the primary. A replica that has replayed
+# everything it received is not lagging, however old the last transaction is
+REPLICA_LAG_SQL = text(
+    """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(
+            EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0
+        )
+    END
+    """
+)
+
+_use_primary: ContextVar[bool] = ContextVar("use_primary", default=False)
+
+
+def reads_use_primary() -> bool:
+    """True when the current context must read its own writes."""
+    return _use_primary.get()
+
+
+@contextmanager
+def use_primary() -> Generator[None, None, None]:
+    """Send every read made inside the block to the primary."""
+    token = _use_primary.set(True)
+    try:
+        yield
+    finally:
+        _use_primary.reset(token)
+
+
+@dataclass(frozen=True)
+class ReplicaConfig:
+    """Read replicas of one primary and how to pick between them."""
+
+    urls: Sequence[str] = ()
+    strategy: ReplicaStrategy = "round_robin"
+    max_lag_seconds: float = 5.0
+    check_interval_seconds: float = 1.0
+    # Bound on connecting to a replica and on the lag query
+    probe_timeout_seconds: float = 1.0
+
+
+@dataclass
+class Replica:
+    """One replica engine and what is known about its lag."""
+
+    engine: Any
+    name: str
+    monitor: Any = None
+    # Where the lag probe connects; the engine's own pool is left to requests
+    url: str | None = None
+    # None until measured, and while the replica is unreachable
+    lag_seconds: float | None = None
+    checked_at: float = field(default=float("-inf"))
+    measured_at: float = field(default=float("-inf"))
+    selected: int = 0
+    probe_engine: Engine | None = None
+
+    @property
+    def pool(self):
+        return getattr(self.engine, "sync_engine", self.engine).pool
+
+
+class ReplicaSet:
+    """
+    Picks the replica for a read among those within the lag limit.
+
+    Lag is measured off the request path: clients call start_probing() and
+    only read the last measurements. probe() can also be called directly.
+    """
+
+    def __init__(self, replicas: list[Replica], config: ReplicaConfig):
+        self.replicas = replicas
+        self.config = config
+        self._lock = threading.Lock()
+        self._next = 0
+        self._prober: threading.Thread | None = None
+        self._stopped = threading.Event()
+
+    @staticmethod
+    def display_name(url: str) -> str:
+        """host:port/database of a URL, without credentials."""
+        parsed = make_url(url)
+        host = parsed.host or parsed.query.get("host") or "localhost"
+        port = parsed.port or parsed.query.get("port")
+        port = f":{port}" if port else ""
+        return f"{host}{port}/{parsed.database}"
+
+    def due(self) -> list[Replica]:
+        """
+        Replicas whose lag should be measured now. They are marked as checked
+        right away, so concurrent requests do not all measure them.
+        """
+        now = time.monotonic()
+        with self._lock:
+            due = [
+                replica
+                for replica in self.replicas
+                if now - replica.checked_at >= self.config.check_interval_seconds
+            ]
+            for replica in due:
+                replica.checked_at = now
+        return due
+
+    def record_lag(self, replica: Replica, lag_seconds: float | None) -> None:
+        """Store a lag measurement; None marks the replica unreachable."""
+        was_healthy = self.is_healthy(replica)
+        replica.lag_seconds = lag_seconds
+        replica.measured_at = time.monotonic()
+        if was_healthy and not self.is_healthy(replica):
+            logger.warning("Skipping replica %s (lag: %s)", replica.name, lag_seconds)
+
+    def is_healthy(self, replica: Replica) -> bool:
+        # A probe stuck on a replica that stopped answering leaves its last
+        # measurement in place: past this age it is not trusted any more
+        max_age = (
+            2 * self.config.check_interval_seconds + self.config.probe_timeout_seconds
+        )
+        return (
+            replica.lag_seconds is not None
+            and replica.lag_seconds <= self.config.max_lag_seconds
+            and time.monotonic() - replica.measured_at <= max_age
+        )
+
+    def probe(self) -> None:
+        """Measure the lag of the replicas that are due, in this thread."""
+        for replica in self.due():
+            self.record_lag(replica, self.measure_lag(replica))
+
+    def measure_lag(self, replica: Replica) -> float | None:
+        """Lag of one replica, or None when it cannot be reached in time."""
+        try:
+            with self._probe_engine(replica).connect() as connection:
+                return float(connection.execute(REPLICA_LAG_SQL).scalar_one())
+        except SQLAlchemyError:
+            logger.warning("Replica %s is unreachable", replica.name, exc_info=True)
+            return None
+
+    def start_probing(self) -> None:
+        """Start the background lag probe, once; cheap to call on every read."""
+        if self._prober is not None and self._prober.is_alive():
+            return
+        with self._lock:
+            if self._stopped.is_set() or (
+                self._prober is not None and self._prober.is_alive()
+            ):
+                return
+            self._prober = threading.Thread(
+                target=self._probe_forever, name="replica-lag-probe", daemon=True
+            )
+            self._prober.start()
+
+    def stop_probing(self) -> None:
+        """Stop the background probe and close its engines."""
+        self._stopped.set()
+        prober = self._prober
+        if prober is not None and prober is not threading.current_thread():
+            prober.join(timeout=self.config.probe_timeout_seconds * 2)
+        for replica in self.replicas:
+            if replica.probe_engine is not None:
+                replica.probe_engine.dispose()
+
+    def _probe_forever(self) -> None:
+        while not self._stopped.is_set():
+            self.probe()
+            self._stopped.wait(self.config.check_interval_seconds)
+
+    def _probe_engine(self, replica: Replica) -> Engine:
+        # Unpooled: every probe connects afresh, within connect_timeout (at
+        # least 2s in libpq), so it never waits behind requests or on a dead
+        # pooled socket
+        if replica.probe_engine is None:
+            timeout = self.config.probe_timeout_seconds
+            replica.probe_engine = create_engine(
+                replica.url,
+                poolclass=NullPool,
+                connect_args={
+                    "connect_timeout": max(2, math.ceil(timeout)),
+                    "options": f"-c statement_timeout={int(timeout * 1000)}",
+                },
+            )
+        return replica.probe_engine
+
+    def choose(self) -> Replica | None:
+        """A replica within the lag limit, or None to read from the primary."""
+        healthy = [replica for replica in self.replicas if self.is_healthy(replica)]
+        if not healthy:
+            return None
+        with self._lock:
+            if self.config.strategy == "least_connections":
+                replica = min(healthy, key=lambda replica: replica.pool.checkedout())
+            else:
+                replica = healthy[self._next % len(healthy)]
+                self._next += 1
+            replica.selected += 1
+        return replica
+
+    def stats(self) -> list[dict]:
+        """Lag, selections and pool usage per replica."""
+        return [
+            {
+                "replica": replica.name,
+                "lag_seconds": replica.lag_seconds,
+                "healthy": self.is_healthy(replica),
+                "selected": replica.selected,
+                "pool": replica.monitor.stats() if replica.monitor else None,
+            }
+            for replica in self.replicas
+        ]
@@ -1,14 +1,200 @@
 from pydantic_settings import BaseSettings
 from pydantic import Field, ConfigDict
 from functools import lru_cache
+from typing import Literal
 import os
 
+# Only good enough for local development; refused when ENV=production
+DEV_AUTH_SECRET_KEY = "dev-only-insecure-auth-secret"
+
 
 class Settings(BaseSettings):
     model_config = ConfigDict(env_file=".env")  # type: ignore[arg-type]
 
     env: str = Field(default="development", validation_alias="ENV")
     test_database_url: str = Field(default="", validation_alias="TEST_DATABASE_URL")
+    # "sync" serves requests from the threadpool, "async" from the event loop
+    db_mode: Literal["sync", "async"] = Field(
+        default="sync", validation_alias="DB_MODE"
+    )
+
+    # Statements slower than this are logged with their call site
+    slow_query_ms: float = Field(default=200.0, validation_alias="SLOW_QUERY_MS")
+    # Statements per request before it is reported (0 = unlimited); routes can
+    # declare a tighter budget. Strict mode fails the request instead (tests)
+    query_budget: int = Field(default=50, validation_alias="QUERY_BUDGET")
+    query_budget_strict: bool = Field(
+        default=False, validation_alias="QUERY_BUDGET_STRICT"
+    )
+    # Identical statements per request reported as a possible N+1 pattern
+    query_repeat_threshold: int = Field(
+        default=5, validation_alias="QUERY_REPEAT_THRESHOLD"
+    )
+
+    # Read replicas: comma-separated URLs; read-only calls go to them
+    replica_urls: str = Field(default="", validation_alias="DATABASE_REPLICA_URLS")
+    replica_strategy: Literal["round_robin", "least_connections"] = Field(
+        default="round_robin", validation_alias="REPLICA_STRATEGY"
+    )
+    # Replicas further behind than this are skipped; lag is re-checked every
+    # REPLICA_LAG_CHECK_SECONDS
+    replica_max_lag_seconds: float = Field(
+        default=5.0, validation_alias="REPLICA_MAX_LAG_SECONDS"
+    )
+    replica_lag_check_seconds: float = Field(
+        default=1.0, validation_alias="REPLICA_LAG_CHECK_SECONDS"
+    )
+    # Bound on the lag probe's connect and query; slower replicas are skipped
+    replica_probe_timeout_seconds: float = Field(
+        default=1.0, validation_alias="REPLICA_PROBE_TIMEOUT_SECONDS"
+    )
+    # After a write, the same client reads from the primary for this long
+    read_your_writes_seconds: float = Field(
+        default=5.0, validation_alias="READ_YOUR_WRITES_SECONDS"
+    )
+
+    # Connection pool of each engine (see app/clients/pool.py)
+    db_pool_size: int = Field(default=5, validation_alias="DB_POOL_SIZE")
+    db_max_overflow: int = Field(default=10, validation_alias="DB_MAX_OVERFLOW")
+    db_pool_timeout: float = Field(default=30.0, validation_alias="DB_POOL_TIMEOUT")
+    # Seconds before a connection is replaced (-1 = never)
+    db_pool_recycle: int = Field(default=1800, validation_alias="DB_POOL_RECYCLE")
+    db_pool_pre_ping: Literal["always", "idle", "never"] = Field(
+        default="idle", validation_alias="DB_POOL_PRE_PING"
+    )
+    db_pool_pre_ping_idle_seconds: float = Field(
+        default=30.0, validation_alias="DB_POOL_PRE_PING_IDLE_SECONDS"
+    )
+    # Executions before psycopg prepares a statement (negative = never)
+    db_prepare_threshold: int = Field(
+        default=5, validation_alias="DB_PREPARE_THRESHOLD"
+    )
+
+    # Startup check that the schema is at the Alembic head (migrations run in
+    # the release phase): warn, strict (refuse to start) or off
+    schema_check: Literal["warn", "strict", "off"] = Field(
+        default="warn", validation_alias="SCHEMA_CHECK"
+    )
+
+    # Prometheus /metrics, request/DB/threadpool timings and Server-Timing
+    metrics_enabled: bool = Field(default=True, validation_alias="METRICS_ENABLED")
+
+    # Admission control of /users and /auth: requests over the adaptive limit
+    # of their class (read/write) wait briefly, then get 503 + Retry-After
+    admission_control_enabled: bool = Field(
+        default=True, validation_alias="ADMISSION_CONTROL_ENABLED"
+    )
+    admission_read_latency_target_ms: float = Field(
+        default=100.0, validation_alias="ADMISSION_READ_LATENCY_TARGET_MS"
+    )
+    admission_write_latency_target_ms: float = Field(
+        default=1000.0, validation_alias="ADMISSION_WRITE_LATENCY_TARGET_MS"
+    )
+    # CoDel: queue wait accepted while the queue stands, and its interval
+    admission_queue_target_ms: float = Field(
+        default=5.0, validation_alias="ADMISSION_QUEUE_TARGET_MS"
+    )
+    admission_queue_interval_ms: float = Field(
+        default=100.0, validation_alias="ADMISSION_QUEUE_INTERVAL_MS"
+    )
+    admission_max_queue: int = Field(
+        default=100, validation_alias="ADMISSION_MAX_QUEUE"
+    )
+    # Requests in flight across classes (0 = pool size + overflow, and the
+    # threadpool size in DB_MODE=sync)
+    admission_max_inflight: int = Field(
+        default=0, validation_alias="ADMISSION_MAX_INFLIGHT"
+    )
+    admission_retry_after_seconds: int = Field(
+        default=1, validation_alias="ADMISSION_RETRY_AFTER_SECONDS"
+    )
+
+    # Password hashing pool (0 workers = one per CPU core)
+    hash_workers: int = Field(default=0, validation_alias="HASH_WORKERS")
+    hash_max_pending: int = Field(default=64, validation_alias="HASH_MAX_PENDING")
+    # Fixed bcrypt cost; when unset it is calibrated at startup from the target
+    bcrypt_rounds: int | None = Field(default=None, validation_alias="BCRYPT_ROUNDS")
+    bcrypt_min_rounds: int = Field(default=10, validation_alias="BCRYPT_MIN_ROUNDS")
+    hash_target_ms: float = Field(default=250.0, validation_alias="HASH_TARGET_MS")
+
+    # Signing key of access/refresh tokens (must be set in production)
+    auth_secret_key: str = Field(
+        default=DEV_AUTH_SECRET_KEY, validation_alias="AUTH_SECRET_KEY"
+    )
+    access_token_ttl_seconds: int = Field(
+        default=900, validation_alias="ACCESS_TOKEN_TTL_SECONDS"
+    )
+    refresh_token_ttl_seconds: int = Field(
+        default=7 * 24 * 3600, validation_alias="REFRESH_TOKEN_TTL_SECONDS"
+    )
+
+    # How long an exact count(*) of users is reused across requests
+    user_count_ttl_seconds: float = Field(
+        default=5.0, validation_alias="USER_COUNT_TTL_SECONDS"
+    )
+
+    # POST /users/bulk: rows per INSERT statement and items per request
+    bulk_batch_size: int = Field(default=500, validation_alias="BULK_BATCH_SIZE")
+    bulk_max_items: int = Field(default=10_000, validation_alias="BULK_MAX_ITEMS")
+    # GET /users/export: rows fetched per server-side cursor round-trip
+    export_batch_size: int = Field(default=2000, validation_alias="EXPORT_BATCH_SIZE")
+
+    # One session/transaction per request shared by all repositories
+    unit_of_work_enabled: bool = Field(
+        default=True, validation_alias="UNIT_OF_WORK_ENABLED"
+    )
+
+    # Read-through cache for user lookups by id/email
+    user_cache_enabled: bool = Field(
+        default=True, validation_alias="USER_CACHE_ENABLED"
+    )
+    user_cache_size: int = Field(default=10_000, validation_alias="USER_CACHE_SIZE")
+    user_cache_ttl_seconds: float = Field(
+        default=60.0, validation_alias="USER_CACHE_TTL_SECONDS"
+    )
+    user_cache_negative_ttl_seconds: float = Field(
+        default=5.0, validation_alias="USER_CACHE_NEGATIVE_TTL_SECONDS"
+    )
+
+    # Concurrent lookups by id are gathered for this long into one query
+    user_loader_enabled: bool = Field(
+        default=True, validation_alias="USER_LOADER_ENABLED"
+    )
+    user_loader_window_ms: float = Field(
+        default=2.0, validation_alias="USER_LOADER_WINDOW_MS"
+    )
+    user_loader_max_batch: int = Field(
+        default=100, validation_alias="USER_LOADER_MAX_BATCH"
+    )
+
+    # Group commit of POST /users/: registrations arriving within the window
+    # are inserted by one statement in one transaction
+    registration_group_commit: bool = Field(
+        default=False, validation_alias="REGISTRATION_GROUP_COMMIT"
+    )
+    registration_batch_window_ms: float = Field(
+        default=5.0, validation_alias="REGISTRATION_BATCH_WINDOW_MS"
+    )
+    registration_batch_max: int = Field(
+        default=100, validation_alias="REGISTRATION_BATCH_MAX"
+    )
+
+    # Multi-process server (python -m app.server): worker processes (0 = one
+    # per CPU core), each with its own pools; a worker is replaced after
+    # max_requests (+ up to jitter, so they do not all restart at once)
+    web_concurrency: int = Field(default=0, validation_alias="WEB_CONCURRENCY")
+    port: int = Field(default=8000, validation_alias="PORT")
+    server_max_requests: int = Field(
+        default=10_000, validation_alias="SERVER_MAX_REQUESTS"
+    )
+    server_max_requests_jitter: int = Field(
+        default=1_000, validation_alias="SERVER_MAX_REQUESTS_JITTER"
+    )
+    # Seconds a stopping worker gets to finish its requests
+    server_graceful_timeout: int = Field(
+        default=30, validation_alias="SERVER_GRACEFUL_TIMEOUT"
+    )
+    server_keepalive: int = Field(default=5, validation_alias="SERVER_KEEPALIVE")
 
     @property
     def database_url(self) -> str:
@@ -24,6 +210,14 @@ class Settings(BaseSettings):
 
         return ""
 
+    @property
+    def database_replica_urls(self) -> list[str]:
+        return [
+            url.strip().replace("postgres://", "postgresql+psycopg://", 1)
+            for url in self.replica_urls.split(",")
+            if url.strip()
+        ]
+
 
 @lru_cache()
 def get_settings():
@@ -0,0 +1,280 @@
+"""
+Admission control: shed load at the door instead of queueing it.
+
+When Postgres slows down, requests that cannot get a threadpool thread or a
+pool connection wait for one until the client gives up and retries, which
+adds more load. AdmissionController caps the requests in flight and answers
+the excess at once with 503 and Retry-After.
+
+Each route class (reads, writes) has its own adaptive concurrency limit
+(AIMD): it grows by about one per round of requests while the class uses
+its whole limit within the latency target, and shrinks by backoff when
+responses are slower than the target. All classes together never exceed
+the capacity behind them: pool connections, and threadpool tokens in
+DB_MODE=sync.
+
+Requests over the limit wait in a short FIFO queue managed like CoDel: if
+the shortest queue wait over an interval stayed above queue_target, the
+queue is standing, so waiters only get queue_target before being shed;
+otherwise they may wait up to a full interval to absorb a burst.
+"""
+
+import asyncio
+import math
+import time
+from collections import deque
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Callable
+
+from app.config.settings import get_settings
+from app.core.metrics import (
+    ADMISSION_DECISIONS,
+    ADMISSION_INFLIGHT,
+    ADMISSION_LIMIT,
+    ADMISSION_QUEUE_WAIT,
+)
+
+SAFE_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+# Database-backed routes; /internal, /metrics and the docs always get through
+ADMISSION_PATHS = ("/users", "/auth")
+# Routes under ADMISSION_PATHS answered without the database (token claims)
+ADMISSION_EXEMPT_PATHS = frozenset({"/auth/me"})
+
+
+@dataclass
+class ClassConfig:
+    """Limit of one route class."""
+
+    latency_target_seconds: float
+    initial_limit: int = 10
+    min_limit: int = 1
+
+
+class AdaptiveLimit:
+    """In-flight requests, limit and queue of one route class."""
+
+    def __init__(self, name: str, config: ClassConfig, backoff: float = 0.9):
+        self.name = name
+        self.config = config
+        self.backoff = backoff
+        self.limit = float(config.initial_limit)
+        self.inflight = 0
+        self.waiters: deque[asyncio.Future] = deque()
+        self.last_decrease = 0.0
+        # CoDel state: shortest queue wait seen in the current interval
+        self.interval_started = time.monotonic()
+        self.interval_min_wait = math.inf
+        self.overloaded = False
+        self.counts = {"admitted": 0, "queued": 0, "shed": 0}
+        self.publish()
+
+    def publish(self) -> None:
+        ADMISSION_LIMIT.labels(self.name).set(self.limit)
+
+    def record_wait(self, waited: float, target: float, interval: float) -> None:
+        now = time.monotonic()
+        self.interval_min_wait = min(self.interval_min_wait, waited)
+        if now - self.interval_started >= interval:
+            self.overloaded = self.interval_min_wait > target
+            self.interval_started = now
+            self.interval_min_wait = math.inf
+
+    def record_latency(self, seconds: float, max_limit: int, interval: float) -> None:
+        """AIMD: back off on slow responses, grow while the limit is in use."""
+        now = time.monotonic()
+        if seconds > self.config.latency_target_seconds:
+            # One decrease per interval: responses of the same slow period
+            # must not collapse the limit
+            if now - self.last_decrease >= interval:
+                self.limit = max(self.config.min_limit, self.limit * self.backoff)
+                self.last_decrease = now
+        elif self.inflight + 1 >= int(self.limit):
+            self.limit = min(max_limit, self.limit + 1 / self.limit)
+        self.limit = min(self.limit, max_limit)
+        self.publish()
+
+    def stats(self) -> dict:
+        return {
+            "limit": round(self.limit, 2),
+            "inflight": self.inflight,
+            "queued": len(self.waiters),
+            "overloaded": self.overloaded,
+            **self.counts,
+        }
+
+
+class AdmissionController:
+    """
+    Admits, queues or sheds requests per route class; see the module.
+
+    Runs on the event loop only (from a middleware), so it takes no locks.
+    """
+
+    def __init__(
+        self,
+        classes: dict[str, ClassConfig],
+        capacity: Callable[[], int],
+        queue_target_seconds: float = 0.005,
+        queue_interval_seconds: float = 0.1,
+        max_queue: int = 100,
+    ):
+        """
+        Args:
+            classes: Route class name -> its latency target and limits
+            capacity: Requests all classes may run at once (read per call,
+                e.g. pool size + overflow)
+            queue_target_seconds: Acceptable standing queue wait (CoDel target)
+            queue_interval_seconds: CoDel interval, also the longest wait of
+                a queued request while the queue is not standing
+            max_queue: Waiting requests per class; more are shed at once
+        """
+        self.classes = {
+            name: AdaptiveLimit(name, config) for name, config in classes.items()
+        }
+        self.capacity = capacity
+        self.queue_target = queue_target_seconds
+        self.queue_interval = queue_interval_seconds
+        self.max_queue = max_queue
+        self.inflight = 0
+
+    def _can_admit(self, limit: AdaptiveLimit) -> bool:
+        return (
+            limit.inflight < max(int(limit.limit), limit.config.min_limit)
+            and self.inflight < self.capacity()
+        )
+
+    def _admit(self, limit: AdaptiveLimit, decision: str) -> None:
+        limit.inflight += 1
+        self.inflight += 1
+        limit.counts["admitted"] += 1
+        ADMISSION_DECISIONS.labels(limit.name, decision).inc()
+        ADMISSION_INFLIGHT.labels(limit.name).set(limit.inflight)
+
+    def _shed(self, limit: AdaptiveLimit, reason: str) -> bool:
+        limit.counts["shed"] += 1
+        ADMISSION_DECISIONS.labels(limit.name, reason).inc()
+        return False
+
+    async def acquire(self, route_class: str) -> bool:
+        """Wait for a slot; False means the request must be shed."""
+        limit = self.classes[route_class]
+        if not limit.waiters and self._can_admit(limit):
+            limit.record_wait(0.0, self.queue_target, self.queue_interval)
+            self._admit(limit, "admitted")
+            return True
+        if len(limit.waiters) >= self.max_queue:
+            return self._shed(limit, "shed_queue_full")
+
+        timeout = self.queue_target if limit.overloaded else self.queue_interval
+        waiter = asyncio.get_running_loop().create_future()
+        limit.waiters.append(waiter)
+        limit.counts["queued"] += 1
+        enqueued = time.perf_counter()
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), timeout)
+        except asyncio.TimeoutError:
+            if not waiter.done():
+                waiter.cancel()
+                limit.waiters.remove(waiter)
+                limit.record_wait(
+                    time.perf_counter() - enqueued,
+                    self.queue_target,
+                    self.queue_interval,
+                )
+                return self._shed(limit, "shed_timeout")
+        except asyncio.CancelledError:
+            # Client went away; give back a slot handed over meanwhile
+            if waiter.done() and not waiter.cancelled():
+                self.release(route_class, None)
+            elif waiter in limit.waiters:
+                waiter.cancel()
+                limit.waiters.remove(waiter)
+            raise
+        waited = time.perf_counter() - enqueued
+        ADMISSION_QUEUE_WAIT.labels(route_class).observe(waited)
+        limit.record_wait(waited, self.queue_target, self.queue_interval)
+        return True
+
+    def release(self, route_class: str, seconds: float | None) -> None:
+        """
+        Free the slot of an admitted request and hand it to a waiter.
+
+        Args:
+            route_class: Class the request was admitted in
+            seconds: Its latency from admission, or None to leave the limit
+                as is
+        """
+        limit = self.classes[route_class]
+        limit.inflight -= 1
+        self.inflight -= 1
+        ADMISSION_INFLIGHT.labels(route_class).set(limit.inflight)
+        if seconds is not None:
+            limit.record_latency(seconds, self.capacity(), self.queue_interval)
+        self._wake(limit)
+
+    def _wake(self, released: AdaptiveLimit) -> None:
+        # The class that freed a slot first, then the others
+        for limit in [released] + [
+            other for other in self.classes.values() if other is not released
+        ]:
+            while limit.waiters and self._can_admit(limit):
+                waiter = limit.waiters.popleft()
+                if waiter.done():
+                    continue
+                self._admit(limit, "admitted_after_wait")
+                waiter.set_result(None)
+
+    def publish(self) -> None:
+        """Export the limits again, e.g. from a process forked after they were set."""
+        for limit in self.classes.values():
+            limit.publish()
+
+    def stats(self) -> dict:
+        return {
+            "capacity": self.capacity(),
+            "inflight": self.inflight,
+            "classes": {name: limit.stats() for name, limit in self.classes.items()},
+        }
+
+
+def route_class(method: str, path: str) -> str | None:
+    """Route class of a request, or None if it bypasses admission control."""
+    if not path.startswith(ADMISSION_PATHS) or path in ADMISSION_EXEMPT_PATHS:
+        return None
+    return "read" if method in SAFE_METHODS else "write"
+
+
+def pool_capacity() -> int:
+    """Connections a request can hold at once: pool size + overflow."""
+    settings = get_settings()
+    return settings.db_pool_size + settings.db_max_overflow
+
+
+def threadpool_capacity() -> int:
+    """Threads serving sync endpoints (anyio's default limiter)."""
+    from anyio.to_thread import current_default_thread_limiter
+
+    return int(current_default_thread_limiter().total_tokens)
+
+
+@lru_cache()
+def get_admission_controller() -> AdmissionController:
+    settings = get_settings()
+    if settings.admission_max_inflight:
+        capacity = lambda: settings.admission_max_inflight  # noqa: E731
+    elif settings.db_mode == "sync":
+        capacity = lambda: min(pool_capacity(), threadpool_capacity())  # noqa: E731
+    else:
+        capacity = pool_capacity
+    return AdmissionController(
+        classes={
+            "read": ClassConfig(settings.admission_read_latency_target_ms / 1000),
+            "write": ClassConfig(settings.admission_write_latency_target_ms / 1000),
+        },
+        capacity=capacity,
+        queue_target_seconds=settings.admission_queue_target_ms / 1000,
+        queue_interval_seconds=settings.admission_queue_interval_ms / 1000,
+        max_queue=settings.admission_max_queue,
+    )
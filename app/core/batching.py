@@ -0,0 +1,361 @@
+"""
+Request coalescing: many concurrent calls, one database round-trip.
+
+BatchLoader (the DataLoader/singleflight pattern) serves point lookups: it
+gathers the keys asked for during a short window, runs one batched query
+for all of them and hands every caller its own result. A key that is
+already waiting or being loaded is not asked for twice: later callers share
+the pending result.
+
+BatchWriter does the same for writes (group commit): items submitted during
+the window are written by one statement in one transaction, and each caller
+gets the result of its own item. Items are never merged. A batch function
+can fail a single item by returning an exception as its result: only that
+item's caller raises it.
+
+Calls are batched per group, e.g. per database client, since one statement
+can only serve callers that would have used the same connection. The window
+is only waited while another batch of the group is running: a caller alone
+is served at once, so batching costs nothing without concurrency.
+"""
+
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Hashable, Sequence
+
+
+def _item_result(result: Any) -> Any:
+    """A writer's result for one item; an exception is that item's failure."""
+    if isinstance(result, BaseException):
+        raise result
+    return result
+
+
+class _Batch:
+    def __init__(self):
+        self.items: list[Any] = []
+        self.futures: list[Future] = []
+        self.closed = threading.Event()
+
+
+class _ThreadBatcher:
+    """
+    Batching for callers on threadpool threads.
+
+    The first caller of a window becomes its leader: if a batch of the group
+    is running, it waits up to window_seconds (or until max_batch items are
+    collected), runs the batch in its own thread and resolves the others.
+    No background thread is involved.
+    """
+
+    def __init__(self, batch_fn: Callable, window_seconds: float, max_batch: int):
+        self.batch_fn = batch_fn
+        self.window_seconds = window_seconds
+        self.max_batch = max_batch
+        self._lock = threading.Lock()
+        self._open: dict[Hashable, _Batch] = {}
+        self._running: dict[Hashable, int] = {}
+        self.batches = 0
+        self.batched_items = 0
+
+    def _add(self, group: Hashable, item: Any) -> tuple[Future, _Batch | None]:
+        """Queue item in the group's open batch (lock held); the batch is
+        returned when the caller opened it and so must lead it."""
+        future = Future()
+        batch = self._open.get(group)
+        leader_of = None
+        if batch is None:
+            batch = leader_of = self._open[group] = _Batch()
+        batch.items.append(item)
+        batch.futures.append(future)
+        if len(batch.items) >= self.max_batch:
+            del self._open[group]
+            batch.closed.set()
+        return future, leader_of
+
+    def _lead(self, group: Hashable, batch: _Batch) -> None:
+        with self._lock:
+            busy = self._running.get(group, 0) > 0
+        if busy:
+            batch.closed.wait(self.window_seconds)
+        with self._lock:
+            if self._open.get(group) is batch:
+                del self._open[group]
+            self._running[group] = self._running.get(group, 0) + 1
+            self.batches += 1
+            self.batched_items += len(batch.items)
+        try:
+            results = self._call(group, batch.items)
+        except BaseException as exc:
+            for future in batch.futures:
+                future.set_exception(exc)
+        else:
+            for future, result in zip(batch.futures, results):
+                future.set_result(result)
+        finally:
+            with self._lock:
+                self._running[group] -= 1
+                if not self._running[group]:
+                    del self._running[group]
+            self._finished(group, batch.items)
+
+    def _call(self, group: Hashable, items: list[Any]) -> Sequence[Any]:
+        raise NotImplementedError
+
+    def _finished(self, group: Hashable, items: list[Any]) -> None:
+        pass
+
+    def _batch_stats(self) -> dict:
+        return {
+            "batches": self.batches,
+            "mean_batch_size": (
+                self.batched_items / self.batches if self.batches else 0.0
+            ),
+        }
+
+
+class BatchLoader(_ThreadBatcher):
+    """Thread-safe loader coalescing concurrent lookups, see the module."""
+
+    def __init__(
+        self,
+        batch_fn: Callable[[Hashable, list[Hashable]], dict[Hashable, Any]],
+        window_seconds: float = 0.002,
+        max_batch: int = 100,
+    ):
+        """
+        Args:
+            batch_fn: Called with (group, keys), returns {key: value}; keys
+                missing from the result resolve to None
+            window_seconds: How long the first caller waits for others
+            max_batch: Keys per batch; a full batch runs immediately
+        """
+        super().__init__(batch_fn, window_seconds, max_batch)
+        self._futures: dict[tuple[Hashable, Hashable], Future] = {}
+        self.loads = 0
+        self.coalesced = 0
+
+    def load(self, key: Hashable, group: Hashable = None) -> Any:
+        """Return the value of key, loaded together with concurrent calls."""
+        leader_of = None
+        with self._lock:
+            self.loads += 1
+            future = self._futures.get((group, key))
+            if future is not None:
+                self.coalesced += 1
+            else:
+                future, leader_of = self._add(group, key)
+                self._futures[group, key] = future
+        if leader_of is not None:
+            self._lead(group, leader_of)
+        return future.result()
+
+    def _call(self, group: Hashable, keys: list[Hashable]) -> list[Any]:
+        values = self.batch_fn(group, keys)
+        return [values.get(key) for key in keys]
+
+    def _finished(self, group: Hashable, keys: list[Hashable]) -> None:
+        with self._lock:
+            for key in keys:
+                del self._futures[group, key]
+
+    def stats(self) -> dict:
+        """Counters showing how much the loader saves."""
+        with self._lock:
+            return {
+                "loads": self.loads,
+                "coalesced": self.coalesced,
+                **self._batch_stats(),
+                "queries_saved": self.loads - self.batches,
+            }
+
+
+class BatchWriter(_ThreadBatcher):
+    """Thread-safe group commit of concurrent writes, see the module."""
+
+    def __init__(
+        self,
+        batch_fn: Callable[[Hashable, list[Any]], Sequence[Any]],
+        window_seconds: float = 0.002,
+        max_batch: int = 100,
+    ):
+        """
+        Args:
+            batch_fn: Called with (group, items), writes them at once and
+                returns one result per item, in order; an exception result
+                is raised to that item's caller
+            window_seconds: How long the first caller waits for others
+            max_batch: Items per batch; a full batch runs immediately
+        """
+        super().__init__(batch_fn, window_seconds, max_batch)
+        self.submitted = 0
+
+    def submit(self, item: Any, group: Hashable = None) -> Any:
+        """Write item together with concurrent calls and return its result."""
+        with self._lock:
+            self.submitted += 1
+            future, leader_of = self._add(group, item)
+        if leader_of is not None:
+            self._lead(group, leader_of)
+        return _item_result(future.result())
+
+    def _call(self, group: Hashable, items: list[Any]) -> Sequence[Any]:
+        return self.batch_fn(group, items)
+
+    def stats(self) -> dict:
+        """Counters showing how many transactions group commit saves."""
+        with self._lock:
+            return {
+                "submitted": self.submitted,
+                **self._batch_stats(),
+                "transactions_saved": self.submitted - self.batches,
+            }
+
+
+class _AsyncBatcher:
+    """
+    Batching for callers on one event loop, see _ThreadBatcher.
+
+    With no batch of the group running, the window is the current loop
+    iteration: callers started together (e.g. by gather) still share a batch.
+    """
+
+    def __init__(self, batch_fn: Callable, window_seconds: float, max_batch: int):
+        self.batch_fn = batch_fn
+        self.window_seconds = window_seconds
+        self.max_batch = max_batch
+        self._open: dict[Hashable, tuple[_Batch, asyncio.Handle]] = {}
+        self._running: dict[Hashable, int] = {}
+        # The loop only keeps weak references to tasks
+        self._tasks: set[asyncio.Task] = set()
+        self.batches = 0
+        self.batched_items = 0
+
+    def _add(self, group: Hashable, item: Any) -> asyncio.Future:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        if group not in self._open:
+            if self._running.get(group):
+                timer = loop.call_later(self.window_seconds, self._dispatch, group)
+            else:
+                timer = loop.call_soon(self._dispatch, group)
+            self._open[group] = (_Batch(), timer)
+        batch, timer = self._open[group]
+        batch.items.append(item)
+        batch.futures.append(future)
+        if len(batch.items) >= self.max_batch:
+            timer.cancel()
+            self._dispatch(group)
+        return future
+
+    def _dispatch(self, group: Hashable) -> None:
+        batch, _ = self._open.pop(group)
+        self._running[group] = self._running.get(group, 0) + 1
+        self.batches += 1
+        self.batched_items += len(batch.items)
+        task = asyncio.get_running_loop().create_task(self._run(group, batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, group: Hashable, batch: _Batch) -> None:
+        try:
+            results = await self._call(group, batch.items)
+        except BaseException as exc:
+            for future in batch.futures:
+                if not future.done():
+                    future.set_exception(exc)
+        else:
+            for future, result in zip(batch.futures, results):
+                if not future.done():
+                    future.set_result(result)
+        finally:
+            self._running[group] -= 1
+            if not self._running[group]:
+                del self._running[group]
+            self._finished(group, batch.items)
+
+    async def _call(self, group: Hashable, items: list[Any]) -> Sequence[Any]:
+        raise NotImplementedError
+
+    def _finished(self, group: Hashable, items: list[Any]) -> None:
+        pass
+
+    def _batch_stats(self) -> dict:
+        return {
+            "batches": self.batches,
+            "mean_batch_size": (
+                self.batched_items / self.batches if self.batches else 0.0
+            ),
+        }
+
+
+class AsyncBatchLoader(_AsyncBatcher):
+    """Loader for callers on one event loop, see BatchLoader."""
+
+    def __init__(
+        self,
+        batch_fn: Callable[[Hashable, list[Hashable]], Awaitable[dict[Hashable, Any]]],
+        window_seconds: float = 0.002,
+        max_batch: int = 100,
+    ):
+        super().__init__(batch_fn, window_seconds, max_batch)
+        self._futures: dict[tuple[Hashable, Hashable], asyncio.Future] = {}
+        self.loads = 0
+        self.coalesced = 0
+
+    async def load(self, key: Hashable, group: Hashable = None) -> Any:
+        """Return the value of key, loaded together with concurrent calls."""
+        self.loads += 1
+        future = self._futures.get((group, key))
+        if future is not None:
+            self.coalesced += 1
+        else:
+            future = self._futures[group, key] = self._add(group, key)
+        # Shielded: a cancelled caller must not cancel the others' result
+        return await asyncio.shield(future)
+
+    async def _call(self, group: Hashable, keys: list[Hashable]) -> list[Any]:
+        values = await self.batch_fn(group, keys)
+        return [values.get(key) for key in keys]
+
+    def _finished(self, group: Hashable, keys: list[Hashable]) -> None:
+        for key in keys:
+            del self._futures[group, key]
+
+    def stats(self) -> dict:
+        return {
+            "loads": self.loads,
+            "coalesced": self.coalesced,
+            **self._batch_stats(),
+            "queries_saved": self.loads - self.batches,
+        }
+
+
+class AsyncBatchWriter(_AsyncBatcher):
+    """Group commit for callers on one event loop, see BatchWriter."""
+
+    def __init__(
+        self,
+        batch_fn: Callable[[Hashable, list[Any]], Awaitable[Sequence[Any]]],
+        window_seconds: float = 0.002,
+        max_batch: int = 100,
+    ):
+        super().__init__(batch_fn, window_seconds, max_batch)
+        self.submitted = 0
+
+    async def submit(self, item: Any, group: Hashable = None) -> Any:
+        """Write item together with concurrent calls and return its result."""
+        self.submitted += 1
+        # Shielded: the write goes ahead even if this caller is cancelled
+        return _item_result(await asyncio.shield(self._add(group, item)))
+
+    async def _call(self, group: Hashable, items: list[Any]) -> Sequence[Any]:
+        return await self.batch_fn(group, items)
+
+    def stats(self) -> dict:
+        return {
+            "submitted": self.submitted,
+            **self._batch_stats(),
+            "transactions_saved": self.submitted - self.batches,
+        }
@@ -0,0 +1,114 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable
+
+# Returned by TTLLRUCache.get when the key is not cached (None is a valid,
+# negatively cached value)
+MISS = object()
+
+
+class TTLLRUCache:
+    """
+    Thread-safe in-process LRU cache whose entries also expire after a TTL.
+
+    Negative results (None) can be cached with their own, usually shorter,
+    TTL so repeated lookups of missing keys do not reach the database either.
+
+    Read-through fills pass the generation read before their query to set():
+    a value read while invalidate() ran may be the old row, and is not kept.
+    """
+
+    def __init__(self, maxsize: int, ttl_seconds: float, negative_ttl_seconds: float):
+        """
+        Args:
+            maxsize: Maximum number of entries before the least recently used
+                one is evicted
+            ttl_seconds: Lifetime of cached values
+            negative_ttl_seconds: Lifetime of cached misses (None values)
+        """
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        self.generation = 0
+
+    def get(self, key: Hashable) -> Any:
+        """Return the cached value (possibly None) or MISS."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return MISS
+            expires_at, value = entry
+            if expires_at <= now:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return MISS
+            self._entries.move_to_end(key)
+            if value is None:
+                self.negative_hits += 1
+            else:
+                self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, generation: int | None = None) -> None:
+        """
+        Cache a value; None is cached as a negative entry.
+
+        Args:
+            generation: The cache's generation when value was read; the value
+                is dropped if an invalidation happened since
+        """
+        if self.maxsize <= 0:
+            return
+        ttl = self.negative_ttl_seconds if value is None else self.ttl_seconds
+        if ttl <= 0:
+            return
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, *keys: Hashable) -> None:
+        """Drop the given keys if present, and discard fills in flight."""
+        with self._lock:
+            self.generation += 1
+            for key in keys:
+                if self._entries.pop(key, MISS) is not MISS:
+                    self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        """Counters used to size the cache."""
+        with self._lock:
+            lookups = self.hits + self.negative_hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "negative_hits": self.negative_hits,
+                "misses": self.misses,
+                "hit_ratio": (
+                    (self.hits + self.negative_hits) / lookups if lookups else 0.0
+                ),
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
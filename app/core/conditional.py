@@ -0,0 +1,125 @@
+"""
+Conditional GET helpers.
+
+A page of users is identified by a PageVersion: row count, newest creation
+and modification times and a checksum of the ids and write times in the
+window. It is computed by the database from the (create_at, id) index
+alone, so a client polling with If-None-Match gets a 304 without the page
+being fetched, hydrated or serialized.
+"""
+
+import hashlib
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from uuid import UUID
+
+from starlette.datastructures import URL
+
+from app.core.pagination import encode_cursor
+
+
+def weak_etag(*parts: object) -> str:
+    digest = hashlib.blake2b("|".join(map(str, parts)).encode(), digest_size=12)
+    return f'W/"{digest.hexdigest()}"'
+
+
+@dataclass(frozen=True)
+class PageVersion:
+    """What changes whenever a row of a users page is added, removed or updated."""
+
+    count: int
+    last_create_at: datetime | None
+    last_id: UUID | None
+    last_modified: datetime | None
+    checksum: int
+
+    def etag(self, *extra: object) -> str:
+        """Weak ETag of the page; extra parts (e.g. a total count) are mixed in."""
+        return weak_etag(
+            self.count,
+            self.last_create_at and self.last_create_at.isoformat(),
+            self.last_id,
+            self.last_modified and self.last_modified.isoformat(),
+            self.checksum,
+            *extra,
+        )
+
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def user_version(create_at: datetime, update_at: datetime | None) -> datetime:
+    """Last write time of a user: what PATCH If-Match preconditions compare."""
+    return update_at or create_at
+
+
+def user_etag(create_at: datetime, update_at: datetime | None) -> str:
+    """
+    Strong ETag of a single user: its last write time in microseconds.
+
+    Strong, so it can be sent back in If-Match, and reversible, so PATCH can
+    turn it into a WHERE condition instead of reading the row first.
+    """
+    version = user_version(create_at, update_at)
+    return f'"{(version - EPOCH) // timedelta(microseconds=1)}"'
+
+
+def if_match_versions(if_match: str) -> list[datetime] | None:
+    """
+    User versions listed in an If-Match header, None for "*" (any version).
+
+    If-Match uses strong comparison, so weak and foreign tags are dropped;
+    an empty list can match nothing.
+    """
+    if if_match.strip() == "*":
+        return None
+    versions = []
+    for tag in if_match.split(","):
+        tag = tag.strip()
+        if tag.startswith('"') and tag.endswith('"') and tag[1:-1].isdigit():
+            versions.append(EPOCH + timedelta(microseconds=int(tag[1:-1])))
+    return versions
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """
+    Weak comparison of an If-None-Match header with the current ETag.
+
+    Handles lists of tags and "*"; the W/ prefix is ignored on both sides.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    current = etag.removeprefix("W/")
+    return any(
+        tag.strip().removeprefix("W/") == current for tag in if_none_match.split(",")
+    )
+
+
+def http_date(value: datetime) -> str:
+    """Format a datetime for Last-Modified (always GMT, second precision)."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+
+def page_headers(
+    url: URL, version: PageVersion, limit: int, etag: str
+) -> dict[str, str]:
+    """
+    Validators and next-page links of a users page, for 200 and 304 alike.
+
+    Clients are asked to revalidate every time (no-cache), which costs them
+    a 304 while the page is unchanged.
+    """
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if version.last_modified is not None:
+        headers["Last-Modified"] = http_date(version.last_modified)
+    if version.count >= limit:
+        cursor = encode_cursor(version.last_create_at, version.last_id)
+        next_url = url.remove_query_params("offset").include_query_params(cursor=cursor)
+        headers["X-Next-Cursor"] = cursor
+        headers["Link"] = f'<{next_url}>; rel="next"'
+    return headers
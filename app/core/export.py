@@ -0,0 +1,34 @@
+import csv
+import io
+import json
+from typing import Iterable, Sequence
+
+EXPORT_FIELDS = ("id", "email", "full_name", "is_active", "create_at")
+
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+def _values(row: Sequence) -> tuple:
+    user_id, email, full_name, is_active, create_at = row
+    return str(user_id), email, full_name, is_active, create_at.isoformat()
+
+
+def encode_ndjson(rows: Iterable[Sequence]) -> bytes:
+    """Encode a batch of export rows as NDJSON, one object per line."""
+    return "".join(
+        json.dumps(dict(zip(EXPORT_FIELDS, _values(row))), ensure_ascii=False) + "\n"
+        for row in rows
+    ).encode("utf-8")
+
+
+def encode_csv(rows: Iterable[Sequence], header: bool = False) -> bytes:
+    """Encode a batch of export rows as CSV, optionally preceded by the header."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(EXPORT_FIELDS)
+    writer.writerows(_values(row) for row in rows)
+    return buffer.getvalue().encode("utf-8")
@@ -0,0 +1,254 @@
+"""
+Password hashing subsystem.
+
+bcrypt is deliberately slow CPU work, so it runs in a bounded process pool
+instead of the request's threadpool thread. The number of pending jobs is
+capped: when the pool is saturated, callers are rejected immediately rather
+than queueing behind hundreds of hashes.
+"""
+
+import asyncio
+import math
+import os
+import statistics
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from functools import lru_cache
+
+from app.config.settings import get_settings
+from app.core.security import get_hash_password, verify_password
+
+MAX_BCRYPT_ROUNDS = 16
+
+
+class HashingSaturatedError(Exception):
+    """Raised when the hashing pool already has max_pending jobs in flight."""
+
+
+def _hash_job(password: str, rounds: int) -> tuple[str, float, float]:
+    started = time.time()
+    hashed = get_hash_password(password, rounds=rounds)
+    return hashed, started, time.time()
+
+
+def _verify_job(plain: str, hashed: str) -> tuple[bool, float, float]:
+    started = time.time()
+    valid = verify_password(plain, hashed)
+    return valid, started, time.time()
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt hash/verify jobs on a process pool sized to the cores.
+
+    Tracks how long jobs wait for a free worker (queue wait) separately from
+    the time spent hashing, so saturation is visible before latency is.
+    """
+
+    def __init__(
+        self,
+        max_workers: int | None = None,
+        max_pending: int = 64,
+        rounds: int = 12,
+    ):
+        """
+        Args:
+            max_workers: Worker processes (default: number of CPU cores)
+            max_pending: Jobs allowed in flight before rejecting new ones
+            rounds: bcrypt cost factor used for new hashes
+        """
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_pending = max_pending
+        self.rounds = rounds
+        self._executor: ProcessPoolExecutor | None = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._completed = 0
+        self._rejected = 0
+        self._queue_wait_total = 0.0
+        self._queue_wait_max = 0.0
+        self._hash_time_total = 0.0
+        self._hash_time_max = 0.0
+
+    def start(self) -> None:
+        """Create the process pool if it is not running yet."""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+
+    def shutdown(self) -> None:
+        """Stop the worker processes."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def submit_hash(self, password: str) -> Future:
+        """Schedule a hash job. Raises HashingSaturatedError when saturated."""
+        return self._submit(_hash_job, password, self.rounds)
+
+    def submit_verify(self, plain: str, hashed: str) -> Future:
+        """Schedule a verify job. Raises HashingSaturatedError when saturated."""
+        return self._submit(_verify_job, plain, hashed)
+
+    def hash_many(self, passwords: list[str]) -> list[str]:
+        """
+        Hash a batch of passwords in parallel across all workers.
+
+        Each password is admitted as its own pending job, with at most half
+        of max_pending in flight for the batch: a bulk import waits for its
+        own jobs rather than filling the queue, and is rejected only when it
+        cannot start at all.
+        """
+        if not passwords:
+            return []
+        if self._executor is None:
+            self.start()
+        window = max(1, self.max_pending // 2)
+        in_flight: deque[Future] = deque()
+        hashed = []
+        for password in passwords:
+            while len(in_flight) >= window or not self._try_acquire():
+                if not in_flight:
+                    # Other callers hold every slot: reject, or take one freed
+                    self._acquire()
+                    break
+                hashed.append(in_flight.popleft().result())
+            in_flight.append(self._start(_hash_job, password, self.rounds))
+        hashed.extend(future.result() for future in in_flight)
+        return hashed
+
+    def hash(self, password: str) -> str:
+        """Hash a password, blocking the calling thread until it is done."""
+        return self.submit_hash(password).result()
+
+    def verify(self, plain: str, hashed: str) -> bool:
+        """Verify a password, blocking the calling thread until it is done."""
+        return self.submit_verify(plain, hashed).result()
+
+    async def hash_async(self, password: str) -> str:
+        """Hash a password without blocking the event loop."""
+        return await asyncio.wrap_future(self.submit_hash(password))
+
+    async def verify_async(self, plain: str, hashed: str) -> bool:
+        """Verify a password without blocking the event loop."""
+        return await asyncio.wrap_future(self.submit_verify(plain, hashed))
+
+    def calibrate(
+        self, target_ms: float, min_rounds: int = 10, samples: int = 3
+    ) -> int:
+        """
+        Pick the highest bcrypt cost whose hash time stays under target_ms.
+
+        Each extra round doubles the work, so a single measurement at
+        min_rounds is enough to extrapolate.
+
+        Args:
+            target_ms: Target latency of one hash on this machine
+            min_rounds: Lower bound for the cost, never calibrated below it
+            samples: Measurements taken at min_rounds (the median is used)
+
+        Returns:
+            int: The selected rounds, also stored on the hasher
+        """
+        timings = []
+        for _ in range(samples):
+            started = time.perf_counter()
+            get_hash_password("calibration-password", rounds=min_rounds)
+            timings.append((time.perf_counter() - started) * 1000)
+        baseline_ms = max(statistics.median(timings), 1e-3)
+
+        extra = math.floor(math.log2(target_ms / baseline_ms)) if target_ms > 0 else 0
+        self.rounds = min(max(min_rounds + extra, min_rounds), MAX_BCRYPT_ROUNDS)
+        return self.rounds
+
+    def stats(self) -> dict:
+        """Snapshot of pool usage and timing counters."""
+        with self._lock:
+            completed = self._completed or 1
+            return {
+                "workers": self.max_workers,
+                "rounds": self.rounds,
+                "pending": self._pending,
+                "max_pending": self.max_pending,
+                "completed": self._completed,
+                "rejected": self._rejected,
+                "queue_wait_ms_avg": self._queue_wait_total / completed * 1000,
+                "queue_wait_ms_max": self._queue_wait_max * 1000,
+                "hash_ms_avg": self._hash_time_total / completed * 1000,
+                "hash_ms_max": self._hash_time_max * 1000,
+            }
+
+    def _submit(self, job, *args) -> Future:
+        if self._executor is None:
+            self.start()
+
+        self._acquire()
+        return self._start(job, *args)
+
+    def _start(self, job, *args) -> Future:
+        """Run a job on the pool; its slot is already acquired."""
+        submitted = time.time()
+        try:
+            inner = self._executor.submit(job, *args)
+        except BaseException:
+            # Shut down or broken pool: the job never ran, give its slot back
+            self._release()
+            raise
+        outer: Future = Future()
+
+        def _done(future: Future) -> None:
+            self._release()
+            if future.cancelled():
+                outer.cancel()
+                return
+            error = future.exception()
+            if error is not None:
+                outer.set_exception(error)
+                return
+            value, started, finished = future.result()
+            self._record(started - submitted, finished - started)
+            outer.set_result(value)
+
+        inner.add_done_callback(_done)
+        return outer
+
+    def _acquire(self) -> None:
+        if not self._try_acquire():
+            with self._lock:
+                self._rejected += 1
+            raise HashingSaturatedError(
+                f"{self._pending} hashing jobs pending (limit {self.max_pending})"
+            )
+
+    def _try_acquire(self) -> bool:
+        with self._lock:
+            if self._pending >= self.max_pending:
+                return False
+            self._pending += 1
+            return True
+
+    def _release(self) -> None:
+        with self._lock:
+            self._pending -= 1
+
+    def _record(self, queue_wait: float, hash_time: float) -> None:
+        queue_wait = max(queue_wait, 0.0)
+        with self._lock:
+            self._completed += 1
+            self._queue_wait_total += queue_wait
+            self._queue_wait_max = max(self._queue_wait_max, queue_wait)
+            self._hash_time_total += hash_time
+            self._hash_time_max = max(self._hash_time_max, hash_time)
+
+
+@lru_cache()
+def get_password_hasher() -> PasswordHasher:
+    settings = get_settings()
+    return PasswordHasher(
+        max_workers=settings.hash_workers or None,
+        max_pending=settings.hash_max_pending,
+        rounds=settings.bcrypt_rounds or 12,
+    )
@@ -0,0 +1,80 @@
+import json
+from typing import Any
+
+from fastapi import HTTPException, Request, status
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+async def read_json_items(request: Request, max_items: int) -> list[Any]:
+    """
+    Read a request body holding many JSON items.
+
+    Accepts either a JSON array (application/json) or one JSON document per
+    line (application/x-ndjson). NDJSON is decoded as it streams in, so the
+    raw body is never buffered whole.
+
+    Args:
+        request: Incoming request
+        max_items: Upper bound on the number of items
+
+    Raises:
+        HTTPException: 400 on malformed JSON, 413 when over max_items
+    """
+    content_type = request.headers.get("content-type", "")
+    try:
+        if content_type.startswith(NDJSON_MEDIA_TYPE):
+            items = await _read_ndjson(request, max_items)
+        else:
+            items = json.loads(await request.body())
+    except (json.JSONDecodeError, UnicodeDecodeError) as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=f"Malformed JSON: {exc}"
+        )
+
+    if not isinstance(items, list):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Expected a JSON array"
+        )
+    _check_size(len(items), max_items)
+    return items
+
+
+async def _read_ndjson(request: Request, max_items: int) -> list[Any]:
+    items: list[Any] = []
+    buffer = b""
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        items.extend(json.loads(line) for line in lines if line.strip())
+        _check_size(len(items), max_items)
+    if buffer.strip():
+        items.append(json.loads(buffer))
+    return items
+
+
+def _check_size(count: int, max_items: int) -> None:
+    if count > max_items:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"At most {max_items} items per request",
+        )
+
+
+def json_items_request_body(schema_name: str) -> dict:
+    """OpenAPI requestBody for an endpoint reading items with read_json_items."""
+    items_schema = {
+        "type": "array",
+        "items": {"$ref": f"#/components/schemas/{schema_name}"},
+    }
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {"schema": items_schema},
+                NDJSON_MEDIA_TYPE: {
+                    "schema": {"$ref": f"#/components/schemas/{schema_name}"}
+                },
+            },
+        }
+    }
@@ -0,0 +1,46 @@
+import functools
+import threading
+from typing import Callable, Generic, TypeVar
+
+T = TypeVar("T")
+
+_UNSET = object()
+
+
+class LazySingleton(Generic[T]):
+    """
+    Zero-argument factory whose result is built on the first call and
+    reused afterwards.
+
+    Like lru_cache() on a factory, but concurrent first calls build the value
+    only once, which matters for engines and process-wide registrations.
+    """
+
+    def __init__(self, factory: Callable[[], T]):
+        self.factory = factory
+        self._value = _UNSET
+        self._lock = threading.Lock()
+        functools.update_wrapper(self, factory)
+
+    def __call__(self) -> T:
+        value = self._value
+        if value is _UNSET:
+            with self._lock:
+                if self._value is _UNSET:
+                    self._value = self.factory()
+                value = self._value
+        return value
+
+    def is_built(self) -> bool:
+        """True once the value exists; lets shutdown skip what was never used."""
+        return self._value is not _UNSET
+
+    def cache_clear(self) -> None:
+        """Forget the value; the next call builds a new one."""
+        with self._lock:
+            self._value = _UNSET
+
+
+def lazy_singleton(factory: Callable[[], T]) -> LazySingleton[T]:
+    """Decorator form of LazySingleton."""
+    return LazySingleton(factory)
@@ -0,0 +1,183 @@
+"""
+Prometheus metrics.
+
+Request latency is recorded per route template and status by MetricsMiddleware,
+database statement latency by the cursor hooks in app/db/instrumentation.py,
+threadpool queue wait by InstrumentedRoute and admission decisions by
+AdmissionController. GET /metrics renders them in
+the Prometheus text format.
+
+Under the multi-process server (app/server.py) every worker writes its
+values to PROMETHEUS_MULTIPROC_DIR, and GET /metrics aggregates all workers,
+whichever one serves it. Gauges say how: limits per live worker, in-flight
+requests summed over the live ones.
+"""
+
+import functools
+import inspect
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Callable, Generator
+
+from fastapi.routing import APIRoute
+from prometheus_client import Counter, Gauge, Histogram
+from starlette.concurrency import run_in_threadpool
+
+from app.config.settings import get_settings
+
+# Buckets from 1ms to 10s; bcrypt-bound registrations land around 250ms
+LATENCY_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency until the response body is sent",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+DB_STATEMENT_LATENCY = Histogram(
+    "db_statement_duration_seconds",
+    "Database statement latency, from cursor execute to result",
+    ["operation"],
+    buckets=LATENCY_BUCKETS,
+)
+THREADPOOL_QUEUE_WAIT = Histogram(
+    "threadpool_queue_wait_seconds",
+    "Time a sync endpoint waits for a threadpool worker",
+    buckets=LATENCY_BUCKETS,
+)
+
+ADMISSION_DECISIONS = Counter(
+    "admission_decisions_total",
+    "Admission control decisions by route class: admitted (at once or after "
+    "waiting) or shed (queue full or wait timed out)",
+    ["route_class", "decision"],
+)
+ADMISSION_LIMIT = Gauge(
+    "admission_concurrency_limit",
+    "Current adaptive concurrency limit of a route class",
+    ["route_class"],
+    multiprocess_mode="liveall",
+)
+ADMISSION_INFLIGHT = Gauge(
+    "admission_inflight_requests",
+    "Admitted requests of a route class still being served",
+    ["route_class"],
+    multiprocess_mode="livesum",
+)
+ADMISSION_QUEUE_WAIT = Histogram(
+    "admission_queue_wait_seconds",
+    "Time an admitted request waited in the admission queue",
+    ["route_class"],
+    buckets=LATENCY_BUCKETS,
+)
+
+# Label for requests that matched no route, so 404 scans do not create series
+UNMATCHED_ROUTE = "unmatched"
+
+
+@dataclass
+class RequestTimings:
+    """Time the request currently being served spent outside its own code."""
+
+    queue_wait_seconds: float = 0.0
+
+
+_request_timings: ContextVar[RequestTimings | None] = ContextVar(
+    "request_timings", default=None
+)
+
+
+@contextmanager
+def track_request_timings() -> Generator[RequestTimings, None, None]:
+    """Collect RequestTimings for everything run inside the block."""
+    timings = RequestTimings()
+    token = _request_timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _request_timings.reset(token)
+
+
+def route_label(scope: dict) -> str:
+    """Route template ("/users/{user_id}") of a routed request scope."""
+    route = scope.get("route")
+    if route is not None:
+        return route.path
+    # Plain Starlette routes (docs, openapi.json) only record the endpoint;
+    # they have no path parameters, so the path is the template
+    if "endpoint" in scope:
+        return scope["path"]
+    return UNMATCHED_ROUTE
+
+
+def server_timing(
+    total_seconds: float, db_seconds: float, statements: int, queue_seconds: float
+) -> str:
+    """Server-Timing header value (durations in milliseconds)."""
+    return (
+        f'db;dur={db_seconds * 1000:.2f};desc="statements: {statements}", '
+        f"queue;dur={queue_seconds * 1000:.2f}, "
+        f"app;dur={total_seconds * 1000:.2f}"
+    )
+
+
+def timed_threadpool_endpoint(endpoint: Callable[..., Any]) -> Callable[..., Any]:
+    """
+    Run a sync endpoint in the threadpool like FastAPI does, but record how
+    long it waited for a worker thread first.
+
+    The wrapper keeps the endpoint's name and signature, so FastAPI builds the
+    same dependencies, parameters and OpenAPI schema from it.
+    """
+
+    @functools.wraps(endpoint)
+    async def wrapper(*args, **kwargs):
+        submitted = time.perf_counter()
+
+        def run():
+            waited = time.perf_counter() - submitted
+            THREADPOOL_QUEUE_WAIT.observe(waited)
+            timings = _request_timings.get()
+            if timings is not None:
+                timings.queue_wait_seconds += waited
+            return endpoint(*args, **kwargs)
+
+        return await run_in_threadpool(run)
+
+    # FastAPI unwraps __wrapped__ to decide whether to use the threadpool;
+    # the wrapper is async, so only the signature may point at the endpoint
+    del wrapper.__wrapped__
+    wrapper.__signature__ = inspect.signature(endpoint)
+    return wrapper
+
+
+class InstrumentedRoute(APIRoute):
+    """
+    APIRoute that records threadpool queue wait of sync endpoints (when
+    METRICS_ENABLED).
+    """
+
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs):
+        if (
+            get_settings().metrics_enabled
+            and inspect.isfunction(endpoint)
+            and not inspect.iscoroutinefunction(endpoint)
+        ):
+            endpoint = timed_threadpool_endpoint(endpoint)
+        super().__init__(path, endpoint, **kwargs)
@@ -0,0 +1,213 @@
+import math
+import time
+
+from starlette.datastructures import MutableHeaders
+from starlette.requests import HTTPConnection
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.admission import SAFE_METHODS, AdmissionController, route_class
+from app.core.metrics import (
+    REQUEST_LATENCY,
+    route_label,
+    server_timing,
+    track_request_timings,
+)
+from app.clients.replicas import use_primary
+from app.core.startup import startup_report
+from app.db.instrumentation import track_request_db_stats
+
+
+class DbStatsMiddleware:
+    """
+    Tracks database usage per HTTP request and reports it in response headers.
+
+    X-DB-Checkouts: connection pool checkouts made while serving the request
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with track_request_db_stats() as stats:
+
+            async def send_with_stats(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    headers = MutableHeaders(scope=message)
+                    headers["X-DB-Checkouts"] = str(stats.checkouts)
+                await send(message)
+
+            await self.app(scope, receive, send_with_stats)
+
+
+class MetricsMiddleware:
+    """
+    Records request latency by method, route template and status, and tells
+    the client where the time went.
+
+    Server-Timing: db (statement time and count), queue (threadpool wait) and
+    app (total until the response starts)
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = 500
+        with track_request_db_stats() as db_stats, track_request_timings() as timings:
+
+            async def send_with_timing(message: Message) -> None:
+                nonlocal status
+                if message["type"] == "http.response.start":
+                    status = message["status"]
+                    headers = MutableHeaders(scope=message)
+                    headers["Server-Timing"] = server_timing(
+                        time.perf_counter() - started,
+                        db_stats.statement_seconds,
+                        db_stats.statements,
+                        timings.queue_wait_seconds,
+                    )
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_timing)
+            finally:
+                # The router stores the matched route in the shared scope
+                REQUEST_LATENCY.labels(
+                    scope["method"], route_label(scope), str(status)
+                ).observe(time.perf_counter() - started)
+
+
+class AdmissionMiddleware:
+    """
+    Sheds the requests AdmissionController has no capacity for with 503 and
+    Retry-After, before any routing or database work.
+
+    The latency fed back to the controller is the time to the response
+    start, so long streamed bodies (exports) do not count as slow.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        controller: AdmissionController,
+        retry_after_seconds: int = 1,
+    ):
+        self.app = app
+        self.controller = controller
+        self.retry_after_seconds = retry_after_seconds
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        name = route_class(scope["method"], scope["path"])
+        if name is None:
+            await self.app(scope, receive, send)
+            return
+
+        if not await self.controller.acquire(name):
+            response = JSONResponse(
+                {"detail": "Server is overloaded, retry shortly"},
+                status_code=503,
+                headers={"Retry-After": str(self.retry_after_seconds)},
+            )
+            await response(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        latency = None
+
+        async def send_with_latency(message: Message) -> None:
+            nonlocal latency
+            if message["type"] == "http.response.start":
+                latency = time.perf_counter() - started
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_latency)
+        finally:
+            if latency is None:
+                latency = time.perf_counter() - started
+            self.controller.release(name, latency)
+
+
+class ReadYourWritesMiddleware:
+    """
+    Keeps a client's reads on the primary while its writes may not have
+    reached the replicas yet.
+
+    Requests with unsafe methods run entirely on the primary and set a cookie
+    that pins the same client's following requests to the primary for
+    window_seconds.
+    """
+
+    cookie_name = "read_primary_until"
+
+    def __init__(self, app: ASGIApp, window_seconds: float):
+        self.app = app
+        self.window_seconds = window_seconds
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        writes = scope["method"] not in SAFE_METHODS
+        if not writes and not self._pinned(scope):
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_cookie(message: Message) -> None:
+            if writes and message["type"] == "http.response.start":
+                until = time.time() + self.window_seconds
+                headers = MutableHeaders(scope=message)
+                headers.append(
+                    "Set-Cookie",
+                    f"{self.cookie_name}={until:.0f}; "
+                    f"Max-Age={math.ceil(self.window_seconds)}; "
+                    "Path=/; HttpOnly; SameSite=Lax",
+                )
+            await send(message)
+
+        with use_primary():
+            await self.app(scope, receive, send_with_cookie)
+
+    def _pinned(self, scope: Scope) -> bool:
+        value = HTTPConnection(scope).cookies.get(self.cookie_name)
+        try:
+            return value is not None and float(value) > time.time()
+        except ValueError:
+            return False
+
+
+class StartupReportMiddleware:
+    """
+    Records how long the first HTTP request took in the startup report; a
+    plain pass-through afterwards.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self.pending = True
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if not self.pending or scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        self.pending = False
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            startup_report.record_first_request(started)
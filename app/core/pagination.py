@@ -0,0 +1,157 @@
+import base64
+import binascii
+import json
+import threading
+import time
+from datetime import datetime
+from typing import Awaitable, Callable, Sequence
+from uuid import UUID
+
+from app.config.settings import get_settings
+from app.core.lazy import lazy_singleton
+
+
+def encode_cursor(create_at: datetime, user_id: UUID) -> str:
+    """
+    Build an opaque keyset cursor pointing right after (create_at, id).
+
+    Args:
+        create_at: Creation timestamp of the last row in the page
+        user_id: ID of the last row in the page
+
+    Returns:
+        str: URL-safe cursor string
+    """
+    raw = f"{create_at.isoformat()}|{user_id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, UUID]:
+    """
+    Decode a cursor produced by encode_cursor.
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8")
+        create_at, user_id = raw.split("|")
+        return datetime.fromisoformat(create_at), UUID(user_id)
+    except (binascii.Error, UnicodeError, ValueError) as exc:
+        raise ValueError("Invalid cursor") from exc
+
+
+def encode_search_cursor(rank: int, sort_key: str, user_id: UUID) -> str:
+    """
+    Build an opaque cursor pointing right after a search result.
+
+    Args:
+        rank: Match rank of the last row in the page
+        sort_key: Lowercased email of the last row in the page
+        user_id: ID of the last row in the page
+    """
+    raw = json.dumps([rank, sort_key, str(user_id)]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def decode_search_cursor(cursor: str) -> tuple[int, str, UUID]:
+    """
+    Decode a cursor produced by encode_search_cursor.
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        rank, sort_key, user_id = json.loads(base64.urlsafe_b64decode(padded))
+        if not isinstance(rank, int) or not isinstance(sort_key, str):
+            raise ValueError("Invalid cursor")
+        return rank, sort_key, UUID(user_id)
+    except (binascii.Error, UnicodeError, TypeError, ValueError) as exc:
+        raise ValueError("Invalid cursor") from exc
+
+
+class CountCache:
+    """
+    Keeps expensive count(*) results for a short TTL so that clients asking
+    for an exact total on every page do not rescan the table every time.
+
+    Writes call invalidate() once committed; a count that was computed while
+    a write happened is not stored, as it may not include that write.
+    """
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._values: dict[str, tuple[float, int]] = {}
+        self._lock = threading.Lock()
+        self.generation = 0
+
+    def get_or_compute(self, key: str, compute: Callable[[], int]) -> int:
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+
+        generation = self.generation
+        value = compute()
+        self.set(key, value, generation)
+        return value
+
+    async def get_or_compute_async(
+        self, key: str, compute: Callable[[], Awaitable[int]]
+    ) -> int:
+        """get_or_compute() for a coroutine function computing the count."""
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+
+        generation = self.generation
+        value = await compute()
+        self.set(key, value, generation)
+        return value
+
+    def set(self, key: str, value: int, generation: int | None = None) -> None:
+        """Store value, unless invalidate() ran since ``generation`` was read."""
+        with self._lock:
+            if generation is None or generation == self.generation:
+                self._values[key] = (time.monotonic(), value)
+
+    def get(self, key: str) -> int | None:
+        with self._lock:
+            cached = self._values.get(key)
+        if cached and time.monotonic() - cached[0] < self.ttl_seconds:
+            return cached[1]
+        return None
+
+    def invalidate(self, key: str) -> None:
+        with self._lock:
+            self._values.pop(key, None)
+            self.generation += 1
+
+
+@lazy_singleton
+def get_count_cache() -> CountCache:
+    """Exact user counts of this process, reused for USER_COUNT_TTL_SECONDS."""
+    return CountCache(ttl_seconds=get_settings().user_count_ttl_seconds)
+
+
+def next_cursor(items: Sequence, limit: int) -> str | None:
+    """
+    Cursor for the page after ``items``, or None when this was the last page.
+
+    Args:
+        items: Rows of the current page, exposing create_at and id
+        limit: Requested page size
+    """
+    if len(items) < limit:
+        return None
+    last = items[-1]
+    return encode_cursor(last.create_at, last.id)
+
+
+def next_search_cursor(rows: Sequence, limit: int) -> str | None:
+    """Cursor for the search page after ``rows`` (exposing rank, sort_key, id)."""
+    if len(rows) < limit:
+        return None
+    last = rows[-1]
+    return encode_search_cursor(last.rank, last.sort_key, last.id)
@@ -0,0 +1,79 @@
+"""
+Cold-start timings.
+
+startup_report is filled in while the app boots: how long importing the app
+took, how long the lifespan startup ran, and when the first request was
+served. Times are measured from process start where the OS reports it
+(Linux /proc), else from the moment this module was imported, which
+app/main.py does first. The report is logged after the first request and
+served at GET /internal/startup.
+"""
+
+import logging
+import os
+import time
+from dataclasses import asdict, dataclass
+
+logger = logging.getLogger(__name__)
+
+IMPORT_STARTED = time.perf_counter()
+
+
+def process_age_seconds() -> float | None:
+    """Seconds since the current process started, or None off Linux."""
+    try:
+        with open("/proc/self/stat") as stat_file:
+            stat = stat_file.read()
+        with open("/proc/uptime") as uptime_file:
+            uptime = float(uptime_file.read().split()[0])
+    except OSError:
+        return None
+    # Field 22 (starttime, in clock ticks since boot); the command name in
+    # field 2 may contain spaces, so count from the closing parenthesis
+    start_ticks = int(stat.rsplit(")", 1)[1].split()[19])
+    return max(uptime - start_ticks / os.sysconf("SC_CLK_TCK"), 0.0)
+
+
+@dataclass
+class StartupReport:
+    """Seconds spent in each phase of a cold start."""
+
+    # Interpreter and server startup before the app import began (if known)
+    before_import_seconds: float | None = None
+    import_seconds: float | None = None
+    lifespan_seconds: float | None = None
+    # From process start until the lifespan startup finished
+    ready_seconds: float | None = None
+    # Duration of the first request alone (builds clients, opens connections)
+    first_request_seconds: float | None = None
+    # From process start until the first response was sent
+    first_response_seconds: float | None = None
+
+    def __post_init__(self):
+        age = process_age_seconds()
+        if age is not None:
+            self.before_import_seconds = age - (time.perf_counter() - IMPORT_STARTED)
+        self._origin = IMPORT_STARTED - (self.before_import_seconds or 0.0)
+
+    def record_import(self) -> None:
+        self.import_seconds = time.perf_counter() - IMPORT_STARTED
+
+    def record_lifespan(self, started: float) -> None:
+        now = time.perf_counter()
+        self.lifespan_seconds = now - started
+        self.ready_seconds = now - self._origin
+
+    def record_first_request(self, started: float) -> None:
+        now = time.perf_counter()
+        self.first_request_seconds = now - started
+        self.first_response_seconds = now - self._origin
+        logger.info("Startup timings (seconds): %s", self.as_dict())
+
+    def as_dict(self) -> dict:
+        return {
+            name: round(value, 4) if value is not None else None
+            for name, value in asdict(self).items()
+        }
+
+
+startup_report = StartupReport()
@@ -0,0 +1,198 @@
+"""
+Stateless access tokens.
+
+A password is checked with bcrypt once, at login; every later request
+carries an HMAC-SHA256 signed token (JWT-compatible, HS256) that is checked
+in microseconds without touching the database. Tokens carry the user's
+token_generation: revoking bumps the generation on the user row and every
+worker learns about it through NOTIFY, keeping an in-memory denylist of
+users whose older tokens must be refused.
+"""
+
+import base64
+import hashlib
+import hmac
+import json
+import threading
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Literal
+from uuid import UUID
+
+from app.config.settings import DEV_AUTH_SECRET_KEY, get_settings
+
+# NOTIFY channel announcing revocations to every worker and node
+AUTH_REVOCATION_CHANNEL = "auth_token_revocation"
+
+TokenType = Literal["access", "refresh"]
+
+
+class InvalidTokenError(Exception):
+    """Raised for malformed, tampered, expired or revoked tokens."""
+
+
+def _b64encode(data: bytes) -> bytes:
+    return base64.urlsafe_b64encode(data).rstrip(b"=")
+
+
+def _b64decode(data: bytes) -> bytes:
+    return base64.urlsafe_b64decode(data + b"=" * (-len(data) % 4))
+
+
+# Every token has the same header, so it is encoded once
+_HEADER = _b64encode(json.dumps({"alg": "HS256", "typ": "JWT"}).encode())
+
+
+@dataclass(frozen=True)
+class TokenClaims:
+    user_id: UUID
+    generation: int
+    token_type: TokenType
+    issued_at: int
+    expires_at: int
+
+
+class TokenSigner:
+    """Issues and verifies HS256 tokens with a shared secret."""
+
+    def __init__(
+        self,
+        secret_key: str,
+        access_ttl_seconds: int = 900,
+        refresh_ttl_seconds: int = 7 * 24 * 3600,
+    ):
+        """
+        Args:
+            secret_key: HMAC key shared by every worker
+            access_ttl_seconds: Lifetime of access tokens
+            refresh_ttl_seconds: Lifetime of refresh tokens
+        """
+        self._key = secret_key.encode()
+        self.ttl_seconds = {
+            "access": access_ttl_seconds,
+            "refresh": refresh_ttl_seconds,
+        }
+
+    def issue(
+        self, user_id: UUID, generation: int, token_type: TokenType = "access"
+    ) -> str:
+        """Sign a token for the user's current token generation."""
+        now = int(time.time())
+        payload = {
+            "sub": str(user_id),
+            "gen": generation,
+            "typ": token_type,
+            "iat": now,
+            "exp": now + self.ttl_seconds[token_type],
+        }
+        signing_input = _HEADER + b"." + _b64encode(json.dumps(payload).encode())
+        return (signing_input + b"." + _b64encode(self._sign(signing_input))).decode()
+
+    def verify(self, token: str, token_type: TokenType = "access") -> TokenClaims:
+        """
+        Check the signature, expiry and type of a token.
+
+        Raises:
+            InvalidTokenError: If any of them does not hold
+        """
+        try:
+            signing_input, signature = token.encode("ascii").rsplit(b".", 1)
+            header, payload = signing_input.split(b".")
+            valid = hmac.compare_digest(
+                self._sign(signing_input), _b64decode(signature)
+            )
+        except (UnicodeEncodeError, ValueError):
+            raise InvalidTokenError("Malformed token")
+        if not valid or header != _HEADER:
+            raise InvalidTokenError("Invalid signature")
+        try:
+            data = json.loads(_b64decode(payload))
+            claims = TokenClaims(
+                user_id=UUID(data["sub"]),
+                generation=int(data["gen"]),
+                token_type=data["typ"],
+                issued_at=int(data["iat"]),
+                expires_at=int(data["exp"]),
+            )
+        except (KeyError, TypeError, ValueError):
+            raise InvalidTokenError("Malformed token")
+        if claims.token_type != token_type:
+            raise InvalidTokenError(f"Expected a {token_type} token")
+        if claims.expires_at <= time.time():
+            raise InvalidTokenError("Token expired")
+        return claims
+
+    def _sign(self, signing_input: bytes) -> bytes:
+        return hmac.new(self._key, signing_input, hashlib.sha256).digest()
+
+
+class RevocationList:
+    """
+    Users whose tokens below a given generation are refused.
+
+    An entry is only needed while tokens issued before the revocation can
+    still be valid, so it expires after the longest token lifetime. Lookups
+    take no lock: they are a single dict read.
+    """
+
+    def __init__(self, retention_seconds: float):
+        """
+        Args:
+            retention_seconds: How long entries are kept (the refresh token
+                lifetime)
+        """
+        self.retention_seconds = retention_seconds
+        self._entries: dict[UUID, tuple[int, float]] = {}
+        self._lock = threading.Lock()
+
+    def revoke(
+        self, user_id: UUID, min_generation: int, revoked_at: float | None = None
+    ) -> None:
+        """Refuse the user's tokens older than min_generation."""
+        revoked_at = time.time() if revoked_at is None else revoked_at
+        expires_at = revoked_at + self.retention_seconds
+        if expires_at <= time.time():
+            return
+        with self._lock:
+            current = self._entries.get(user_id)
+            # Notifications may arrive out of order: keep the highest generation
+            if current is None or current[0] < min_generation:
+                self._entries[user_id] = (min_generation, expires_at)
+            self._purge()
+
+    def is_revoked(self, claims: TokenClaims) -> bool:
+        entry = self._entries.get(claims.user_id)
+        return entry is not None and claims.generation < entry[0]
+
+    def apply_notification(self, payload: str) -> None:
+        """Handle a NOTIFY payload from revocation_payload()."""
+        message = json.loads(payload)
+        self.revoke(UUID(message["id"]), int(message["gen"]), message.get("at"))
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _purge(self) -> None:
+        now = time.time()
+        expired = [
+            key for key, (_, expires_at) in self._entries.items() if expires_at <= now
+        ]
+        for key in expired:
+            del self._entries[key]
+
+
+def revocation_payload(user_id: UUID, generation: int, revoked_at: float) -> str:
+    return json.dumps({"id": str(user_id), "gen": generation, "at": revoked_at})
+
+
+@lru_cache()
+def get_token_signer() -> TokenSigner:
+    settings = get_settings()
+    if settings.env == "production" and settings.auth_secret_key == DEV_AUTH_SECRET_KEY:
+        raise RuntimeError("AUTH_SECRET_KEY must be set in production")
+    return TokenSigner(
+        settings.auth_secret_key,
+        access_ttl_seconds=settings.access_token_ttl_seconds,
+        refresh_ttl_seconds=settings.refresh_token_ttl_seconds,
+    )
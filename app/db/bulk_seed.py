@@ -0,0 +1,207 @@
+"""
+High-throughput user seeding.
+
+Built for the million-row tables used in load tests, where the factory-based
+seed_users() would take hours:
+
+- the password is hashed once and the hash reused for every row
+- rows are generated a batch at a time from precomputed name pools, with
+  deterministic unique emails (prefix-000000042@seed.example.com)
+- batches are loaded with COPY, one transaction each, by worker processes
+  that each hold their own connection
+
+Usage:
+    python -m app.db.seed --count 1000000 --batch-size 10000 --workers 4
+"""
+
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+import psycopg
+from faker import Faker
+from sqlalchemy.engine import make_url
+
+from app.core.security import get_hash_password
+
+SEED_COLUMNS = ("id", "email", "full_name", "is_active", "hashed_password", "create_at")
+COPY_SQL = f'COPY "user" ({", ".join(SEED_COLUMNS)}) FROM STDIN'
+SEED_DOMAIN = "seed.example.com"
+NAME_POOL_SIZE = 500
+
+# Per worker process: its connection and name pools
+_connection: psycopg.Connection | None = None
+_first_names: list[str] = []
+_last_names: list[str] = []
+
+
+@dataclass
+class SeedReport:
+    rows: int
+    seconds: float
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+
+def seed_email(prefix: str, index: int) -> str:
+    """The index-th seeded email; unique as long as indexes are."""
+    return f"{prefix}-{index:09d}@{SEED_DOMAIN}"
+
+
+def copy_escape(value: str) -> str:
+    """Escape a value for COPY's text format."""
+    return (
+        value.replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+
+
+def name_pools(size: int = NAME_POOL_SIZE) -> tuple[list[str], list[str]]:
+    """Deterministic first/last name pools; full names combine the two."""
+    fake = Faker()
+    fake.seed_instance(0)
+    first = [copy_escape(fake.first_name()) for _ in range(size)]
+    last = [copy_escape(fake.last_name()) for _ in range(size)]
+    return first, last
+
+
+def build_batch(
+    start: int,
+    size: int,
+    prefix: str,
+    hashed_password: str,
+    base_time: datetime,
+    first_names: list[str],
+    last_names: list[str],
+) -> str:
+    """
+    COPY text for rows start..start+size-1.
+
+    create_at grows by one microsecond per index, so the seeded rows keep
+    their index order in (create_at, id) pagination.
+    """
+    hashed_password = copy_escape(hashed_password)
+    first_count = len(first_names)
+    last_count = len(last_names)
+    lines = []
+    for index in range(start, start + size):
+        full_name = (
+            f"{first_names[index % first_count]} "
+            f"{last_names[index // first_count % last_count]}"
+        )
+        create_at = (base_time + timedelta(microseconds=index)).isoformat()
+        lines.append(
+            f"{uuid4()}\t{seed_email(prefix, index)}\t{full_name}\tt\t"
+            f"{hashed_password}\t{create_at}\n"
+        )
+    return "".join(lines)
+
+
+def conninfo_for(database_url: str) -> str:
+    """libpq connection string for a SQLAlchemy-style PostgreSQL URL."""
+    return (
+        make_url(database_url)
+        .set(drivername="postgresql")
+        .render_as_string(hide_password=False)
+    )
+
+
+def _init_worker(conninfo: str) -> None:
+    global _connection, _first_names, _last_names
+    _connection = psycopg.connect(conninfo)
+    _first_names, _last_names = name_pools()
+
+
+def _copy_batch(
+    start: int, size: int, prefix: str, hashed_password: str, base_time: datetime
+) -> int:
+    data = build_batch(
+        start, size, prefix, hashed_password, base_time, _first_names, _last_names
+    )
+    with _connection.transaction():
+        with _connection.cursor() as cursor:
+            with cursor.copy(COPY_SQL) as copy:
+                copy.write(data)
+    return size
+
+
+def next_seed_index(conninfo: str, prefix: str) -> int:
+    """Number of users already seeded with this prefix, i.e. the next index."""
+    with psycopg.connect(conninfo) as connection:
+        row = connection.execute(
+            'SELECT count(*) FROM "user" WHERE email LIKE %s',
+            (f"{prefix}-%@{SEED_DOMAIN}",),
+        ).fetchone()
+    return row[0]
+
+
+def seed_users_copy(
+    database_url: str,
+    count: int,
+    batch_size: int = 10_000,
+    workers: int | None = None,
+    password: str = "password123",
+    prefix: str = "seed",
+    start: int | None = None,
+    rounds: int = 12,
+) -> SeedReport:
+    """
+    Insert count users with COPY from parallel worker processes.
+
+    Args:
+        database_url: Target database (postgresql+psycopg://)
+        count: Users to insert
+        batch_size: Rows per COPY (and per transaction)
+        workers: Worker processes, each with one connection (default: cores)
+        password: Plain password shared by every seeded user
+        prefix: Email prefix; reruns with the same prefix continue the
+            numbering instead of colliding
+        start: First email index (default: continue after existing rows)
+        rounds: bcrypt cost of the shared hash
+
+    Returns:
+        SeedReport: Rows inserted and elapsed seconds
+    """
+    conninfo = conninfo_for(database_url)
+    workers = workers or os.cpu_count() or 1
+    if start is None:
+        start = next_seed_index(conninfo, prefix)
+    hashed_password = get_hash_password(password, rounds=rounds)
+    base_time = datetime.now(timezone.utc)
+
+    batches = [
+        (offset, min(batch_size, start + count - offset))
+        for offset in range(start, start + count, batch_size)
+    ]
+    inserted = 0
+    last_report = started = time.perf_counter()
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_worker, initargs=(conninfo,)
+    ) as executor:
+        # Keep a couple of batches queued per worker, not the whole run
+        pending = set()
+        for batch_start, size in batches:
+            pending.add(
+                executor.submit(
+                    _copy_batch, batch_start, size, prefix, hashed_password, base_time
+                )
+            )
+            if len(pending) >= workers * 2:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                inserted += sum(future.result() for future in done)
+                now = time.perf_counter()
+                if now - last_report >= 1.0:
+                    rate = inserted / (now - started)
+                    print(f"   ... {inserted}/{count} users ({rate:,.0f} rows/s)")
+                    last_report = now
+        for future in pending:
+            inserted += future.result()
+
+    return SeedReport(rows=inserted, seconds=time.perf_counter() - started)
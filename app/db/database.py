@@ -1,38 +1,244 @@
-from sqlmodel import SQLModel
+"""
+Process-wide database clients, built on first use.
+
+Nothing here reads settings or creates engines at import time, so importing
+the app stays cheap and instances that never touch a client (e.g. the async
+one in DB_MODE=sync) never pay for it.
+"""
+
+from functools import partial
+
 from app.config.settings import get_settings
 from app.clients.postgres_client import PostgresClient
+from app.clients.async_postgres_client import AsyncPostgresClient
+from app.clients.pool import PoolConfig
+from app.clients.replicas import ReplicaConfig
+from app.clients.postgres_listener import PostgresListener
+from app.core.batching import (
+    AsyncBatchLoader,
+    AsyncBatchWriter,
+    BatchLoader,
+    BatchWriter,
+)
+from app.core.cache import TTLLRUCache
+from app.core.lazy import lazy_singleton
+from app.core.pagination import get_count_cache
+from app.core.tokens import AUTH_REVOCATION_CHANNEL, RevocationList
+from app.db.instrumentation import instrument_engine
+from app.respositories.cached_user_repository import (
+    USER_CACHE_CHANNEL,
+    apply_invalidation,
+    commit_registrations,
+    commit_registrations_async,
+)
+from app.respositories.async_user_repository import load_users_async
+from app.respositories.user_repository import load_users
 
-settings = get_settings()
 
-# PostgreSQL clients for app and tests
-postgres_client = PostgresClient(database_url=settings.database_url, echo=False)
+def build_pool_config() -> PoolConfig:
+    """Pool settings of every engine, from the DB_POOL_* settings."""
+    settings = get_settings()
+    return PoolConfig(
+        size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        timeout=settings.db_pool_timeout,
+        recycle=settings.db_pool_recycle,
+        pre_ping=settings.db_pool_pre_ping,
+        pre_ping_idle_seconds=settings.db_pool_pre_ping_idle_seconds,
+        prepare_threshold=(
+            settings.db_prepare_threshold
+            if settings.db_prepare_threshold >= 0
+            else None
+        ),
+    )
+
 
-# Only create test client if TEST_DATABASE_URL is configured
-test_postgres_client = None
-if settings.test_database_url:
-    test_postgres_client = PostgresClient(
-        database_url=settings.test_database_url, echo=False
+def build_replica_config() -> ReplicaConfig:
+    """Read replicas of the primary, from the DATABASE_REPLICA_* settings."""
+    settings = get_settings()
+    return ReplicaConfig(
+        urls=settings.database_replica_urls,
+        strategy=settings.replica_strategy,
+        max_lag_seconds=settings.replica_max_lag_seconds,
+        check_interval_seconds=settings.replica_lag_check_seconds,
+        probe_timeout_seconds=settings.replica_probe_timeout_seconds,
     )
 
 
-def create_db_and_tables() -> None:
+@lazy_singleton
+def get_postgres_client() -> PostgresClient:
     """
-    Create all database tables using SQLModel metadata.
+    Dependency injection for FastAPI.
+    Returns the main PostgreSQL client instance.
     """
-    postgres_client.create_tables(SQLModel.metadata)
+    client = PostgresClient(
+        database_url=get_settings().database_url,
+        echo=False,
+        pool=build_pool_config(),
+        replicas=build_replica_config(),
+    )
+    for engine in client.engines:
+        instrument_engine(engine)
+    return client
 
 
-def get_postgres_client() -> PostgresClient:
+@lazy_singleton
+def get_async_postgres_client() -> AsyncPostgresClient:
     """
     Dependency injection for FastAPI.
-    Returns the main PostgreSQL client instance.
+    Returns the main async PostgreSQL client instance.
     """
-    return postgres_client
+    client = AsyncPostgresClient(
+        database_url=get_settings().database_url,
+        echo=False,
+        pool=build_pool_config(),
+        replicas=build_replica_config(),
+    )
+    for engine in client.engines:
+        instrument_engine(engine.sync_engine)
+    return client
 
 
-def get_test_postgres_client() -> PostgresClient:
+@lazy_singleton
+def get_test_postgres_client() -> PostgresClient | None:
     """
     Dependency injection for tests.
-    Returns the test PostgreSQL client instance.
+    Returns the test PostgreSQL client instance, or None if TEST_DATABASE_URL
+    is not configured.
+    """
+    settings = get_settings()
+    if not settings.test_database_url:
+        return None
+    client = PostgresClient(
+        database_url=settings.test_database_url, echo=False, pool=build_pool_config()
+    )
+    instrument_engine(client.engine)
+    return client
+
+
+@lazy_singleton
+def get_user_cache() -> TTLLRUCache:
+    """In-process user cache, kept coherent across workers through LISTEN/NOTIFY."""
+    settings = get_settings()
+    return TTLLRUCache(
+        maxsize=settings.user_cache_size,
+        ttl_seconds=settings.user_cache_ttl_seconds,
+        negative_ttl_seconds=settings.user_cache_negative_ttl_seconds,
+    )
+
+
+@lazy_singleton
+def get_user_cache_listener() -> PostgresListener:
+    """LISTEN on the user cache channel and apply invalidations to the cache."""
+    cache = get_user_cache()
+    return PostgresListener(
+        database_url=get_settings().database_url,
+        channel=USER_CACHE_CHANNEL,
+        on_message=lambda payload: apply_invalidation(cache, payload),
+    )
+
+
+@lazy_singleton
+def get_user_loader() -> BatchLoader:
+    """Coalesces concurrent user lookups by id of the threadpool routes."""
+    settings = get_settings()
+    return BatchLoader(
+        load_users,
+        window_seconds=settings.user_loader_window_ms / 1000,
+        max_batch=settings.user_loader_max_batch,
+    )
+
+
+@lazy_singleton
+def get_async_user_loader() -> AsyncBatchLoader:
+    """Coalesces concurrent user lookups by id of the event-loop routes."""
+    settings = get_settings()
+    return AsyncBatchLoader(
+        load_users_async,
+        window_seconds=settings.user_loader_window_ms / 1000,
+        max_batch=settings.user_loader_max_batch,
+    )
+
+
+@lazy_singleton
+def get_registration_writer() -> BatchWriter:
+    """Group commit of the registrations of the threadpool routes."""
+    settings = get_settings()
+    cache = get_user_cache() if settings.user_cache_enabled else None
+    return BatchWriter(
+        partial(commit_registrations, cache=cache),
+        window_seconds=settings.registration_batch_window_ms / 1000,
+        max_batch=settings.registration_batch_max,
+    )
+
+
+@lazy_singleton
+def get_async_registration_writer() -> AsyncBatchWriter:
+    """Group commit of the registrations of the event-loop routes."""
+    settings = get_settings()
+    cache = get_user_cache() if settings.user_cache_enabled else None
+    return AsyncBatchWriter(
+        partial(commit_registrations_async, cache=cache),
+        window_seconds=settings.registration_batch_window_ms / 1000,
+        max_batch=settings.registration_batch_max,
+    )
+
+
+@lazy_singleton
+def get_revocation_list() -> RevocationList:
+    """Token denylist, kept in sync across workers through LISTEN/NOTIFY."""
+    return RevocationList(retention_seconds=get_settings().refresh_token_ttl_seconds)
+
+
+@lazy_singleton
+def get_revocation_listener() -> PostgresListener:
+    """LISTEN on the revocation channel and apply revocations to the denylist."""
+    return PostgresListener(
+        database_url=get_settings().database_url,
+        channel=AUTH_REVOCATION_CHANNEL,
+        on_message=get_revocation_list().apply_notification,
+    )
+
+
+async def close_clients() -> None:
+    """Close the clients that were built; the others are left unbuilt."""
+    if get_user_cache_listener.is_built():
+        get_user_cache_listener().stop()
+    if get_revocation_listener.is_built():
+        get_revocation_listener().stop()
+    if get_postgres_client.is_built():
+        get_postgres_client().close()
+    if get_async_postgres_client.is_built():
+        await get_async_postgres_client().close()
+
+
+def reset_after_fork() -> None:
+    """
+    Forget every client and process-wide object inherited through fork.
+
+    Call in a forked child before it serves requests: engines, listener
+    threads, batches and their locks all belong to the parent. Inherited
+    pools are dropped without closing the parent's connections; everything
+    is built again, in the child, on first use.
     """
-    return test_postgres_client
+    if get_postgres_client.is_built():
+        get_postgres_client().dispose_after_fork()
+    if get_async_postgres_client.is_built():
+        get_async_postgres_client().dispose_after_fork()
+    if get_test_postgres_client.is_built() and get_test_postgres_client():
+        get_test_postgres_client().dispose_after_fork()
+    for singleton in (
+        get_postgres_client,
+        get_async_postgres_client,
+        get_test_postgres_client,
+        get_user_cache,
+        get_user_cache_listener,
+        get_count_cache,
+        get_user_loader,
+        get_async_user_loader,
+        get_registration_writer,
+        get_async_registration_writer,
+        get_revocation_list,
+        get_revocation_listener,
+    ):
+        singleton.cache_clear()
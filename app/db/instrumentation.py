@@ -0,0 +1,226 @@
+import logging
+import os
+import re
+import sys
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Generator
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.config.settings import get_settings
+from app.core.metrics import DB_STATEMENT_LATENCY
+
+logger = logging.getLogger(__name__)
+
+# Statement kinds reported as DB_STATEMENT_LATENCY operations
+OPERATIONS = frozenset({"SELECT", "INSERT", "UPDATE", "DELETE", "WITH", "COPY"})
+
+# Savepoint control is transaction bookkeeping, like BEGIN and COMMIT (which
+# never reach the cursor): it is neither logged nor counted against requests
+_SAVEPOINT_STATEMENTS = ("SAVEPOINT", "RELEASE SAVEPOINT", "ROLLBACK TO SAVEPOINT")
+
+_APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Database plumbing skipped when looking for the code that issued a statement
+_PLUMBING = (
+    os.path.abspath(__file__),
+    os.path.join(_APP_DIR, "clients") + os.sep,
+    os.path.join(_APP_DIR, "db", "unit_of_work.py"),
+)
+
+_PLACEHOLDER = re.compile(
+    r"(?:%\(\w+\)s|%s|\$\d+|'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b)(?:::\w+)?"
+)
+_PLACEHOLDER_LIST = re.compile(r"\?(?:, \?)+")
+_ROW_LIST = re.compile(r"\((\?(?:\.\.\.)?)\)(?:, \(\1\))+")
+_WHITESPACE = re.compile(r"\s+")
+
+
+class QueryBudgetExceededError(Exception):
+    """Raised, in strict mode, by the statement that goes over the budget."""
+
+
+@dataclass
+class RequestDbStats:
+    """Database usage of the request currently being served."""
+
+    checkouts: int = 0
+    statements: int = 0
+    statement_seconds: float = 0.0
+    # Statements allowed before the request is reported (None = unlimited)
+    budget: int | None = None
+    # Raise QueryBudgetExceededError instead of logging (used in tests)
+    strict: bool = False
+    # Executions per normalized statement, to spot N+1 query patterns
+    repeats: Counter = field(default_factory=Counter)
+
+
+_request_db_stats: ContextVar[RequestDbStats | None] = ContextVar(
+    "request_db_stats", default=None
+)
+
+
+def current_request_db_stats() -> RequestDbStats | None:
+    """Stats of the current request, or None outside of a tracked request."""
+    return _request_db_stats.get()
+
+
+@contextmanager
+def track_request_db_stats(
+    budget: int | None = None, strict: bool | None = None
+) -> Generator[RequestDbStats, None, None]:
+    """
+    Collect database stats for everything run inside the block.
+
+    The stats object is mutable, so work dispatched to the threadpool (which
+    copies the context) still updates the same instance. Nested blocks share
+    the outermost stats object.
+
+    Args:
+        budget: Statement budget (default: QUERY_BUDGET, 0 = unlimited)
+        strict: Fail the statement that exceeds the budget instead of
+            logging it (default: QUERY_BUDGET_STRICT)
+    """
+    stats = _request_db_stats.get()
+    if stats is not None:
+        yield stats
+        return
+    settings = get_settings()
+    if budget is None:
+        budget = settings.query_budget
+    if strict is None:
+        strict = settings.query_budget_strict
+    stats = RequestDbStats(budget=budget or None, strict=strict)
+    token = _request_db_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _request_db_stats.reset(token)
+
+
+@lru_cache(maxsize=1024)
+def normalize_sql(statement: str) -> str:
+    """
+    Statement text with literals and bind placeholders replaced by ?, and
+    lists of them collapsed, so the same query always reads the same:
+    "INSERT ... VALUES (?...), ..." whatever the batch size.
+    """
+    sql = _WHITESPACE.sub(" ", statement).strip()
+    sql = _PLACEHOLDER.sub("?", sql)
+    sql = _PLACEHOLDER_LIST.sub("?...", sql)
+    return _ROW_LIST.sub(r"(\1), ...", sql)
+
+
+def parameter_shape(parameters: Any) -> str:
+    """Types of the bound parameters, never their values."""
+    if isinstance(parameters, (list, tuple)) and parameters:
+        if isinstance(parameters[0], (dict, list, tuple)):
+            # executemany
+            return f"{len(parameters)} x {parameter_shape(parameters[0])}"
+        types = [type(value).__name__ for value in parameters]
+    elif isinstance(parameters, dict):
+        if len(parameters) <= 10:
+            fields = (
+                f"{name}: {type(value).__name__}" for name, value in parameters.items()
+            )
+            return "{" + ", ".join(fields) + "}"
+        types = [type(value).__name__ for value in parameters.values()]
+    else:
+        return "none" if not parameters else type(parameters).__name__
+    counts = Counter(types)
+    return f"{len(types)} params: " + ", ".join(
+        f"{count} {name}" for name, count in counts.most_common()
+    )
+
+
+def call_site() -> str:
+    """file:line of the innermost application frame outside the DB plumbing."""
+    frame = sys._getframe(1)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename.startswith(_APP_DIR) and not filename.startswith(_PLUMBING):
+            location = os.path.relpath(filename, os.path.dirname(_APP_DIR))
+            return f"{location}:{frame.f_lineno} in {frame.f_code.co_name}"
+        frame = frame.f_back
+    return "unknown"
+
+
+def statement_operation(statement: str) -> str:
+    """First keyword of a SQL statement, or OTHER for BEGIN/SET/etc."""
+    keyword = statement.lstrip()[:6].upper()
+    return keyword if keyword in OPERATIONS else "OTHER"
+
+
+def _on_checkout(dbapi_connection, connection_record, connection_proxy) -> None:
+    stats = _request_db_stats.get()
+    if stats is not None:
+        stats.checkouts += 1
+
+
+def _before_cursor_execute(
+    conn, cursor, statement, parameters, context, executemany
+) -> None:
+    conn.info.setdefault("statement_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(
+    conn, cursor, statement, parameters, context, executemany
+) -> None:
+    elapsed = time.perf_counter() - conn.info["statement_started"].pop()
+    settings = get_settings()
+    if settings.metrics_enabled:
+        DB_STATEMENT_LATENCY.labels(statement_operation(statement)).observe(elapsed)
+    if statement.startswith(_SAVEPOINT_STATEMENTS):
+        return
+    if elapsed * 1000 >= settings.slow_query_ms:
+        logger.warning(
+            "Slow statement (%.1f ms): %s | params %s | at %s",
+            elapsed * 1000,
+            normalize_sql(statement),
+            parameter_shape(parameters),
+            call_site(),
+        )
+
+    stats = _request_db_stats.get()
+    if stats is None:
+        return
+    stats.statements += 1
+    stats.statement_seconds += elapsed
+
+    sql = normalize_sql(statement)
+    stats.repeats[sql] += 1
+    if stats.repeats[sql] == settings.query_repeat_threshold:
+        logger.warning(
+            "Possible N+1: statement ran %d times in one request: %s | at %s",
+            stats.repeats[sql],
+            sql,
+            call_site(),
+        )
+
+    if stats.budget is not None and stats.statements == stats.budget + 1:
+        message = (
+            f"Request exceeded its query budget of {stats.budget} statements "
+            f"with: {sql} at {call_site()}"
+        )
+        if stats.strict:
+            raise QueryBudgetExceededError(message)
+        logger.warning(message)
+
+
+def instrument_engine(engine: Engine) -> None:
+    """
+    Track the engine's pool checkouts and statements against the current
+    request: statement timings, query budget, N+1 and slow statement logs.
+
+    Args:
+        engine: Sync engine (for async engines, .sync_engine)
+    """
+    if not event.contains(engine, "checkout", _on_checkout):
+        event.listen(engine, "checkout", _on_checkout)
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
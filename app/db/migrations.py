@@ -0,0 +1,88 @@
+"""
+Startup check that the database schema is at the Alembic head.
+
+Migrations run before boot (the Procfile release phase runs
+`alembic upgrade head`), so instead of create_all() the app only compares
+the revision stored in alembic_version with the head of alembic/versions.
+The revision graph is read with ast rather than through Alembic, whose
+import alone costs more than the whole check.
+"""
+
+import ast
+import logging
+from pathlib import Path
+
+from sqlalchemy import Connection, text
+from sqlalchemy.exc import ProgrammingError
+
+logger = logging.getLogger(__name__)
+
+VERSIONS_DIR = Path(__file__).resolve().parents[2] / "alembic" / "versions"
+
+
+class SchemaRevisionError(RuntimeError):
+    """Raised by a strict schema check when the database is not at head."""
+
+
+def _revision_ids(node: ast.expr) -> set[str]:
+    value = ast.literal_eval(node)
+    if value is None:
+        return set()
+    if isinstance(value, str):
+        return {value}
+    return set(value)
+
+
+def expected_heads(versions_dir: Path = VERSIONS_DIR) -> set[str]:
+    """Revisions of alembic/versions that no other revision builds on."""
+    revisions: set[str] = set()
+    parents: set[str] = set()
+    for path in versions_dir.glob("*.py"):
+        for node in ast.parse(path.read_text()).body:
+            if not isinstance(node, (ast.Assign, ast.AnnAssign)) or node.value is None:
+                continue
+            targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+            names = {target.id for target in targets if isinstance(target, ast.Name)}
+            if "revision" in names:
+                revisions |= _revision_ids(node.value)
+            elif "down_revision" in names:
+                parents |= _revision_ids(node.value)
+    return revisions - parents
+
+
+def applied_revisions(connection: Connection) -> set[str]:
+    """Revisions recorded in alembic_version (empty if never migrated)."""
+    try:
+        result = connection.execute(text("SELECT version_num FROM alembic_version"))
+    except ProgrammingError:
+        connection.rollback()
+        return set()
+    return set(result.scalars().all())
+
+
+def check_schema_revision(connection: Connection, mode: str = "warn") -> bool:
+    """
+    Compare the database revision with the Alembic head.
+
+    Args:
+        connection: Connection to the primary
+        mode: "warn" logs a mismatch, "strict" raises SchemaRevisionError,
+            "off" skips the check
+
+    Returns:
+        bool: True when the schema is at head (or the check is off)
+    """
+    if mode == "off":
+        return True
+    expected = expected_heads()
+    applied = applied_revisions(connection)
+    if applied == expected:
+        return True
+    message = (
+        f"Database schema is at revision {sorted(applied) or 'none'}, "
+        f"expected {sorted(expected)}; run `alembic upgrade head`"
+    )
+    if mode == "strict":
+        raise SchemaRevisionError(message)
+    logger.warning(message)
+    return False
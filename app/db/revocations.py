@@ -0,0 +1,34 @@
+"""
+Startup load of the token denylist.
+
+Revocations reach running workers through NOTIFY; a worker that starts
+later reads the ones that can still matter (younger than the longest token
+lifetime) from the user table, through ix_user_tokens_revoked_at.
+"""
+
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import Connection, select
+
+from app.core.tokens import RevocationList
+from app.models.user import User
+
+
+def load_recent_revocations(connection: Connection, revocations: RevocationList) -> int:
+    """
+    Add the users revoked within the retention window to the denylist.
+
+    Returns:
+        int: Number of users loaded
+    """
+    since = datetime.now(timezone.utc) - timedelta(
+        seconds=revocations.retention_seconds
+    )
+    rows = connection.execute(
+        select(User.id, User.token_generation, User.tokens_revoked_at).where(
+            User.tokens_revoked_at > since
+        )
+    ).all()
+    for user_id, generation, revoked_at in rows:
+        revocations.revoke(user_id, generation, revoked_at.timestamp())
+    return len(rows)
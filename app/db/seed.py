@@ -1,5 +1,8 @@
+import argparse
+
 from app.factories.user_factory import UserFactory
 from app.config.settings import get_settings
+from app.db.bulk_seed import seed_users_copy
 
 settings = get_settings()
 
@@ -32,7 +35,35 @@ def seed_users(count: int = 10) -> None:
         raise
 
 
-def run() -> None:
+def seed_users_fast(count: int, batch_size: int, workers: int | None) -> None:
+    """
+    Generate users in DB with the COPY seeding engine (app/db/bulk_seed.py)
+
+    Args:
+        count: ammount of users to create
+        batch_size: rows per COPY
+        workers: parallel connections (default: one per CPU core)
+    """
+    database_url = (
+        settings.test_database_url if settings.env == "test" else settings.database_url
+    )
+    print(f"Env: {settings.env}")
+    print(f"Generating {count} users (batch {batch_size}, workers {workers})...")
+
+    report = seed_users_copy(
+        database_url,
+        count=count,
+        batch_size=batch_size,
+        workers=workers,
+        rounds=settings.bcrypt_rounds or 12,
+    )
+    print(
+        f"{report.rows} users created in {report.seconds:.1f}s "
+        f"({report.rows_per_second:,.0f} rows/s)"
+    )
+
+
+def run(count: int = 30, batch_size: int = 10_000, workers: int | None = None) -> None:
     """Ejecuta todos los seeds"""
 
     # Validating environment
@@ -44,12 +75,26 @@ def run() -> None:
     print("Starting seed process")
     print("=" * 50)
 
-    seed_users(count=30)
+    seed_users_fast(count=count, batch_size=batch_size, workers=workers)
 
     print("=" * 50)
     print("Seed completed!")
     print("=" * 50)
 
 
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Seed the database with fake users")
+    parser.add_argument("--count", type=int, default=30, help="users to create")
+    parser.add_argument("--batch-size", type=int, default=10_000, help="rows per COPY")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="parallel connections (default: cores)",
+    )
+    args = parser.parse_args()
+    run(count=args.count, batch_size=args.batch_size, workers=args.workers)
+
+
 if __name__ == "__main__":
-    run()
+    main()
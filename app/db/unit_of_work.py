@@ -0,0 +1,121 @@
+from contextlib import contextmanager
+from typing import Callable, Generator, Sequence
+
+from sqlalchemy import Executable, Row, text
+from sqlmodel import Session
+
+from app.clients.postgres_client import PostgresClient
+from app.clients.replicas import reads_use_primary
+
+
+class UnitOfWork:
+    """
+    Request-scoped unit of work on top of a PostgresClient.
+
+    Stands in for the client in repositories: every get_session_context()
+    call hands out the same session, so all repository calls of one request
+    share one pooled connection and one transaction. Repository commits only
+    flush; the transaction is committed once when the unit of work ends, or
+    rolled back if it ends with an exception.
+
+    When the client has read replicas, read-only calls made before the first
+    write go to a replica in a short session of their own; once the unit of
+    work has written, reads use its session so they see its writes.
+    """
+
+    def __init__(self, client: PostgresClient):
+        """
+        Args:
+            client: Client whose engine provides the connection
+        """
+        self.client = client
+        self.database_url = client.database_url
+        self.engine = client.engine
+        self.session: Session | None = None
+        self.wrote = False
+        self._after_commit: list[Callable[[], None]] = []
+
+    def __enter__(self) -> "UnitOfWork":
+        # The connection is checked out lazily, on the first statement
+        self.session = self.client.create_session()
+        self.wrote = False
+        self._after_commit = []
+        return self
+
+    def __exit__(self, exc_type, exc, traceback) -> None:
+        callbacks, self._after_commit = self._after_commit, []
+        try:
+            if exc_type is None:
+                self.session.commit()
+            else:
+                self.session.rollback()
+                callbacks = []
+        finally:
+            self.session.close()
+            self.session = None
+        for callback in callbacks:
+            callback()
+
+    @contextmanager
+    def get_session_context(
+        self, read_only: bool = False
+    ) -> Generator[Session, None, None]:
+        """
+        Yield the shared session. It stays open when the block exits.
+
+        Args:
+            read_only: The block only reads, so before any write it may run
+                on a replica (in its own session)
+
+        Yields:
+            Session: The unit of work's session
+        """
+        if (
+            read_only
+            and not self.wrote
+            and self.client.replicas is not None
+            and not reads_use_primary()
+        ):
+            with self.client.get_session_context(read_only=True) as session:
+                yield session
+            return
+        yield self.session
+
+    def stream(
+        self, statement: Executable, batch_size: int = 1000, read_only: bool = False
+    ) -> Generator[Sequence[Row], None, None]:
+        """
+        Stream rows on a connection of their own, see PostgresClient.stream.
+
+        Streams are consumed after the request's transaction has ended, so
+        they cannot share it.
+        """
+        return self.client.stream(statement, batch_size=batch_size, read_only=read_only)
+
+    def commit(self, session: Session) -> None:
+        """Flush pending changes; the real commit happens on exit."""
+        self.wrote = True
+        session.flush()
+
+    def after_commit(self, callback: Callable[[], None]) -> None:
+        """
+        Run callback once the transaction has committed.
+
+        Callbacks are dropped if it rolls back. Other requests see the writes
+        only from then on: a cache entry dropped here is not filled again
+        from rows read before the commit.
+        """
+        self._after_commit.append(callback)
+
+    def notify(self, channel: str, payload: str) -> None:
+        """
+        Queue a NOTIFY in the current transaction.
+
+        Postgres delivers it only if the transaction commits, so listeners
+        never hear about writes that were rolled back.
+        """
+        self.wrote = True
+        self.session.exec(
+            text("SELECT pg_notify(:channel, :payload)"),
+            params={"channel": channel, "payload": payload},
+        )
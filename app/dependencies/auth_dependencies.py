@@ -0,0 +1,91 @@
+"""
+Authentication dependency injection factories.
+
+get_token_claims authenticates a request from its bearer token alone: an
+HMAC check and a denylist lookup, no database round-trip.
+"""
+
+from fastapi import Depends
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+
+from app.clients.async_postgres_client import AsyncPostgresClient
+from app.clients.postgres_client import PostgresClient
+from app.config.settings import get_settings
+from app.core.hashing import get_password_hasher
+from app.core.tokens import InvalidTokenError, TokenClaims, get_token_signer
+from app.db.database import get_revocation_list, get_user_cache
+from app.db.unit_of_work import UnitOfWork
+from app.dependencies.db_dependencies import get_async_db_client, get_db_client
+from app.respositories.async_user_repository import AsyncUserRepository
+from app.respositories.cached_user_repository import (
+    AsyncCachedUserRepository,
+    CachedUserRepository,
+)
+from app.respositories.user_repository import UserRepository
+from app.services.async_auth_service import AsyncAuthService
+from app.services.auth_service import AuthService, credentials_error
+
+bearer_scheme = HTTPBearer(auto_error=False)
+
+
+async def get_token_claims(
+    credentials: HTTPAuthorizationCredentials | None = Depends(bearer_scheme),
+) -> TokenClaims:
+    """
+    Claims of the request's access token.
+
+    Declared as a coroutine: the check takes microseconds, not worth a
+    threadpool hop.
+
+    Raises:
+        HTTPException: 401 if the token is missing, invalid, expired or revoked
+    """
+    if credentials is None:
+        raise credentials_error("Not authenticated")
+    try:
+        claims = get_token_signer().verify(credentials.credentials, "access")
+    except InvalidTokenError as exc:
+        raise credentials_error(str(exc))
+    if get_revocation_list().is_revoked(claims):
+        raise credentials_error("Token revoked")
+    return claims
+
+
+def get_auth_service(
+    db: PostgresClient | UnitOfWork = Depends(get_db_client, scope="function"),
+) -> AuthService:
+    """
+    Factory function for AuthService dependency injection.
+
+    PostgresClient/UnitOfWork -> UserRepository [-> CachedUserRepository]
+    -> AuthService (+ PasswordHasher, TokenSigner, RevocationList)
+
+    Returns:
+        AuthService: Fully configured service instance
+    """
+    repo = UserRepository(db)
+    if get_settings().user_cache_enabled:
+        repo = CachedUserRepository(repo, get_user_cache())
+    return AuthService(
+        repo, get_password_hasher(), get_token_signer(), get_revocation_list()
+    )
+
+
+async def get_async_auth_service(
+    client: AsyncPostgresClient = Depends(get_async_db_client),
+) -> AsyncAuthService:
+    """
+    Factory function for AsyncAuthService dependency injection (DB_MODE=async).
+
+    AsyncPostgresClient -> AsyncUserRepository [-> AsyncCachedUserRepository]
+    -> AsyncAuthService (+ PasswordHasher, TokenSigner, RevocationList)
+
+    Returns:
+        AsyncAuthService: Fully configured service instance
+    """
+    repo = AsyncUserRepository(client)
+    if get_settings().user_cache_enabled:
+        repo = AsyncCachedUserRepository(repo, get_user_cache())
+    return AsyncAuthService(
+        repo, get_password_hasher(), get_token_signer(), get_revocation_list()
+    )
@@ -0,0 +1,66 @@
+"""
+Database dependency injection factories.
+
+This module provides the request-scoped database handle shared by every
+repository created while serving one request.
+"""
+
+from typing import Awaitable, Callable, Generator
+
+from app.clients.async_postgres_client import AsyncPostgresClient
+from app.clients.postgres_client import PostgresClient
+from app.config.settings import get_settings
+from app.db.database import get_async_postgres_client, get_postgres_client
+from app.db.instrumentation import current_request_db_stats
+from app.db.unit_of_work import UnitOfWork
+
+
+def get_db_client() -> Generator[PostgresClient | UnitOfWork, None, None]:
+    """
+    Yield the database handle repositories should use for this request.
+
+    With UNIT_OF_WORK_ENABLED (default) this is a UnitOfWork: one connection
+    and one transaction for the whole request, committed after the path
+    operation returns. Depend on it with scope="function" so the commit runs
+    before the response is sent and a failed commit is not reported as a
+    success. Otherwise the plain PostgresClient is returned and every
+    repository call uses its own session.
+    """
+    if not get_settings().unit_of_work_enabled:
+        yield get_postgres_client()
+        return
+
+    with UnitOfWork(get_postgres_client()) as uow:
+        yield uow
+
+
+async def get_async_db_client() -> AsyncPostgresClient:
+    """
+    The database client of DB_MODE=async requests.
+
+    A coroutine, so FastAPI resolves it on the event loop. Each repository
+    call uses a session of its own (there is no async unit of work).
+    """
+    return get_async_postgres_client()
+
+
+def query_budget(limit: int) -> Callable[[], Awaitable[None]]:
+    """
+    Declare how many statements a path operation may run.
+
+    Going over the budget is logged with the offending statement, or fails
+    the request under QUERY_BUDGET_STRICT (as in the test suite).
+
+    Usage:
+        @router.get("/", dependencies=[Depends(query_budget(2))])
+
+    Args:
+        limit: Statements allowed for the whole request (0 = unlimited)
+    """
+
+    async def declare_query_budget() -> None:
+        stats = current_request_db_stats()
+        if stats is not None:
+            stats.budget = limit or None
+
+    return declare_query_budget
@@ -5,17 +5,43 @@ This module provides factory functions for creating UserService instances
 with all their dependencies properly wired up.
 """
 
-from app.db.database import postgres_client
+from functools import partial
+
+from fastapi import Depends
+
+from app.clients.async_postgres_client import AsyncPostgresClient
+from app.clients.postgres_client import PostgresClient
+from app.db.database import (
+    get_async_registration_writer,
+    get_async_user_loader,
+    get_registration_writer,
+    get_user_cache,
+    get_user_loader,
+)
+from app.db.unit_of_work import UnitOfWork
+from app.dependencies.db_dependencies import get_async_db_client, get_db_client
+from app.config.settings import get_settings
+from app.core.hashing import get_password_hasher
 from app.services.user_service import UserService
-from app.respositories.user_repository import UserRepository
+from app.services.async_user_service import AsyncUserService
+from app.respositories.user_repository import UserRepository, base_client
+from app.respositories.async_user_repository import AsyncUserRepository
+from app.respositories.cached_user_repository import (
+    AsyncCachedUserRepository,
+    CachedUserRepository,
+)
 
 
-def get_user_service() -> UserService:
+def get_user_service(
+    db: PostgresClient | UnitOfWork = Depends(get_db_client, scope="function"),
+) -> UserService:
     """
     Factory function for UserService dependency injection.
 
     Creates the complete dependency chain:
-    PostgresClient -> UserRepository -> UserService
+    PostgresClient/UnitOfWork -> UserRepository (+ BatchLoader)
+    [-> CachedUserRepository]
+    -> UserService (+ PasswordHasher [, BatchWriter])
 
     This is the Composition Root for user-related operations.
     Controllers should depend on this function via FastAPI's Depends().
@@ -23,5 +49,60 @@ def get_user_service() -> UserService:
     Returns:
         UserService: Fully configured service instance
     """
-    repo = UserRepository(postgres_client)
-    return UserService(repo)
+    settings = get_settings()
+    repo = UserRepository(
+        db, loader=get_user_loader() if settings.user_loader_enabled else None
+    )
+    if settings.user_cache_enabled:
+        repo = CachedUserRepository(repo, get_user_cache())
+    submit_registration = None
+    if settings.registration_group_commit:
+        # Batches are committed on the client, outside the request's unit of work
+        submit_registration = partial(
+            get_registration_writer().submit, group=base_client(db)
+        )
+    return UserService(
+        repo,
+        get_password_hasher(),
+        bulk_batch_size=settings.bulk_batch_size,
+        export_batch_size=settings.export_batch_size,
+        submit_registration=submit_registration,
+    )
+
+
+async def get_async_user_service(
+    client: AsyncPostgresClient = Depends(get_async_db_client),
+) -> AsyncUserService:
+    """
+    Factory function for AsyncUserService dependency injection.
+
+    Creates the complete dependency chain:
+    AsyncPostgresClient -> AsyncUserRepository (+ AsyncBatchLoader)
+    [-> AsyncCachedUserRepository]
+    -> AsyncUserService (+ PasswordHasher [, AsyncBatchWriter])
+
+    Declared as a coroutine so FastAPI resolves it on the event loop
+    instead of dispatching it to the threadpool.
+
+    Returns:
+        AsyncUserService: Fully configured service instance
+    """
+    settings = get_settings()
+    repo = AsyncUserRepository(
+        client,
+        loader=get_async_user_loader() if settings.user_loader_enabled else None,
+    )
+    if settings.user_cache_enabled:
+        repo = AsyncCachedUserRepository(repo, get_user_cache())
+    submit_registration = None
+    if settings.registration_group_commit:
+        submit_registration = partial(
+            get_async_registration_writer().submit, group=client
+        )
+    return AsyncUserService(
+        repo,
+        get_password_hasher(),
+        bulk_batch_size=settings.bulk_batch_size,
+        export_batch_size=settings.export_batch_size,
+        submit_registration=submit_registration,
+    )
@@ -1,6 +1,6 @@
 from factory.alchemy import SQLAlchemyModelFactory
 from sqlmodel import Session
-from app.db.database import postgres_client, test_postgres_client
+from app.db.database import get_postgres_client, get_test_postgres_client
 from app.config.settings import get_settings
 
 
@@ -14,11 +14,16 @@ def get_factory_client():
     - development/production: uses postgres_client (real DB)
     """
     if settings.env == "test":
-        return test_postgres_client
-    return postgres_client
+        return get_test_postgres_client()
+    return get_postgres_client()
+
+
+def create_factory_session() -> Session:
+    """Session of one factory create(), opened on first use (not at import)."""
+    return Session(get_factory_client().engine)
 
 
 class BaseFactory(SQLAlchemyModelFactory):
     class Meta:
-        sqlalchemy_session = Session(get_factory_client().engine)
+        sqlalchemy_session_factory = create_factory_session
         sqlalchemy_session_persistence = "commit"
@@ -1,24 +1,128 @@
+# Imported first: the startup report measures the app import from here
+from app.core.startup import startup_report
+
+import time
 from contextlib import asynccontextmanager
 from typing import Dict
 from fastapi import FastAPI
 from app.config.settings import get_settings
-from app.routers.users import router as users_router
-from app.db.database import create_db_and_tables, postgres_client
+from app.routers.internal import router as internal_router
+from app.core.hashing import get_password_hasher
+from app.core.metrics import InstrumentedRoute
+from app.core.admission import get_admission_controller
+from app.core.middleware import (
+    AdmissionMiddleware,
+    DbStatsMiddleware,
+    MetricsMiddleware,
+    ReadYourWritesMiddleware,
+    StartupReportMiddleware,
+)
+from app.db.database import (
+    close_clients,
+    get_async_postgres_client,
+    get_postgres_client,
+    get_revocation_list,
+    get_revocation_listener,
+    get_user_cache_listener,
+)
+from app.db.migrations import check_schema_revision
+from app.db.revocations import load_recent_revocations
+
+
+async def check_schema() -> None:
+    """Check the primary's schema revision, through the DB_MODE client."""
+    settings = get_settings()
+    if settings.schema_check == "off":
+        return
+    if settings.db_mode == "async":
+        async with get_async_postgres_client().engine.connect() as connection:
+            await connection.run_sync(check_schema_revision, settings.schema_check)
+    else:
+        with get_postgres_client().engine.connect() as connection:
+            check_schema_revision(connection, settings.schema_check)
+
+
+async def load_revocations() -> None:
+    """
+    Listen for token revocations, then load the recent ones.
+
+    Listening first means a revocation made while loading is not missed.
+    """
+    get_revocation_listener().start()
+    revocations = get_revocation_list()
+    if get_settings().db_mode == "async":
+        async with get_async_postgres_client().engine.connect() as connection:
+            await connection.run_sync(load_recent_revocations, revocations)
+    else:
+        with get_postgres_client().engine.connect() as connection:
+            load_recent_revocations(connection, revocations)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Handle startup and shutdown events."""
     # Startup
-    create_db_and_tables()
+    started = time.perf_counter()
+    await check_schema()
+    settings = get_settings()
+    hasher = get_password_hasher()
+    if settings.bcrypt_rounds is None:
+        hasher.calibrate(settings.hash_target_ms, settings.bcrypt_min_rounds)
+    hasher.start()
+    if settings.user_cache_enabled:
+        get_user_cache_listener().start()
+    await load_revocations()
+    startup_report.record_lifespan(started)
     yield
     # Shutdown
-    postgres_client.close()
+    hasher.shutdown()
+    await close_clients()
+
+
+def create_app() -> FastAPI:
+    """Build the app, its middleware and the routers for the current settings."""
+    settings = get_settings()
+    app = FastAPI(lifespan=lifespan)
+    app.router.route_class = InstrumentedRoute
+    app.add_middleware(DbStatsMiddleware)
+    if settings.database_replica_urls:
+        app.add_middleware(
+            ReadYourWritesMiddleware,
+            window_seconds=settings.read_your_writes_seconds,
+        )
+    # Inside MetricsMiddleware, so shed requests are recorded as 503s
+    if settings.admission_control_enabled:
+        app.add_middleware(
+            AdmissionMiddleware,
+            controller=get_admission_controller(),
+            retry_after_seconds=settings.admission_retry_after_seconds,
+        )
+    if settings.metrics_enabled:
+        app.add_middleware(MetricsMiddleware)
+    app.add_middleware(StartupReportMiddleware)
+
+    # DB_MODE picks the request path at startup: threadpool (sync) or event loop
+    # (async) (only the selected router, and its repositories, are imported)
+    if settings.db_mode == "async":
+        from app.routers.async_auth import router as auth_router
+        from app.routers.async_users import router as async_users_router
 
+        app.include_router(async_users_router)
+    else:
+        from app.routers.auth import router as auth_router
+        from app.routers.users import router as users_router
 
-app = FastAPI(lifespan=lifespan)
+        app.include_router(users_router)
+    app.include_router(auth_router)
+    app.include_router(internal_router)
+    if settings.metrics_enabled:
+        from app.routers.metrics import router as metrics_router
 
-app.include_router(users_router)
+        app.include_router(metrics_router)
+    return app
+
+
+app = create_app()
 
 
 @app.get("/")
@@ -60,3 +164,6 @@ def get_current_environment() -> Dict[str, str]:
 def greet(name: str) -> Dict[str, str]:
     # settings = get_settings()
     return {"greet": f"Hello {name}", "status": "200"}
+
+
+startup_report.record_import()
@@ -2,7 +2,7 @@ from uuid import uuid4, UUID
 from datetime import datetime
 
 from sqlmodel import SQLModel, Field, Column
-from sqlalchemy import String, DateTime, func
+from sqlalchemy import String, DateTime, Index, Integer, func, text
 
 
 class UserBase(SQLModel):
@@ -14,6 +14,39 @@ class UserBase(SQLModel):
 
 
 class User(UserBase, table=True):
+    # Backs keyset pagination: ORDER BY create_at, id WHERE (create_at, id) > cursor
+    __table_args__ = (
+        Index(
+            "ix_user_create_at_id",
+            "create_at",
+            "id",
+            # Page versions for conditional GETs are read from the index alone
+            postgresql_include=["update_at"],
+        ),
+        # Recent revocations, loaded by every worker at startup
+        Index(
+            "ix_user_tokens_revoked_at",
+            "tokens_revoked_at",
+            postgresql_where=text("tokens_revoked_at IS NOT NULL"),
+        ),
+        # User search: email prefixes in order, and substrings through pg_trgm
+        Index("ix_user_lower_email", text('(lower(email) COLLATE "C")'), "id"),
+        Index(
+            "ix_user_email_trgm",
+            "email",
+            postgresql_using="gin",
+            postgresql_ops={"email": "gin_trgm_ops"},
+        ),
+        Index(
+            "ix_user_full_name_trgm",
+            "full_name",
+            postgresql_using="gin",
+            postgresql_ops={"full_name": "gin_trgm_ops"},
+        ),
+    )
+    # Fetch server-generated create_at/update_at with RETURNING on flush
+    __mapper_args__ = {"eager_defaults": True}
+
     id: UUID | None = Field(default_factory=uuid4, primary_key=True)
     hashed_password: str = Field(sa_column=Column(String, nullable=False))
     create_at: datetime | None = Field(
@@ -26,3 +59,12 @@ class User(UserBase, table=True):
         default=None,
         sa_column=Column(DateTime(timezone=True), onupdate=func.now(), nullable=True),
     )
+    # Bumped to revoke every token issued to the user; tokens carry the
+    # generation they were issued for
+    token_generation: int = Field(
+        default=0,
+        sa_column=Column(Integer, server_default=text("0"), nullable=False),
+    )
+    tokens_revoked_at: datetime | None = Field(
+        default=None, sa_column=Column(DateTime(timezone=True), nullable=True)
+    )
@@ -0,0 +1,300 @@
+from contextlib import nullcontext
+from datetime import datetime
+from typing import AsyncGenerator, Hashable, Sequence
+from uuid import UUID
+
+from pydantic import EmailStr
+from sqlalchemy import Row, func, update
+from sqlalchemy.dialects.postgresql import insert
+from uuid import uuid4
+from sqlmodel import select
+
+from app.models.user import User
+from app.schemas.user import UserCreate
+from app.clients.async_postgres_client import AsyncPostgresClient
+from app.clients.replicas import reads_use_primary, use_primary
+from app.core.batching import AsyncBatchLoader
+from app.core.conditional import PageVersion
+from app.core.pagination import get_count_cache
+from app.core.tokens import AUTH_REVOCATION_CHANNEL, revocation_payload
+from app.respositories.user_repository import (
+    ESTIMATED_COUNT_SQL,
+    READ_COLUMNS,
+    USERS_BY_IDS,
+    export_statement,
+    page_version,
+    page_version_statement,
+    paginate,
+    restore_user,
+    revoke_tokens_statement,
+    search_statement,
+    versioned_page,
+    versioned_page_statement,
+)
+
+
+async def load_users_async(group: Hashable, ids: list[UUID]) -> dict[UUID, User]:
+    """AsyncBatchLoader function, see load_users."""
+    client, primary = group
+    with use_primary() if primary else nullcontext():
+        users = await AsyncUserRepository(client).get_many(ids)
+    return {user.id: user for user in users}
+
+
+class AsyncUserRepository:
+    """
+    Async repository for User data access operations.
+    Mirrors UserRepository on top of AsyncPostgresClient.
+    """
+
+    def __init__(
+        self, client: AsyncPostgresClient, loader: AsyncBatchLoader | None = None
+    ):
+        self.client = client
+        self.loader = loader
+
+    async def create(self, user_create: UserCreate, hashed_password: str) -> User:
+        """Create a new user with hashed password."""
+        user = User(
+            email=user_create.email,
+            full_name=user_create.full_name,
+            hashed_password=hashed_password,
+        )
+
+        async with self.client.get_session_context() as session:
+            session.add(user)
+            await session.commit()
+            get_count_cache().invalidate(self.client.database_url)
+            return user
+
+    async def register(
+        self, user_create: UserCreate, hashed_password: str
+    ) -> User | None:
+        """Single round-trip INSERT ... ON CONFLICT, see UserRepository.register."""
+        statement = (
+            insert(User)
+            .values(
+                id=uuid4(),
+                email=user_create.email,
+                full_name=user_create.full_name,
+                is_active=True,
+                hashed_password=hashed_password,
+            )
+            .on_conflict_do_nothing(index_elements=["email"])
+            .returning(User)
+        )
+        async with self.client.get_session_context() as session:
+            result = await session.exec(statement)
+            user = result.scalar_one_or_none()
+            await session.commit()
+            get_count_cache().invalidate(self.client.database_url)
+            return user
+
+    async def insert_many(self, rows: list[dict]) -> list[tuple[UUID, str]]:
+        """Multi-row INSERT ... ON CONFLICT DO NOTHING, see UserRepository."""
+        if not rows:
+            return []
+        statement = (
+            insert(User)
+            .values(rows)
+            .on_conflict_do_nothing(index_elements=["email"])
+            .returning(User.id, User.email)
+        )
+        async with self.client.get_session_context() as session:
+            result = await session.exec(statement)
+            inserted = result.all()
+            await session.commit()
+            get_count_cache().invalidate(self.client.database_url)
+            return [(row.id, row.email) for row in inserted]
+
+    async def register_many(self, rows: list[dict]) -> Sequence[User]:
+        """Multi-row INSERT ... RETURNING, see UserRepository.register_many."""
+        if not rows:
+            return []
+        statement = (
+            insert(User)
+            .values(rows)
+            .on_conflict_do_nothing(index_elements=["email"])
+            .returning(User)
+        )
+        async with self.client.get_session_context() as session:
+            result = await session.exec(statement)
+            users = result.scalars().all()
+            await session.commit()
+            get_count_cache().invalidate(self.client.database_url)
+            return users
+
+    async def existing_emails(self, emails: list[str]) -> set[str]:
+        """Return which of the given emails are already registered."""
+        if not emails:
+            return set()
+        async with self.client.get_session_context(read_only=True) as session:
+            statement = select(User.email).where(User.email.in_(emails))
+            result = await session.exec(statement)
+            return set(result.all())
+
+    async def get_by_id(self, user_id: UUID) -> User | None:
+        """Retrieve user by ID, batched with concurrent lookups by the loader."""
+        if self.loader is not None:
+            user = await self.loader.load(user_id, (self.client, reads_use_primary()))
+            return restore_user(user.model_dump()) if user is not None else None
+        async with self.client.get_session_context(read_only=True) as session:
+            return await session.get(User, user_id)
+
+    async def get_many(self, ids: Sequence[UUID]) -> Sequence[User]:
+        """Retrieve the users with the given ids, in no particular order."""
+        if not ids:
+            return []
+        async with self.client.get_session_context(read_only=True) as session:
+            result = await session.exec(USERS_BY_IDS, params={"ids": list(ids)})
+            return result.all()
+
+    async def get_by_email(self, email: EmailStr) -> User | None:
+        """Retrieve user by email address."""
+        async with self.client.get_session_context(read_only=True) as session:
+            statement = select(User).where(User.email == email)
+            result = await session.exec(statement)
+            return result.first()
+
+    async def list(
+        self,
+        limit: int = 100,
+        offset: int = 0,
+        after: tuple[datetime, UUID] | None = None,
+    ) -> Sequence[User]:
+        """List users in stable (create_at, id) order, see paginate()."""
+        statement = paginate(select(User), limit, offset, after)
+        async with self.client.get_session_context(read_only=True) as session:
+            result = await session.exec(statement)
+            return result.all()
+
+    async def list_rows(
+        self,
+        limit: int = 100,
+        offset: int = 0,
+        after: tuple[datetime, UUID] | None = None,
+    ) -> Sequence[Row]:
+        """Page of plain UserRead rows, see UserRepository.list_rows."""
+        statement = paginate(select(*READ_COLUMNS), limit, offset, after)
+        async with self.client.get_session_context(read_only=True) as session:
+            result = await session.exec(statement)
+            return result.all()
+
+    async def list_page(
+        self,
+        limit: int = 100,
+        offset: int = 0,
+        after: tuple[datetime, UUID] | None = None,
+    ) -> tuple[Sequence[Row], PageVersion]:
+        """Page of rows with its PageVersion, see UserRepository.list_page."""
+        statement = versioned_page_statement(limit, offset, after)
+        async with self.client.get_session_context(read_only=True) as session:
+            rows = (await session.exec(statement)).all()
+        return rows, versioned_page(rows)
+
+    async def page_version(
+        self,
+        limit: int = 100,
+        offset: int = 0,
+        after: tuple[datetime, UUID] | None = None,
+    ) -> PageVersion:
+        """PageVersion of a page, see UserRepository.page_version."""
+        statement = page_version_statement(limit, offset, after)
+        async with self.client.get_session_context(read_only=True) as session:
+            *aggregates, last_id = (await session.exec(statement)).one()
+        return page_version(aggregates, last_id)
+
+    async def search(
+        self, query: str, limit: int = 20, after: tuple[int, str, UUID] | None = None
+    ) -> Sequence[Row]:
+        """Page of search results, see UserRepository.search."""
+        statement = search_statement(query, limit, after)
+        async with self.client.get_session_context(read_only=True) as session:
+            result = await session.exec(statement)
+            return result.all()
+
+    async def stream_export(
+        self,
+        is_active: bool | None = None,
+        created_from: datetime | None = None,
+        created_to: datetime | None = None,
+        batch_size: int = 1000,
+    ) -> AsyncGenerator[Sequence[Row], None]:
+        """Stream export rows in batches, see UserRepository.stream_export."""
+        statement = export_statement(is_active, created_from, created_to)
+        async for partition in self.client.stream(
+            statement, batch_size=batch_size, read_only=True
+        ):
+            yield partition
+
+    async def count_estimate(self) -> int | None:
+        """Approximate number of users, see UserRepository.count_estimate."""
+        async with self.client.get_session_context(read_only=True) as session:
+            result = await session.exec(
+                ESTIMATED_COUNT_SQL, params={"table_name": f'"{User.__tablename__}"'}
+            )
+            estimate = result.scalar()
+        if estimate is None or estimate < 0:
+            return None
+        return estimate
+
+    async def count_exact(self) -> int:
+        """Exact number of users, cached for a short TTL."""
+
+        async def _count() -> int:
+            async with self.client.get_session_context(read_only=True) as session:
+                result = await session.exec(select(func.count()).select_from(User))
+                return result.one()
+
+        return await get_count_cache().get_or_compute_async(
+            self.client.database_url, _count
+        )
+
+    async def update(self, user: User, **kwargs) -> User:
+        """Update user with given attributes."""
+        async with self.client.get_session_context() as session:
+            for k, v in kwargs.items():
+                setattr(user, k, v)
+            session.add(user)
+            await session.commit()
+            return user
+
+    async def patch(
+        self,
+        user_id: UUID,
+        values: dict,
+        expected_versions: Sequence[datetime] | None = None,
+    ) -> User | None:
+        """Single-statement partial update, see UserRepository.patch."""
+        statement = update(User).where(User.id == user_id).values(**values)
+        if expected_versions is not None:
+            statement = statement.where(
+                func.coalesce(User.update_at, User.create_at).in_(expected_versions)
+            )
+        async with self.client.get_session_context() as session:
+            result = await session.exec(statement.returning(User))
+            user = result.scalar_one_or_none()
+            await session.commit()
+            return user
+
+    async def revoke_tokens(self, user_id: UUID) -> User | None:
+        """Bump token_generation and announce it, see UserRepository.revoke_tokens."""
+        async with self.client.get_session_context() as session:
+            result = await session.exec(revoke_tokens_statement(user_id))
+            user = result.scalar_one_or_none()
+            await session.commit()
+        if user is not None:
+            await self.client.notify(
+                AUTH_REVOCATION_CHANNEL,
+                revocation_payload(
+                    user.id, user.token_generation, user.tokens_revoked_at.timestamp()
+                ),
+            )
+        return user
+
+    async def delete(self, user: User) -> None:
+        """Delete a user."""
+        async with self.client.get_session_context() as session:
+            await session.delete(user)
+            await session.commit()
+            get_count_cache().invalidate(self.client.database_url)
@@ -0,0 +1,401 @@
+import json
+import os
+from datetime import datetime
+from typing import Any, Hashable, Sequence
+from uuid import UUID, uuid4
+
+from pydantic import EmailStr
+from sqlalchemy.exc import DataError, IntegrityError
+
+from app.clients.async_postgres_client import AsyncPostgresClient
+from app.clients.postgres_client import PostgresClient
+from app.core.cache import MISS, TTLLRUCache
+from app.db.unit_of_work import UnitOfWork
+from app.models.user import User
+from app.schemas.user import UserCreate
+from app.respositories.user_repository import UserRepository, restore_user
+from app.respositories.async_user_repository import AsyncUserRepository
+
+# NOTIFY channel used to spread invalidations to every worker and node
+USER_CACHE_CHANNEL = "user_cache_invalidation"
+
+# (pid, id) of this process, see instance_id()
+_instance: tuple[int, str] | None = None
+
+
+def instance_id() -> str:
+    """
+    Identifies this process, so it can skip its own invalidation messages.
+
+    Keyed by pid: workers forked from a preloading master each get their own
+    id instead of inheriting the master's, which would make them drop each
+    other's messages.
+    """
+    global _instance
+    pid = os.getpid()
+    if _instance is None or _instance[0] != pid:
+        _instance = (pid, uuid4().hex)
+    return _instance[1]
+
+
+def id_key(user_id: UUID) -> Hashable:
+    return ("id", user_id)
+
+
+def email_key(email: str) -> Hashable:
+    return ("email", str(email))
+
+
+def user_keys(user: User) -> list[Hashable]:
+    return [id_key(user.id), email_key(user.email)]
+
+
+def invalidation_payload(keys: list[Hashable]) -> str:
+    return json.dumps(
+        {"origin": instance_id(), "keys": [[kind, str(value)] for kind, value in keys]}
+    )
+
+
+def apply_invalidation(cache: TTLLRUCache, payload: str) -> None:
+    """Handle a NOTIFY payload from another process: drop the listed keys."""
+    message = json.loads(payload)
+    if message.get("origin") == instance_id():
+        return
+    keys = [
+        id_key(UUID(value)) if kind == "id" else email_key(value)
+        for kind, value in message["keys"]
+    ]
+    cache.invalidate(*keys)
+
+
+class CachedUserRepository:
+    """
+    Read-through cache in front of UserRepository.
+
+    get_by_id/get_by_email are answered from an in-process TTL/LRU cache,
+    including cached misses. Writes invalidate the affected keys locally once
+    committed and broadcast them to the other workers through Postgres
+    NOTIFY. Every other method is delegated to the wrapped repository
+    unchanged.
+    """
+
+    def __init__(self, repo: UserRepository, cache: TTLLRUCache):
+        self.repo = repo
+        self.cache = cache
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.repo, name)
+
+    def get_by_id(self, user_id: UUID) -> User | None:
+        cached = self.cache.get(id_key(user_id))
+        if cached is MISS:
+            generation = self.cache.generation
+            user = self.repo.get_by_id(user_id)
+            self._store(id_key(user_id), user, generation)
+            return user
+        return restore_user(cached) if cached is not None else None
+
+    def get_many(self, ids: Sequence[UUID]) -> list[User]:
+        """Cached users by id; the misses are fetched in one query."""
+        users, missing = self._cached_many(ids)
+        if missing:
+            generation = self.cache.generation
+            found = self.repo.get_many(missing)
+            users += self._store_many(missing, found, generation)
+        return users
+
+    def get_by_email(self, email: EmailStr) -> User | None:
+        cached = self.cache.get(email_key(email))
+        if cached is MISS:
+            generation = self.cache.generation
+            user = self.repo.get_by_email(email)
+            self._store(email_key(email), user, generation)
+            return user
+        return restore_user(cached) if cached is not None else None
+
+    def create(self, user_create: UserCreate, hashed_password: str) -> User:
+        user = self.repo.create(
+            user_create=user_create, hashed_password=hashed_password
+        )
+        self._invalidate([email_key(user.email)])
+        return user
+
+    def register(self, user_create: UserCreate, hashed_password: str) -> User | None:
+        user = self.repo.register(
+            user_create=user_create, hashed_password=hashed_password
+        )
+        if user is not None:
+            self._invalidate([email_key(user.email)])
+        return user
+
+    def insert_many(self, rows: list[dict]) -> list[tuple[UUID, str]]:
+        inserted = self.repo.insert_many(rows)
+        self._invalidate([email_key(email) for _, email in inserted])
+        return inserted
+
+    def register_many(self, rows: list[dict]) -> Sequence[User]:
+        users = self.repo.register_many(rows)
+        self._invalidate([email_key(user.email) for user in users])
+        return users
+
+    def update(self, user: User, **kwargs) -> User:
+        stale_keys = user_keys(user)
+        user = self.repo.update(user, **kwargs)
+        self._invalidate(stale_keys + [email_key(user.email)])
+        return user
+
+    def patch(
+        self,
+        user_id: UUID,
+        values: dict,
+        expected_versions: Sequence[datetime] | None = None,
+    ) -> User | None:
+        user = self.repo.patch(user_id, values, expected_versions)
+        if user is not None:
+            self._invalidate(user_keys(user))
+        return user
+
+    def revoke_tokens(self, user_id: UUID) -> User | None:
+        user = self.repo.revoke_tokens(user_id)
+        if user is not None:
+            self._invalidate(user_keys(user))
+        return user
+
+    def delete(self, user: User) -> None:
+        keys = user_keys(user)
+        self.repo.delete(user)
+        self._invalidate(keys)
+
+    def _cached_many(self, ids: Sequence[UUID]) -> tuple[list[User], list[UUID]]:
+        users, missing = [], []
+        for user_id in ids:
+            cached = self.cache.get(id_key(user_id))
+            if cached is MISS:
+                missing.append(user_id)
+            elif cached is not None:
+                users.append(restore_user(cached))
+        return users, missing
+
+    def _store_many(
+        self, ids: list[UUID], users: Sequence[User], generation: int
+    ) -> list[User]:
+        found = {user.id: user for user in users}
+        for user_id in ids:
+            self._store(id_key(user_id), found.get(user_id), generation)
+        return list(found.values())
+
+    def _store(self, key: Hashable, user: User | None, generation: int) -> None:
+        # generation was read before the query: an update committed since
+        # then may have invalidated this row, which is then not cached
+        if user is None:
+            self.cache.set(key, None, generation)
+            return
+        data = user.model_dump()
+        for user_key in user_keys(user):
+            self.cache.set(user_key, data, generation)
+
+    def _invalidate(self, keys: list[Hashable]) -> None:
+        if not keys:
+            return
+        self.repo.client.notify(USER_CACHE_CHANNEL, invalidation_payload(keys))
+        # Dropped before the commit, the keys could be cached again from the
+        # old rows by a concurrent read
+        self.repo.client.after_commit(lambda: self.cache.invalidate(*keys))
+
+
+class AsyncCachedUserRepository:
+    """Read-through cache in front of AsyncUserRepository, see CachedUserRepository."""
+
+    def __init__(self, repo: AsyncUserRepository, cache: TTLLRUCache):
+        self.repo = repo
+        self.cache = cache
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.repo, name)
+
+    async def get_by_id(self, user_id: UUID) -> User | None:
+        cached = self.cache.get(id_key(user_id))
+        if cached is MISS:
+            generation = self.cache.generation
+            user = await self.repo.get_by_id(user_id)
+            self._store(id_key(user_id), user, generation)
+            return user
+        return restore_user(cached) if cached is not None else None
+
+    async def get_many(self, ids: Sequence[UUID]) -> list[User]:
+        """Cached users by id; the misses are fetched in one query."""
+        users, missing = self._cached_many(ids)
+        if missing:
+            generation = self.cache.generation
+            found = await self.repo.get_many(missing)
+            users += self._store_many(missing, found, generation)
+        return users
+
+    async def get_by_email(self, email: EmailStr) -> User | None:
+        cached = self.cache.get(email_key(email))
+        if cached is MISS:
+            generation = self.cache.generation
+            user = await self.repo.get_by_email(email)
+            self._store(email_key(email), user, generation)
+            return user
+        return restore_user(cached) if cached is not None else None
+
+    async def create(self, user_create: UserCreate, hashed_password: str) -> User:
+        user = await self.repo.create(
+            user_create=user_create, hashed_password=hashed_password
+        )
+        await self._invalidate([email_key(user.email)])
+        return user
+
+    async def register(
+        self, user_create: UserCreate, hashed_password: str
+    ) -> User | None:
+        user = await self.repo.register(
+            user_create=user_create, hashed_password=hashed_password
+        )
+        if user is not None:
+            await self._invalidate([email_key(user.email)])
+        return user
+
+    async def insert_many(self, rows: list[dict]) -> list[tuple[UUID, str]]:
+        inserted = await self.repo.insert_many(rows)
+        await self._invalidate([email_key(email) for _, email in inserted])
+        return inserted
+
+    async def register_many(self, rows: list[dict]) -> Sequence[User]:
+        users = await self.repo.register_many(rows)
+        await self._invalidate([email_key(user.email) for user in users])
+        return users
+
+    async def update(self, user: User, **kwargs) -> User:
+        stale_keys = user_keys(user)
+        user = await self.repo.update(user, **kwargs)
+        await self._invalidate(stale_keys + [email_key(user.email)])
+        return user
+
+    async def patch(
+        self,
+        user_id: UUID,
+        values: dict,
+        expected_versions: Sequence[datetime] | None = None,
+    ) -> User | None:
+        user = await self.repo.patch(user_id, values, expected_versions)
+        if user is not None:
+            await self._invalidate(user_keys(user))
+        return user
+
+    async def revoke_tokens(self, user_id: UUID) -> User | None:
+        user = await self.repo.revoke_tokens(user_id)
+        if user is not None:
+            await self._invalidate(user_keys(user))
+        return user
+
+    async def delete(self, user: User) -> None:
+        keys = user_keys(user)
+        await self.repo.delete(user)
+        await self._invalidate(keys)
+
+    def _cached_many(self, ids: Sequence[UUID]) -> tuple[list[User], list[UUID]]:
+        users, missing = [], []
+        for user_id in ids:
+            cached = self.cache.get(id_key(user_id))
+            if cached is MISS:
+                missing.append(user_id)
+            elif cached is not None:
+                users.append(restore_user(cached))
+        return users, missing
+
+    def _store_many(
+        self, ids: list[UUID], users: Sequence[User], generation: int
+    ) -> list[User]:
+        found = {user.id: user for user in users}
+        for user_id in ids:
+            self._store(id_key(user_id), found.get(user_id), generation)
+        return list(found.values())
+
+    def _store(self, key: Hashable, user: User | None, generation: int) -> None:
+        if user is None:
+            self.cache.set(key, None, generation)
+            return
+        data = user.model_dump()
+        for user_key in user_keys(user):
+            self.cache.set(user_key, data, generation)
+
+    async def _invalidate(self, keys: list[Hashable]) -> None:
+        if not keys:
+            return
+        # Async repository writes commit their own session: this runs after
+        self.cache.invalidate(*keys)
+        await self.repo.client.notify(USER_CACHE_CHANNEL, invalidation_payload(keys))
+
+
+def commit_registrations(
+    client: PostgresClient, rows: list[dict], cache: TTLLRUCache | None = None
+) -> list[User | None | Exception]:
+    """
+    BatchWriter function: register a batch of users in one transaction.
+
+    The multi-row INSERT and, with a cache, the single NOTIFY invalidating
+    the new emails are committed together: one commit (and WAL flush) for
+    the whole batch. A row the database rejects fails the whole statement;
+    the rows are then registered one by one, so that only its caller gets
+    the error.
+
+    Returns:
+        list: The new user for each row, None if its email was taken, or
+            the error that rejected the row
+    """
+    try:
+        return _register_rows(client, rows, cache)
+    except (DataError, IntegrityError):
+        if len(rows) == 1:
+            raise
+    results = []
+    for row in rows:
+        try:
+            results += _register_rows(client, [row], cache)
+        except (DataError, IntegrityError) as exc:
+            results.append(exc)
+    return results
+
+
+def _register_rows(
+    client: PostgresClient, rows: list[dict], cache: TTLLRUCache | None
+) -> list[User | None]:
+    with UnitOfWork(client) as uow:
+        repo = UserRepository(uow)
+        if cache is not None:
+            repo = CachedUserRepository(repo, cache)
+        inserted = {user.id: user for user in repo.register_many(rows)}
+    return [inserted.get(row["id"]) for row in rows]
+
+
+async def commit_registrations_async(
+    client: AsyncPostgresClient, rows: list[dict], cache: TTLLRUCache | None = None
+) -> list[User | None | Exception]:
+    """
+    AsyncBatchWriter function, see commit_registrations. Without a unit of
+    work, the cache NOTIFY is a second transaction per batch.
+    """
+    try:
+        return await _register_rows_async(client, rows, cache)
+    except (DataError, IntegrityError):
+        if len(rows) == 1:
+            raise
+    results = []
+    for row in rows:
+        try:
+            results += await _register_rows_async(client, [row], cache)
+        except (DataError, IntegrityError) as exc:
+            results.append(exc)
+    return results
+
+
+async def _register_rows_async(
+    client: AsyncPostgresClient, rows: list[dict], cache: TTLLRUCache | None
+) -> list[User | None]:
+    repo = AsyncUserRepository(client)
+    if cache is not None:
+        repo = AsyncCachedUserRepository(repo, cache)
+    inserted = {user.id: user for user in await repo.register_many(rows)}
+    return [inserted.get(row["id"]) for row in rows]
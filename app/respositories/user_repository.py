@@ -1,22 +1,336 @@
-from typing import Sequence
+from contextlib import nullcontext
+from datetime import datetime
+from functools import partial
+from typing import Generator, Hashable, Sequence
 from uuid import UUID
 
 from pydantic import EmailStr
+from sqlalchemy import (
+    Row,
+    Select,
+    String,
+    Update,
+    any_,
+    bindparam,
+    case,
+    cast,
+    func,
+    literal,
+    or_,
+    text,
+    tuple_,
+    update,
+)
+from sqlalchemy.dialects.postgresql import (
+    ARRAY,
+    aggregate_order_by,
+    array_agg,
+    insert,
+)
+from sqlalchemy.orm import make_transient_to_detached
+from uuid import uuid4
 from sqlmodel import select
 
 from app.models.user import User
 from app.schemas.user import UserCreate
 from app.clients.postgres_client import PostgresClient
+from app.clients.replicas import reads_use_primary, use_primary
+from app.db.unit_of_work import UnitOfWork
+from app.core.batching import BatchLoader
+from app.core.conditional import PageVersion
+from app.core.pagination import get_count_cache
+from app.core.tokens import AUTH_REVOCATION_CHANNEL, revocation_payload
+
+# Planner estimate of the table size, refreshed by ANALYZE/autovacuum
+ESTIMATED_COUNT_SQL = text(
+    "SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:table_name)"
+)
+
+# Columns behind UserRead, plus create_at for keyset cursors
+READ_COLUMNS = (User.id, User.email, User.full_name, User.is_active, User.create_at)
+
+# One array parameter whatever the number of ids: a single statement text, so
+# psycopg can prepare it (IN would render one placeholder per id)
+USERS_BY_IDS = select(User).where(
+    User.id == any_(bindparam("ids", type_=ARRAY(User.id.type)))
+)
+
+
+def revoke_tokens_statement(user_id: UUID) -> Update:
+    """Bump the user's token generation, returning the updated row."""
+    return (
+        update(User)
+        .where(User.id == user_id)
+        .values(
+            token_generation=User.token_generation + 1,
+            tokens_revoked_at=func.now(),
+        )
+        .returning(User)
+    )
+
+
+def restore_user(data: dict) -> User:
+    """
+    Rebuild a detached User from a snapshot (cached or shared by a batch).
+
+    Every caller gets its own instance, so it can modify it (and pass it to
+    update()) without touching what other requests read.
+    """
+    user = User(**data)
+    make_transient_to_detached(user)
+    return user
+
+
+def base_client(client: PostgresClient | UnitOfWork) -> PostgresClient:
+    """The client behind a request's unit of work (or the client itself)."""
+    return client.client if isinstance(client, UnitOfWork) else client
+
+
+def loader_group(client: PostgresClient | UnitOfWork) -> Hashable:
+    """
+    Callers whose get_by_id() one batched query can serve: those reading
+    through the same client, and pinned (or not) to the primary alike.
+    """
+    return (base_client(client), reads_use_primary())
+
+
+def load_users(group: Hashable, ids: list[UUID]) -> dict[UUID, User]:
+    """BatchLoader function: fetch the users of one loader_group() batch."""
+    client, primary = group
+    with use_primary() if primary else nullcontext():
+        return {user.id: user for user in UserRepository(client).get_many(ids)}
+
+
+def paginate(
+    statement: Select,
+    limit: int,
+    offset: int = 0,
+    after: tuple[datetime, UUID] | None = None,
+) -> Select:
+    """
+    Order a users select by (create_at, id) and restrict it to one page.
+
+    Args:
+        statement: Select over the user table
+        limit: Page size
+        offset: Rows to skip, only used when no keyset is given
+        after: (create_at, id) of the previous page's last row; seeks
+            through ix_user_create_at_id so deep pages cost the same as the
+            first one
+    """
+    statement = statement.order_by(User.create_at, User.id).limit(limit)
+    if after is not None:
+        return statement.where(tuple_(User.create_at, User.id) > after)
+    if offset:
+        return statement.offset(offset)
+    return statement
+
+
+# Window-function columns carrying the PageVersion in list_page() rows
+VERSION_COLUMNS = (
+    "page_count",
+    "page_last_create_at",
+    "page_last_modified",
+    "page_checksum",
+)
+
+
+def _version_aggregates(window) -> list:
+    """
+    Aggregates over a page window that make up its PageVersion.
+
+    The checksum covers each row's id and last write time: a newest-write
+    maximum alone would miss an update whose transaction started (and so
+    stamped update_at) before another row's last write.
+    """
+    modified = func.coalesce(window.c.update_at, window.c.create_at)
+    return [
+        func.count(),
+        func.max(window.c.create_at),
+        func.max(modified),
+        func.sum(func.hashtext(cast(window.c.id, String) + cast(modified, String))),
+    ]
+
+
+def page_version_statement(
+    limit: int, offset: int = 0, after: tuple[datetime, UUID] | None = None
+) -> Select:
+    """
+    PageVersion of a list_rows() page, without reading its rows.
+
+    Only id, create_at and update_at of the window are read, all of them from
+    ix_user_create_at_id (update_at is an included column): an index-only scan.
+    """
+    window = paginate(
+        select(User.id, User.create_at, User.update_at), limit, offset, after
+    ).subquery()
+    last_id = array_agg(
+        aggregate_order_by(window.c.id, window.c.create_at.desc(), window.c.id.desc())
+    )[1]
+    return select(*_version_aggregates(window), last_id)
+
+
+def versioned_page_statement(
+    limit: int, offset: int = 0, after: tuple[datetime, UUID] | None = None
+) -> Select:
+    """
+    list_rows() page whose rows also carry the page's PageVersion aggregates,
+    computed as window functions in the same round-trip.
+    """
+    window = paginate(
+        select(*READ_COLUMNS, User.update_at), limit, offset, after
+    ).subquery()
+    aggregates = [
+        aggregate.over().label(name)
+        for aggregate, name in zip(_version_aggregates(window), VERSION_COLUMNS)
+    ]
+    return select(
+        *(window.c[column.key] for column in READ_COLUMNS), *aggregates
+    ).order_by(window.c.create_at, window.c.id)
+
+
+def page_version(aggregates: Sequence | None, last_id: UUID | None) -> PageVersion:
+    """PageVersion from (count, last create_at, last modified, checksum)."""
+    if not aggregates or not aggregates[0]:
+        return PageVersion(0, None, None, None, 0)
+    count, last_create_at, last_modified, checksum = aggregates
+    return PageVersion(count, last_create_at, last_id, last_modified, int(checksum))
+
+
+def versioned_page(rows: Sequence[Row]) -> PageVersion:
+    """PageVersion of rows from versioned_page_statement()."""
+    if not rows:
+        return page_version(None, None)
+    first = rows[0]._mapping
+    return page_version([first[name] for name in VERSION_COLUMNS], rows[-1].id)
+
+
+# Shorter queries have no trigram to look up: they match email prefixes only
+MIN_TRIGRAM_QUERY_LENGTH = 3
+
+# Matches ix_user_lower_email, which serves prefix matches and their order
+SEARCH_SORT_KEY = func.lower(User.email).collate("C")
+
+
+def escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def search_statement(
+    query: str, limit: int, after: tuple[int, str, UUID] | None = None
+) -> Select:
+    """
+    Ranked, index-backed search over email and full_name.
+
+    Queries of MIN_TRIGRAM_QUERY_LENGTH characters or more match anywhere in
+    the email or name through the pg_trgm GIN indexes, ranked: exact email,
+    email prefix, name or name-word prefix, email substring, name substring;
+    then by email. Shorter queries match email prefixes, read in order from
+    the lower(email) index so the scan stops after one page.
+
+    Args:
+        query: Search text, matched case-insensitively
+        limit: Page size
+        after: (rank, sort_key, id) of the previous page's last row
+    """
+    term = query.strip().lower()
+    prefix = escape_like(term) + "%"
+    if len(term) < MIN_TRIGRAM_QUERY_LENGTH:
+        statement = (
+            select(
+                *READ_COLUMNS,
+                literal(0).label("rank"),
+                SEARCH_SORT_KEY.label("sort_key"),
+            )
+            .where(SEARCH_SORT_KEY.like(prefix, escape="\\"))
+            .order_by(SEARCH_SORT_KEY, User.id)
+            .limit(limit)
+        )
+        if after is not None:
+            statement = statement.where(
+                tuple_(SEARCH_SORT_KEY, User.id) > tuple_(after[1], after[2])
+            )
+        return statement
+
+    contains = "%" + escape_like(term) + "%"
+    email = func.lower(User.email)
+    full_name = func.lower(User.full_name)
+    rank = case(
+        (email == term, 0),
+        (email.like(prefix, escape="\\"), 1),
+        (
+            or_(
+                full_name.like(prefix, escape="\\"),
+                full_name.like("% " + prefix, escape="\\"),
+            ),
+            2,
+        ),
+        (User.email.ilike(contains, escape="\\"), 3),
+        else_=4,
+    )
+    statement = (
+        select(*READ_COLUMNS, rank.label("rank"), SEARCH_SORT_KEY.label("sort_key"))
+        .where(
+            or_(
+                User.email.ilike(contains, escape="\\"),
+                User.full_name.ilike(contains, escape="\\"),
+            )
+        )
+        .order_by(rank, SEARCH_SORT_KEY, User.id)
+        .limit(limit)
+    )
+    if after is not None:
+        statement = statement.where(
+            tuple_(rank, SEARCH_SORT_KEY, User.id) > tuple_(*after)
+        )
+    return statement
+
+
+def export_statement(
+    is_active: bool | None = None,
+    created_from: datetime | None = None,
+    created_to: datetime | None = None,
+) -> Select:
+    """
+    Column-only select used by exports, in (create_at, id) index order.
+
+    Args:
+        is_active: Only active (True) or inactive (False) users
+        created_from: Only users created at or after this instant
+        created_to: Only users created before this instant
+    """
+    statement = select(
+        User.id, User.email, User.full_name, User.is_active, User.create_at
+    ).order_by(User.create_at, User.id)
+    if is_active is not None:
+        statement = statement.where(User.is_active == is_active)
+    if created_from is not None:
+        statement = statement.where(User.create_at >= created_from)
+    if created_to is not None:
+        statement = statement.where(User.create_at < created_to)
+    return statement
 
 
 class UserRepository:
     """
     Repository for User data access operations.
-    Uses PostgresClient to abstract database connection details.
+    Uses PostgresClient to abstract database connection details; given a
+    UnitOfWork instead, all calls share the request's session and transaction.
     """
 
-    def __init__(self, client: PostgresClient):
+    def __init__(
+        self,
+        client: PostgresClient | UnitOfWork,
+        loader: BatchLoader | None = None,
+    ):
+        """
+        Args:
+            client: Client or unit of work the queries run on
+            loader: Coalesces concurrent get_by_id() calls into batched
+                get_many() queries (see load_users)
+        """
         self.client = client
+        self.loader = loader
 
     def create(self, user_create: UserCreate, hashed_password: str) -> User:
         """Create a new user with hashed password."""
@@ -28,39 +342,300 @@ class UserRepository:
 
         with self.client.get_session_context() as session:
             session.add(user)
-            session.commit()
-            session.refresh(user)
+            self.client.commit(session)
+            self._count_changed()
             return user
 
-    def get_by_id(self, user_id: UUID) -> User | None:
-        """Retrieve user by ID."""
+    def register(self, user_create: UserCreate, hashed_password: str) -> User | None:
+        """
+        Insert a user in a single round-trip.
+
+        Uses INSERT ... ON CONFLICT (email) DO NOTHING RETURNING, so the unique
+        index settles concurrent sign-ups for the same email: no pre-check
+        SELECT, no post-commit refresh and no IntegrityError.
+
+        Returns:
+            User | None: The new user, or None if the email is already taken
+        """
+        statement = (
+            insert(User)
+            .values(
+                id=uuid4(),
+                email=user_create.email,
+                full_name=user_create.full_name,
+                is_active=True,
+                hashed_password=hashed_password,
+            )
+            .on_conflict_do_nothing(index_elements=["email"])
+            .returning(User)
+        )
+        with self.client.get_session_context() as session:
+            user = session.exec(statement).scalar_one_or_none()
+            self.client.commit(session)
+            self._count_changed()
+            return user
+
+    def insert_many(self, rows: list[dict]) -> list[tuple[UUID, str]]:
+        """
+        Insert users with one multi-row INSERT ... ON CONFLICT DO NOTHING.
+
+        Args:
+            rows: Column values for each user, including id and hashed_password
+
+        Returns:
+            list: (id, email) of the rows actually inserted; conflicting
+                emails are skipped and missing from the result
+        """
+        if not rows:
+            return []
+        statement = (
+            insert(User)
+            .values(rows)
+            .on_conflict_do_nothing(index_elements=["email"])
+            .returning(User.id, User.email)
+        )
+        with self.client.get_session_context() as session:
+            inserted = session.exec(statement).all()
+            self.client.commit(session)
+            self._count_changed()
+            return [(row.id, row.email) for row in inserted]
+
+    def register_many(self, rows: list[dict]) -> Sequence[User]:
+        """
+        Insert users with one multi-row INSERT ... ON CONFLICT DO NOTHING
+        RETURNING, as register() does for one.
+
+        Args:
+            rows: Column values for each user, including id and hashed_password
+
+        Returns:
+            Sequence: The users inserted; rows whose email is taken, or
+                repeated earlier in rows, are skipped
+        """
+        if not rows:
+            return []
+        statement = (
+            insert(User)
+            .values(rows)
+            .on_conflict_do_nothing(index_elements=["email"])
+            .returning(User)
+        )
         with self.client.get_session_context() as session:
+            users = session.exec(statement).scalars().all()
+            self.client.commit(session)
+            self._count_changed()
+            return users
+
+    def existing_emails(self, emails: list[str]) -> set[str]:
+        """Return which of the given emails are already registered."""
+        if not emails:
+            return set()
+        with self.client.get_session_context(read_only=True) as session:
+            statement = select(User.email).where(User.email.in_(emails))
+            return set(session.exec(statement).all())
+
+    def get_by_id(self, user_id: UUID) -> User | None:
+        """
+        Retrieve user by ID.
+
+        With a loader, the lookup joins concurrent ones in a single batched
+        query; not once the unit of work has written, since a batch runs
+        outside its transaction and would miss its writes.
+        """
+        if self.loader is not None and not getattr(self.client, "wrote", False):
+            user = self.loader.load(user_id, loader_group(self.client))
+            return restore_user(user.model_dump()) if user is not None else None
+        with self.client.get_session_context(read_only=True) as session:
             return session.get(User, user_id)
 
+    def get_many(self, ids: Sequence[UUID]) -> Sequence[User]:
+        """Retrieve the users with the given ids, in no particular order."""
+        if not ids:
+            return []
+        with self.client.get_session_context(read_only=True) as session:
+            return session.exec(USERS_BY_IDS, params={"ids": list(ids)}).all()
+
     def get_by_email(self, email: EmailStr) -> User | None:
         """Retrieve user by email address."""
-        with self.client.get_session_context() as session:
+        with self.client.get_session_context(read_only=True) as session:
             statement = select(User).where(User.email == email)
             return session.exec(statement).first()
 
-    def list(self, limit: int = 100, offset: int = 0) -> Sequence[User]:
-        """List users with pagination."""
-        with self.client.get_session_context() as session:
-            statement = select(User).limit(limit).offset(offset)
+    def list(
+        self,
+        limit: int = 100,
+        offset: int = 0,
+        after: tuple[datetime, UUID] | None = None,
+    ) -> Sequence[User]:
+        """List users in stable (create_at, id) order, see paginate()."""
+        statement = paginate(select(User), limit, offset, after)
+        with self.client.get_session_context(read_only=True) as session:
+            return session.exec(statement).all()
+
+    def list_rows(
+        self,
+        limit: int = 100,
+        offset: int = 0,
+        after: tuple[datetime, UUID] | None = None,
+    ) -> Sequence[Row]:
+        """
+        Same page as list(), as plain rows of the UserRead columns plus
+        create_at; no ORM objects are built.
+        """
+        statement = paginate(select(*READ_COLUMNS), limit, offset, after)
+        with self.client.get_session_context(read_only=True) as session:
+            return session.exec(statement).all()
+
+    def list_page(
+        self,
+        limit: int = 100,
+        offset: int = 0,
+        after: tuple[datetime, UUID] | None = None,
+    ) -> tuple[Sequence[Row], PageVersion]:
+        """Same rows as list_rows(), with the PageVersion of the page."""
+        statement = versioned_page_statement(limit, offset, after)
+        with self.client.get_session_context(read_only=True) as session:
+            rows = session.exec(statement).all()
+        return rows, versioned_page(rows)
+
+    def page_version(
+        self,
+        limit: int = 100,
+        offset: int = 0,
+        after: tuple[datetime, UUID] | None = None,
+    ) -> PageVersion:
+        """PageVersion of a list_rows() page, see page_version_statement()."""
+        statement = page_version_statement(limit, offset, after)
+        with self.client.get_session_context(read_only=True) as session:
+            *aggregates, last_id = session.exec(statement).one()
+        return page_version(aggregates, last_id)
+
+    def search(
+        self, query: str, limit: int = 20, after: tuple[int, str, UUID] | None = None
+    ) -> Sequence[Row]:
+        """
+        Page of search results as UserRead rows plus create_at, rank and
+        sort_key, see search_statement().
+        """
+        statement = search_statement(query, limit, after)
+        with self.client.get_session_context(read_only=True) as session:
             return session.exec(statement).all()
 
+    def stream_export(
+        self,
+        is_active: bool | None = None,
+        created_from: datetime | None = None,
+        created_to: datetime | None = None,
+        batch_size: int = 1000,
+    ) -> Generator[Sequence[Row], None, None]:
+        """
+        Stream (id, email, full_name, is_active, create_at) rows in batches
+        through a server-side cursor; memory use does not grow with the table.
+        """
+        statement = export_statement(is_active, created_from, created_to)
+        yield from self.client.stream(statement, batch_size=batch_size, read_only=True)
+
+    def _count_changed(self) -> None:
+        # Under a unit of work, a count read before its commit must not be
+        # kept: drop the cached one only once the write is visible
+        self.client.after_commit(
+            partial(get_count_cache().invalidate, self.client.database_url)
+        )
+
+    def count_estimate(self) -> int | None:
+        """
+        Approximate number of users from pg_class, without scanning.
+
+        Returns:
+            int | None: The estimate, or None while the table has never been
+            analyzed (reltuples is -1); falling back to count(*) would scan it
+        """
+        with self.client.get_session_context(read_only=True) as session:
+            estimate = session.exec(
+                ESTIMATED_COUNT_SQL, params={"table_name": f'"{User.__tablename__}"'}
+            ).scalar()
+        if estimate is None or estimate < 0:
+            return None
+        return estimate
+
+    def count_exact(self) -> int:
+        """Exact number of users, cached for a short TTL."""
+
+        def _count() -> int:
+            with self.client.get_session_context(read_only=True) as session:
+                return session.exec(select(func.count()).select_from(User)).one()
+
+        return get_count_cache().get_or_compute(self.client.database_url, _count)
+
     def update(self, user: User, **kwargs) -> User:
-        """Update user with given attributes."""
+        """
+        Update user with given attributes.
+
+        update_at comes back through RETURNING (eager_defaults), so there is
+        no refresh. add() only matters for users loaded outside this session.
+        """
         with self.client.get_session_context() as session:
             for k, v in kwargs.items():
                 setattr(user, k, v)
             session.add(user)
-            session.commit()
-            session.refresh(user)
+            self.client.commit(session)
             return user
 
+    def patch(
+        self,
+        user_id: UUID,
+        values: dict,
+        expected_versions: Sequence[datetime] | None = None,
+    ) -> User | None:
+        """
+        Change some columns of a user in one UPDATE ... RETURNING, without
+        reading it first; update_at is set by the column's onupdate.
+
+        Args:
+            user_id: User to change
+            values: Columns to set
+            expected_versions: Only update if the user's last write time
+                (update_at, else create_at) is one of these
+
+        Returns:
+            User | None: The updated user, or None if no user has this id
+                (and one of the expected versions)
+        """
+        statement = update(User).where(User.id == user_id).values(**values)
+        if expected_versions is not None:
+            statement = statement.where(
+                func.coalesce(User.update_at, User.create_at).in_(expected_versions)
+            )
+        with self.client.get_session_context() as session:
+            user = session.exec(statement.returning(User)).scalar_one_or_none()
+            self.client.commit(session)
+            return user
+
+    def revoke_tokens(self, user_id: UUID) -> User | None:
+        """
+        Invalidate every token issued to a user so far.
+
+        Bumps token_generation in one UPDATE ... RETURNING and announces the
+        new generation on AUTH_REVOCATION_CHANNEL (delivered on commit).
+
+        Returns:
+            User | None: The updated user, or None if it does not exist
+        """
+        with self.client.get_session_context() as session:
+            user = session.exec(revoke_tokens_statement(user_id)).scalar_one_or_none()
+            self.client.commit(session)
+        if user is not None:
+            self.client.notify(
+                AUTH_REVOCATION_CHANNEL,
+                revocation_payload(
+                    user.id, user.token_generation, user.tokens_revoked_at.timestamp()
+                ),
+            )
+        return user
+
     def delete(self, user: User) -> None:
         """Delete a user."""
         with self.client.get_session_context() as session:
             session.delete(user)
-            session.commit()
+            self.client.commit(session)
+            self._count_changed()
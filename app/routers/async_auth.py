@@ -0,0 +1,67 @@
+from fastapi import APIRouter, Depends, Response, status
+
+from app.core.metrics import InstrumentedRoute
+from app.core.tokens import TokenClaims
+from app.dependencies.auth_dependencies import get_async_auth_service, get_token_claims
+from app.dependencies.db_dependencies import query_budget
+from app.routers.auth import me
+from app.schemas.auth import LoginRequest, RefreshRequest, TokenInfo, TokenResponse
+from app.services.async_auth_service import AsyncAuthService
+
+
+router = APIRouter(prefix="/auth", tags=["Auth"], route_class=InstrumentedRoute)
+
+
+@router.post(
+    "/login",
+    response_model=TokenResponse,
+    dependencies=[Depends(query_budget(1))],
+    responses={
+        401: {"description": "Incorrect email or password"},
+        403: {"description": "Inactive user"},
+        503: {"description": "Password hashing is saturated"},
+    },
+)
+async def login(
+    payload: LoginRequest,
+    service: AsyncAuthService = Depends(get_async_auth_service),
+):
+    return await service.login(payload.email, payload.password)
+
+
+@router.post(
+    "/refresh",
+    response_model=TokenResponse,
+    dependencies=[Depends(query_budget(1))],
+    responses={401: {"description": "Invalid, expired or revoked refresh token"}},
+)
+async def refresh(
+    payload: RefreshRequest,
+    service: AsyncAuthService = Depends(get_async_auth_service),
+):
+    return await service.refresh(payload.refresh_token)
+
+
+@router.post(
+    "/logout",
+    status_code=status.HTTP_204_NO_CONTENT,
+    # UPDATE, then the cache and revocation NOTIFYs
+    dependencies=[Depends(query_budget(3))],
+    responses={401: {"description": "Invalid, expired or revoked token"}},
+)
+async def logout(
+    claims: TokenClaims = Depends(get_token_claims),
+    service: AsyncAuthService = Depends(get_async_auth_service),
+):
+    await service.logout(claims)
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+
+# /auth/me never touches the database: the same handler serves both modes
+router.add_api_route(
+    "/me",
+    me,
+    methods=["GET"],
+    response_model=TokenInfo,
+    responses={401: {"description": "Invalid, expired or revoked token"}},
+)
@@ -0,0 +1,245 @@
+import math
+from datetime import datetime
+from fastapi import APIRouter, Depends, Header, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from typing import Literal, Sequence
+from uuid import UUID
+
+from app.dependencies.user_dependencies import get_async_user_service
+from app.config.settings import get_settings
+from app.core.export import EXPORT_MEDIA_TYPES
+from app.dependencies.db_dependencies import query_budget
+from app.core.json_items import json_items_request_body, read_json_items
+from app.core.conditional import etag_matches, http_date, page_headers, user_etag
+from app.core.pagination import next_search_cursor
+from app.schemas.user import (
+    BulkUserResponse,
+    UserCreate,
+    UserRead,
+    userUpdate,
+    user_read_rows_adapter,
+)
+from app.services.async_user_service import AsyncUserService
+
+
+router = APIRouter(prefix="/users", tags=["Users"])
+
+# Known-email lookup, INSERT and cache NOTIFY per batch
+BULK_QUERY_BUDGET = 3 * math.ceil(
+    get_settings().bulk_max_items / get_settings().bulk_batch_size
+)
+
+
+@router.post(
+    "/",
+    response_model=UserRead,
+    dependencies=[Depends(query_budget(2))],
+    responses={
+        409: {"description": "Email already registered"},
+        422: {"description": "Invalid input"},
+    },
+)
+async def create_user(
+    payload: UserCreate,
+    service: AsyncUserService = Depends(get_async_user_service),
+):
+    user = await service.register_user(payload)
+    return user
+
+
+@router.post(
+    "/bulk",
+    dependencies=[Depends(query_budget(BULK_QUERY_BUDGET))],
+    response_model=BulkUserResponse,
+    responses={
+        400: {"description": "Malformed JSON body"},
+        413: {"description": "Too many items"},
+        503: {"description": "Password hashing is saturated"},
+    },
+    openapi_extra=json_items_request_body("UserCreate"),
+)
+async def create_users_bulk(
+    request: Request,
+    service: AsyncUserService = Depends(get_async_user_service),
+):
+    items = await read_json_items(request, max_items=get_settings().bulk_max_items)
+    return await service.register_users_bulk(items)
+
+
+@router.get(
+    "/export",
+    dependencies=[Depends(query_budget(1))],
+    response_class=StreamingResponse,
+    responses={
+        200: {
+            "description": "All matching users, streamed",
+            "content": {media_type: {} for media_type in EXPORT_MEDIA_TYPES.values()},
+        }
+    },
+)
+async def export_users(
+    fmt: Literal["ndjson", "csv"] = Query("ndjson", alias="format"),
+    is_active: bool | None = Query(None),
+    created_from: datetime | None = Query(None, description="create_at >= value"),
+    created_to: datetime | None = Query(None, description="create_at < value"),
+    svc: AsyncUserService = Depends(get_async_user_service),
+):
+    chunks = svc.export_users(
+        fmt, is_active=is_active, created_from=created_from, created_to=created_to
+    )
+    return StreamingResponse(
+        chunks,
+        media_type=EXPORT_MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="users.{fmt}"'},
+    )
+
+
+@router.get(
+    "/search",
+    response_model=Sequence[UserRead],
+    dependencies=[Depends(query_budget(1))],
+    responses={400: {"description": "Invalid cursor"}},
+)
+async def search_users(
+    request: Request,
+    q: str = Query(
+        ...,
+        min_length=1,
+        max_length=100,
+        description="Part of an email or name; under 3 characters, an email prefix",
+    ),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: str | None = Query(None, description="X-Next-Cursor of the previous page"),
+    svc: AsyncUserService = Depends(get_async_user_service),
+):
+    rows = await svc.search_users(q, limit=limit, cursor=cursor)
+
+    headers = {}
+    cursor_after = next_search_cursor(rows, limit)
+    if cursor_after:
+        next_url = request.url.include_query_params(cursor=cursor_after)
+        headers["X-Next-Cursor"] = cursor_after
+        headers["Link"] = f'<{next_url}>; rel="next"'
+    return Response(
+        content=user_read_rows_adapter.dump_json([row._asdict() for row in rows]),
+        media_type="application/json",
+        headers=headers,
+    )
+
+
+@router.get(
+    "/",
+    response_model=Sequence[UserRead],
+    dependencies=[Depends(query_budget(3))],
+    responses={
+        304: {"description": "Page unchanged since the If-None-Match ETag"},
+        400: {"description": "Invalid cursor or ids"},
+    },
+)
+async def list_users(
+    request: Request,
+    limit: int = Query(10, ge=1, le=100),
+    offset: int = Query(0, ge=0, description="Ignored when a cursor is given"),
+    cursor: str | None = Query(None, description="X-Next-Cursor of the previous page"),
+    total: Literal["estimate", "exact"] | None = Query(
+        None, description="Return X-Total-Count, estimated or exact"
+    ),
+    ids: str | None = Query(
+        None,
+        description="Comma-separated ids: return these users instead of a page",
+    ),
+    svc: AsyncUserService = Depends(get_async_user_service),
+):
+    if ids is not None:
+        # Batch lookup for fan-out callers: one query for up to 100 users
+        users = await svc.get_users(ids)
+        return Response(
+            content=user_read_rows_adapter.dump_json(
+                [user.model_dump() for user in users]
+            ),
+            media_type="application/json",
+        )
+
+    total_headers = {}
+    # No estimate before the table's first ANALYZE: the header is left out
+    # rather than paying for a count(*) outside the query budget
+    count = await svc.count_users(exact=total == "exact") if total else None
+    if count is not None:
+        total_headers["X-Total-Count"] = str(count)
+        total_headers["X-Total-Count-Estimated"] = str(total == "estimate").lower()
+    # A changed total changes the representation too
+    etag_extra = tuple(total_headers.values())
+
+    # Polling clients: check the page version alone, answer 304 if unchanged
+    # (If-Modified-Since is ignored: a deleted row can leave the date as is)
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        version = await svc.page_version(limit=limit, offset=offset, cursor=cursor)
+        etag = version.etag(*etag_extra)
+        if etag_matches(if_none_match, etag):
+            return Response(
+                status_code=status.HTTP_304_NOT_MODIFIED,
+                headers=page_headers(request.url, version, limit, etag),
+            )
+
+    users, version = await svc.list_users(limit=limit, offset=offset, cursor=cursor)
+    etag = version.etag(*etag_extra)
+    headers = {**page_headers(request.url, version, limit, etag), **total_headers}
+
+    # Rows are already UserRead-shaped: skip response_model validation and
+    # serialize them to JSON bytes in one pass
+    return Response(
+        content=user_read_rows_adapter.dump_json([row._asdict() for row in users]),
+        media_type="application/json",
+        headers=headers,
+    )
+
+
+@router.get(
+    "/{user_id}",
+    response_model=UserRead,
+    dependencies=[Depends(query_budget(1))],
+    responses={
+        304: {"description": "User unchanged since the If-None-Match ETag"},
+        404: {"description": "User not found"},
+    },
+)
+async def get_user(
+    user_id: UUID,
+    request: Request,
+    response: Response,
+    svc: AsyncUserService = Depends(get_async_user_service),
+):
+    # Served from the user cache when warm: no query and, on a match, no body
+    user = await svc.get_user(user_id)
+    headers = {
+        "ETag": user_etag(user.create_at, user.update_at),
+        "Cache-Control": "private, no-cache",
+        "Last-Modified": http_date(user.update_at or user.create_at),
+    }
+    if etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+    return user
+
+
+@router.patch(
+    "/{user_id}",
+    response_model=UserRead,
+    # UPDATE and cache NOTIFY; a failed precondition reads the user once
+    dependencies=[Depends(query_budget(3))],
+    responses={
+        404: {"description": "User not found"},
+        412: {"description": "User modified since the If-Match ETag"},
+    },
+)
+async def update_user(
+    user_id: UUID,
+    payload: userUpdate,
+    response: Response,
+    if_match: str | None = Header(None, description="ETag from GET /users/{id}"),
+    svc: AsyncUserService = Depends(get_async_user_service),
+):
+    user = await svc.update_user(user_id, payload, if_match=if_match)
+    response.headers["ETag"] = user_etag(user.create_at, user.update_at)
+    return user
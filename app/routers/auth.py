@@ -0,0 +1,65 @@
+from datetime import datetime, timezone
+from fastapi import APIRouter, Depends, Response, status
+
+from app.core.metrics import InstrumentedRoute
+from app.core.tokens import TokenClaims
+from app.dependencies.auth_dependencies import get_auth_service, get_token_claims
+from app.dependencies.db_dependencies import query_budget
+from app.schemas.auth import LoginRequest, RefreshRequest, TokenInfo, TokenResponse
+from app.services.auth_service import AuthService
+
+
+router = APIRouter(prefix="/auth", tags=["Auth"], route_class=InstrumentedRoute)
+
+
+@router.post(
+    "/login",
+    response_model=TokenResponse,
+    dependencies=[Depends(query_budget(1))],
+    responses={
+        401: {"description": "Incorrect email or password"},
+        403: {"description": "Inactive user"},
+        503: {"description": "Password hashing is saturated"},
+    },
+)
+def login(payload: LoginRequest, service: AuthService = Depends(get_auth_service)):
+    return service.login(payload.email, payload.password)
+
+
+@router.post(
+    "/refresh",
+    response_model=TokenResponse,
+    dependencies=[Depends(query_budget(1))],
+    responses={401: {"description": "Invalid, expired or revoked refresh token"}},
+)
+def refresh(payload: RefreshRequest, service: AuthService = Depends(get_auth_service)):
+    return service.refresh(payload.refresh_token)
+
+
+@router.post(
+    "/logout",
+    status_code=status.HTTP_204_NO_CONTENT,
+    # UPDATE, then the cache and revocation NOTIFYs
+    dependencies=[Depends(query_budget(3))],
+    responses={401: {"description": "Invalid, expired or revoked token"}},
+)
+def logout(
+    claims: TokenClaims = Depends(get_token_claims),
+    service: AuthService = Depends(get_auth_service),
+):
+    service.logout(claims)
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+
+@router.get(
+    "/me",
+    response_model=TokenInfo,
+    responses={401: {"description": "Invalid, expired or revoked token"}},
+)
+async def me(claims: TokenClaims = Depends(get_token_claims)):
+    # Answered from the token alone: no database access
+    return TokenInfo(
+        user_id=claims.user_id,
+        generation=claims.generation,
+        expires_at=datetime.fromtimestamp(claims.expires_at, timezone.utc),
+    )
@@ -0,0 +1,81 @@
+from typing import Any, Dict, List
+from fastapi import APIRouter
+
+from app.core.admission import get_admission_controller
+from app.core.hashing import get_password_hasher
+from app.core.metrics import InstrumentedRoute
+from app.config.settings import get_settings
+from app.core.startup import startup_report
+from app.db.database import (
+    get_async_postgres_client,
+    get_async_registration_writer,
+    get_async_user_loader,
+    get_postgres_client,
+    get_registration_writer,
+    get_user_cache,
+    get_user_loader,
+)
+
+
+router = APIRouter(prefix="/internal", tags=["Internal"], route_class=InstrumentedRoute)
+
+
+@router.get("/hashing")
+def hashing_stats() -> Dict[str, Any]:
+    """Password hashing pool usage: queue wait vs hash time, rejections."""
+    return get_password_hasher().stats()
+
+
+@router.get("/cache")
+def cache_stats() -> Dict[str, Any]:
+    """User cache hit/miss/eviction counters."""
+    return get_user_cache().stats()
+
+
+@router.get("/loader")
+def loader_stats() -> Dict[str, Any]:
+    """User lookups by id: loads, coalesced keys, batches and their size."""
+    if get_settings().db_mode == "async":
+        return get_async_user_loader().stats()
+    return get_user_loader().stats()
+
+
+@router.get("/registrations")
+def registration_stats() -> Dict[str, Any]:
+    """Group commit of registrations: submitted, batches, transactions saved."""
+    if get_settings().db_mode == "async":
+        return get_async_registration_writer().stats()
+    return get_registration_writer().stats()
+
+
+@router.get("/admission")
+async def admission_stats() -> Dict[str, Any]:
+    """Admission control: capacity, and per route class limit and decisions."""
+    # On the event loop: the controller is not thread-safe, and the
+    # threadpool capacity can only be read from there
+    return get_admission_controller().stats()
+
+
+@router.get("/pool")
+def pool_stats() -> Dict[str, Any]:
+    """Connection pool of the engine serving requests: usage, waits, ages."""
+    if get_settings().db_mode == "async":
+        return get_async_postgres_client().pool_monitor.stats()
+    return get_postgres_client().pool_monitor.stats()
+
+
+@router.get("/replicas")
+def replica_stats() -> List[Dict[str, Any]]:
+    """Read replicas: measured lag, health, selections and pool usage."""
+    client = (
+        get_async_postgres_client()
+        if get_settings().db_mode == "async"
+        else get_postgres_client()
+    )
+    return client.replicas.stats() if client.replicas else []
+
+
+@router.get("/startup")
+def startup_timings() -> Dict[str, Any]:
+    """Cold-start timings: import, lifespan, first request (seconds)."""
+    return startup_report.as_dict()
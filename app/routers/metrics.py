@@ -0,0 +1,28 @@
+import os
+
+from fastapi import APIRouter, Response
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    generate_latest,
+)
+from prometheus_client.multiprocess import MultiProcessCollector
+
+
+router = APIRouter(tags=["Internal"])
+
+
+def metrics_registry() -> CollectorRegistry:
+    """This process's metrics, or those of every worker under app/server.py."""
+    if "PROMETHEUS_MULTIPROC_DIR" not in os.environ:
+        return REGISTRY
+    registry = CollectorRegistry()
+    MultiProcessCollector(registry)
+    return registry
+
+
+@router.get("/metrics", include_in_schema=False)
+def metrics() -> Response:
+    """Prometheus text exposition of every registered metric."""
+    return Response(generate_latest(metrics_registry()), media_type=CONTENT_TYPE_LATEST)
@@ -1,5 +1,14 @@
+from typing import Any, Literal
 from uuid import UUID
-from pydantic import BaseModel, EmailStr, Field, ConfigDict
+from pydantic import (
+    BaseModel,
+    EmailStr,
+    Field,
+    ConfigDict,
+    TypeAdapter,
+    field_validator,
+)
+from typing_extensions import TypedDict
 
 
 class UserCreate(BaseModel):
@@ -19,6 +28,54 @@ class UserRead(BaseModel):
     is_active: bool
 
 
-class userUpdate(BaseModel):
+class UserReadRow(TypedDict):
+    """
+    UserRead-shaped row from a column-only select.
+
+    Rows come straight from the database, so they are serialized with
+    user_read_rows_adapter without being validated again; keys that are not
+    declared here (e.g. create_at, kept for cursors) are left out.
+    """
+
+    id: UUID
+    email: str
     full_name: str | None
-    is_active: bool | None
+    is_active: bool
+
+
+user_read_rows_adapter = TypeAdapter(list[UserReadRow])
+
+
+class userUpdate(BaseModel):
+    """
+    PATCH body: only the fields that are sent are changed (read it with
+    model_dump(exclude_unset=True)).
+    """
+
+    model_config = ConfigDict(extra="forbid")
+
+    full_name: str | None = Field(None, min_length=4, description="Full name")
+    is_active: bool | None = None
+
+    @field_validator("is_active")
+    @classmethod
+    def is_active_not_null(cls, value: bool | None) -> bool:
+        # Runs on sent values only: omitting the field is fine, null is not
+        if value is None:
+            raise ValueError("is_active cannot be null")
+        return value
+
+
+class BulkUserResult(BaseModel):
+    index: int = Field(description="Position of the item in the request")
+    status: Literal["created", "duplicate", "invalid"]
+    email: str | None = None
+    id: UUID | None = None
+    errors: list[dict[str, Any]] | None = None
+
+
+class BulkUserResponse(BaseModel):
+    created: int
+    duplicates: int
+    invalid: int
+    results: list[BulkUserResult]
@@ -0,0 +1,153 @@
+"""
+Production server: gunicorn managing uvicorn workers.
+
+    python -m app.server
+
+The app is imported and warmed up once in the master (preload), then forked
+into WEB_CONCURRENCY workers, which share its memory copy-on-write and start
+in milliseconds. Nothing that owns a connection, thread or lock crosses the
+fork: post_fork drops whatever the master built (reset_after_fork), and each
+worker builds its own engines, pools, listeners and hashing pool in its
+lifespan or on first use.
+
+Workers are replaced after SERVER_MAX_REQUESTS requests (plus a random
+jitter, so they do not restart together). SIGHUP starts a new set of
+workers, then stops the old ones gracefully: a rolling restart that never
+leaves the port without workers. The new workers run the code the master
+preloaded; new code needs a new master (SIGUSR2, or restarting the process).
+
+prometheus_client picks its multi-process mode when it is imported, so
+PROMETHEUS_MULTIPROC_DIR is set up here, before the app is imported.
+"""
+
+import gc
+import glob
+import os
+import tempfile
+
+from gunicorn.app.base import BaseApplication
+
+from app.config.settings import get_settings
+
+WORKER_CLASS = "uvicorn_worker.UvicornWorker"
+
+
+def worker_count() -> int:
+    """WEB_CONCURRENCY, or one worker per CPU core."""
+    return get_settings().web_concurrency or os.cpu_count() or 1
+
+
+def prepare_metrics_dir() -> str:
+    """
+    Point prometheus_client at the directory shared by the workers.
+
+    Value files of a previous run are removed, or their counts would be
+    added to this run's.
+    """
+    path = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if path:
+        os.makedirs(path, exist_ok=True)
+        for stale in glob.glob(os.path.join(path, "*.db")):
+            os.remove(stale)
+    else:
+        path = tempfile.mkdtemp(prefix="prometheus-")
+        os.environ["PROMETHEUS_MULTIPROC_DIR"] = path
+    return path
+
+
+def prepare_environment(workers: int) -> None:
+    """Environment the workers need, set before the app is imported."""
+    if workers > 1:
+        prepare_metrics_dir()
+    if not get_settings().hash_workers:
+        # One hashing process per core in total, not per core in every worker
+        os.environ["HASH_WORKERS"] = str(max(1, (os.cpu_count() or 1) // workers))
+        get_settings.cache_clear()
+
+
+def warm_up(app) -> None:
+    """Work every worker would repeat after fork, done once in the master."""
+    from sqlalchemy.orm import configure_mappers
+
+    configure_mappers()
+    app.openapi()
+    # Objects loaded so far are never collected again: collections in the
+    # workers would otherwise write to their headers and copy shared pages
+    gc.collect()
+    gc.freeze()
+
+
+def when_ready(server) -> None:
+    """In the master: drop the gauges it set while importing the app."""
+    mark_process_dead(os.getpid())
+
+
+def post_fork(server, worker) -> None:
+    """In the new worker: forget clients and pools inherited from the master."""
+    from app.core.admission import get_admission_controller
+    from app.core.hashing import get_password_hasher
+    from app.db.database import reset_after_fork
+
+    reset_after_fork()
+    get_password_hasher.cache_clear()
+    if get_settings().admission_control_enabled:
+        # Gauge values are kept per process: the master's are not this worker's
+        get_admission_controller().publish()
+
+
+def child_exit(server, worker) -> None:
+    """In the master: drop the live gauges of a worker that exited."""
+    mark_process_dead(worker.pid)
+
+
+def mark_process_dead(pid: int) -> None:
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(pid)
+
+
+def build_options(workers: int) -> dict:
+    """gunicorn settings, from the WEB_CONCURRENCY/PORT/SERVER_* settings."""
+    settings = get_settings()
+    return {
+        "bind": f"0.0.0.0:{settings.port}",
+        "workers": workers,
+        "worker_class": WORKER_CLASS,
+        "preload_app": True,
+        "max_requests": settings.server_max_requests,
+        "max_requests_jitter": settings.server_max_requests_jitter,
+        "graceful_timeout": settings.server_graceful_timeout,
+        "keepalive": settings.server_keepalive,
+        "when_ready": when_ready,
+        "post_fork": post_fork,
+        "child_exit": child_exit,
+    }
+
+
+class Server(BaseApplication):
+    """gunicorn configured from a dict, serving the preloaded app."""
+
+    def __init__(self, options: dict):
+        self.options = options
+        super().__init__()
+
+    def load_config(self) -> None:
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        from app.main import app
+
+        warm_up(app)
+        return app
+
+
+def main() -> None:
+    workers = worker_count()
+    prepare_environment(workers)
+    Server(build_options(workers)).run()
+
+
+if __name__ == "__main__":
+    main()
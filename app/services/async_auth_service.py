@@ -0,0 +1,88 @@
+from fastapi import HTTPException, status
+
+from app.core.hashing import HashingSaturatedError, PasswordHasher
+from app.core.tokens import InvalidTokenError, RevocationList, TokenClaims, TokenSigner
+from app.models.user import User
+from app.respositories.async_user_repository import AsyncUserRepository
+from app.schemas.auth import TokenResponse
+from app.services.auth_service import credentials_error
+from app.services.user_service import hashing_saturated
+
+# See app.services.auth_service: one dummy hash per cost factor
+_dummy_hashes: dict[int, str] = {}
+
+
+class AsyncAuthService:
+    """
+    Async service for login and the token lifecycle.
+    Same rules as AuthService, awaiting an AsyncUserRepository.
+    """
+
+    def __init__(
+        self,
+        repo: AsyncUserRepository,
+        hasher: PasswordHasher,
+        signer: TokenSigner,
+        revocations: RevocationList,
+    ):
+        self.repo = repo
+        self.hasher = hasher
+        self.signer = signer
+        self.revocations = revocations
+
+    async def login(self, email: str, password: str) -> TokenResponse:
+        user = await self.repo.get_by_email(email)
+        hashed = user.hashed_password if user is not None else await self._dummy_hash()
+        try:
+            valid = await self.hasher.verify_async(password, hashed)
+        except HashingSaturatedError:
+            raise hashing_saturated()
+        if user is None or not valid:
+            raise credentials_error("Incorrect email or password")
+        if not user.is_active:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN, detail="Inactive user"
+            )
+        return self.issue_tokens(user)
+
+    async def refresh(self, refresh_token: str) -> TokenResponse:
+        claims = self.verify_token(refresh_token, "refresh")
+        user = await self.repo.get_by_id(claims.user_id)
+        if (
+            user is None
+            or not user.is_active
+            or user.token_generation != claims.generation
+        ):
+            raise credentials_error("Refresh token is no longer valid")
+        return self.issue_tokens(user)
+
+    async def logout(self, claims: TokenClaims) -> None:
+        """Revoke every token of the user, on all of their devices."""
+        user = await self.repo.revoke_tokens(claims.user_id)
+        if user is None:
+            raise credentials_error()
+        self.revocations.revoke(user.id, user.token_generation)
+
+    def verify_token(self, token: str, token_type: str = "access") -> TokenClaims:
+        try:
+            claims = self.signer.verify(token, token_type)
+        except InvalidTokenError as exc:
+            raise credentials_error(str(exc))
+        if self.revocations.is_revoked(claims):
+            raise credentials_error("Token revoked")
+        return claims
+
+    def issue_tokens(self, user: User) -> TokenResponse:
+        return TokenResponse(
+            access_token=self.signer.issue(user.id, user.token_generation, "access"),
+            refresh_token=self.signer.issue(user.id, user.token_generation, "refresh"),
+            expires_in=self.signer.ttl_seconds["access"],
+        )
+
+    async def _dummy_hash(self) -> str:
+        rounds = self.hasher.rounds
+        if rounds not in _dummy_hashes:
+            _dummy_hashes[rounds] = await self.hasher.hash_async(
+                "dummy-password-for-timing"
+            )
+        return _dummy_hashes[rounds]
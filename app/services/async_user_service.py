@@ -0,0 +1,194 @@
+from datetime import datetime
+from typing import Any, AsyncIterator, Awaitable, Callable, Literal, Sequence
+from uuid import UUID
+from fastapi import HTTPException, status
+from sqlalchemy import Row
+from starlette.concurrency import run_in_threadpool
+from app.models.user import User
+from app.respositories.async_user_repository import AsyncUserRepository
+from app.schemas.user import BulkUserResponse, UserCreate, userUpdate
+from app.services.user_service import (
+    hashing_saturated,
+    parse_cursor,
+    parse_ids,
+    precondition_failed,
+    apply_insert_results,
+    build_user_rows,
+    duplicate_result,
+    summarize_bulk_results,
+    validate_bulk_items,
+)
+from app.core.hashing import HashingSaturatedError, PasswordHasher
+from app.core.export import encode_csv, encode_ndjson
+from app.core.conditional import PageVersion, if_match_versions, user_version
+from app.core.pagination import decode_search_cursor
+
+
+class AsyncUserService:
+    """
+    Async service layer for user business logic.
+    Same rules as UserService, awaiting an AsyncUserRepository.
+    """
+
+    def __init__(
+        self,
+        repo: AsyncUserRepository,
+        hasher: PasswordHasher,
+        bulk_batch_size: int = 500,
+        export_batch_size: int = 2000,
+        submit_registration: Callable[[dict], Awaitable[User | None]] | None = None,
+    ):
+        self.repo = repo
+        self.hasher = hasher
+        self.bulk_batch_size = bulk_batch_size
+        self.export_batch_size = export_batch_size
+        self.submit_registration = submit_registration
+
+    async def register_user(self, user_create: UserCreate) -> User:
+        try:
+            hashed = await self.hasher.hash_async(user_create.password)
+        except HashingSaturatedError:
+            raise hashing_saturated()
+        if self.submit_registration is not None:
+            user = await self.submit_registration(
+                build_user_rows([(0, user_create)], [hashed])[0]
+            )
+        else:
+            user = await self.repo.register(
+                user_create=user_create, hashed_password=hashed
+            )
+        if user is None:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT, detail="Email already registered"
+            )
+        return user
+
+    async def register_users_bulk(self, items: list[Any]) -> BulkUserResponse:
+        """Register many users at once, see UserService.register_users_bulk."""
+        results, candidates = validate_bulk_items(items)
+
+        for start in range(0, len(candidates), self.bulk_batch_size):
+            end = start + self.bulk_batch_size
+            batch = candidates[start:end]
+            existing = await self.repo.existing_emails(
+                [user.email for _, user in batch]
+            )
+            fresh = []
+            for index, user in batch:
+                if user.email in existing:
+                    results[index] = duplicate_result(index, user)
+                else:
+                    fresh.append((index, user))
+
+            try:
+                hashes = await run_in_threadpool(
+                    self.hasher.hash_many, [user.password for _, user in fresh]
+                )
+            except HashingSaturatedError:
+                raise hashing_saturated()
+
+            inserted = await self.repo.insert_many(build_user_rows(fresh, hashes))
+            apply_insert_results(results, fresh, inserted)
+
+        return summarize_bulk_results(results)
+
+    async def export_users(
+        self,
+        fmt: Literal["ndjson", "csv"],
+        is_active: bool | None = None,
+        created_from: datetime | None = None,
+        created_to: datetime | None = None,
+    ) -> AsyncIterator[bytes]:
+        """Encode all matching users chunk by chunk, see UserService.export_users."""
+        encode = encode_csv if fmt == "csv" else encode_ndjson
+        if fmt == "csv":
+            yield encode_csv([], header=True)
+        async for rows in self.repo.stream_export(
+            is_active=is_active,
+            created_from=created_from,
+            created_to=created_to,
+            batch_size=self.export_batch_size,
+        ):
+            yield encode(rows)
+
+    async def get_user(self, user_id: UUID) -> User:
+        user = await self.repo.get_by_id(user_id)
+        if user is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
+            )
+        return user
+
+    async def get_users(self, ids: str) -> list[User]:
+        """Users with the given ids, see UserService.get_users."""
+        user_ids = parse_ids(ids)
+        found = {user.id: user for user in await self.repo.get_many(user_ids)}
+        return [found[user_id] for user_id in user_ids if user_id in found]
+
+    async def update_user(
+        self, user_id: UUID, changes: userUpdate, if_match: str | None = None
+    ) -> User:
+        """
+        Apply the fields sent in a PATCH with a single UPDATE ... RETURNING.
+
+        With If-Match, the UPDATE only matches the listed versions; the user
+        is only read afterwards, to tell a missing user (404) from a stale
+        version (412).
+        """
+        expected = if_match_versions(if_match) if if_match is not None else None
+        if expected == []:
+            raise precondition_failed()
+        values = changes.model_dump(exclude_unset=True)
+        if not values:
+            user = await self.get_user(user_id)
+            if (
+                expected is not None
+                and user_version(user.create_at, user.update_at) not in expected
+            ):
+                raise precondition_failed()
+            return user
+
+        user = await self.repo.patch(user_id, values, expected)
+        if user is None:
+            if expected is None or await self.repo.get_by_id(user_id) is None:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
+                )
+            raise precondition_failed()
+        return user
+
+    async def list_users(
+        self, limit: int = 100, offset: int = 0, cursor: str | None = None
+    ) -> tuple[Sequence[Row], PageVersion]:
+        """
+        Page of UserRead rows (plus create_at), without ORM objects, and the
+        version of the page for its ETag.
+        """
+        after = parse_cursor(cursor)
+        return await self.repo.list_page(limit=limit, offset=offset, after=after)
+
+    async def page_version(
+        self, limit: int = 100, offset: int = 0, cursor: str | None = None
+    ) -> PageVersion:
+        """Version of the page list_users() would return, without its rows."""
+        after = parse_cursor(cursor)
+        return await self.repo.page_version(limit=limit, offset=offset, after=after)
+
+    async def search_users(
+        self, query: str, limit: int = 20, cursor: str | None = None
+    ) -> Sequence[Row]:
+        """Ranked page of users matching query, see UserRepository.search."""
+        after = None
+        if cursor:
+            try:
+                after = decode_search_cursor(cursor)
+            except ValueError:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+                )
+        return await self.repo.search(query, limit=limit, after=after)
+
+    async def count_users(self, exact: bool = False) -> int | None:
+        if exact:
+            return await self.repo.count_exact()
+        return await self.repo.count_estimate()
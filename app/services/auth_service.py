@@ -0,0 +1,99 @@
+from fastapi import HTTPException, status
+
+from app.core.hashing import HashingSaturatedError, PasswordHasher
+from app.core.tokens import InvalidTokenError, RevocationList, TokenClaims, TokenSigner
+from app.models.user import User
+from app.respositories.user_repository import UserRepository
+from app.schemas.auth import TokenResponse
+from app.services.user_service import hashing_saturated
+
+# bcrypt hashes verified for unknown emails, one per cost factor, so a login
+# takes as long whether or not the account exists
+_dummy_hashes: dict[int, str] = {}
+
+
+def credentials_error(detail: str = "Could not validate credentials") -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail=detail,
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
+class AuthService:
+    """
+    Password login and token lifecycle.
+
+    The password is verified once, at login; afterwards requests present
+    signed tokens. Refreshing re-reads the user (through the user cache) to
+    pick up deactivation and revocation; logging out bumps the user's token
+    generation, which revokes every token issued to them on every worker.
+    """
+
+    def __init__(
+        self,
+        repo: UserRepository,
+        hasher: PasswordHasher,
+        signer: TokenSigner,
+        revocations: RevocationList,
+    ):
+        self.repo = repo
+        self.hasher = hasher
+        self.signer = signer
+        self.revocations = revocations
+
+    def login(self, email: str, password: str) -> TokenResponse:
+        user = self.repo.get_by_email(email)
+        hashed = user.hashed_password if user is not None else self._dummy_hash()
+        try:
+            valid = self.hasher.verify(password, hashed)
+        except HashingSaturatedError:
+            raise hashing_saturated()
+        if user is None or not valid:
+            raise credentials_error("Incorrect email or password")
+        if not user.is_active:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN, detail="Inactive user"
+            )
+        return self.issue_tokens(user)
+
+    def refresh(self, refresh_token: str) -> TokenResponse:
+        claims = self.verify_token(refresh_token, "refresh")
+        user = self.repo.get_by_id(claims.user_id)
+        if (
+            user is None
+            or not user.is_active
+            or user.token_generation != claims.generation
+        ):
+            raise credentials_error("Refresh token is no longer valid")
+        return self.issue_tokens(user)
+
+    def logout(self, claims: TokenClaims) -> None:
+        """Revoke every token of the user, on all of their devices."""
+        user = self.repo.revoke_tokens(claims.user_id)
+        if user is None:
+            raise credentials_error()
+        # Other workers hear about it through NOTIFY; this one applies it now
+        self.revocations.revoke(user.id, user.token_generation)
+
+    def verify_token(self, token: str, token_type: str = "access") -> TokenClaims:
+        try:
+            claims = self.signer.verify(token, token_type)
+        except InvalidTokenError as exc:
+            raise credentials_error(str(exc))
+        if self.revocations.is_revoked(claims):
+            raise credentials_error("Token revoked")
+        return claims
+
+    def issue_tokens(self, user: User) -> TokenResponse:
+        return TokenResponse(
+            access_token=self.signer.issue(user.id, user.token_generation, "access"),
+            refresh_token=self.signer.issue(user.id, user.token_generation, "refresh"),
+            expires_in=self.signer.ttl_seconds["access"],
+        )
+
+    def _dummy_hash(self) -> str:
+        rounds = self.hasher.rounds
+        if rounds not in _dummy_hashes:
+            _dummy_hashes[rounds] = self.hasher.hash("dummy-password-for-timing")
+        return _dummy_hashes[rounds]
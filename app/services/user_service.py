@@ -1,9 +1,19 @@
-from typing import Sequence
+from datetime import datetime
+from typing import Any, Callable, Iterator, Literal, Sequence
+from uuid import UUID, uuid4
 from fastapi import HTTPException, status
+from sqlalchemy import Row
+from pydantic import ValidationError
 from app.models.user import User
 from app.respositories.user_repository import UserRepository
-from app.schemas.user import UserCreate
-from app.core.security import get_hash_password
+from app.schemas.user import BulkUserResponse, BulkUserResult, UserCreate, userUpdate
+from app.core.hashing import HashingSaturatedError, PasswordHasher
+from app.core.export import encode_csv, encode_ndjson
+from app.core.conditional import PageVersion, if_match_versions, user_version
+from app.core.pagination import decode_cursor, decode_search_cursor
+
+# Ids per GET /users?ids= request
+MAX_BATCH_IDS = 100
 
 
 class UserService:
@@ -13,19 +23,305 @@ class UserService:
     Does not know about Client layer - receives Repository directly.
     """
 
-    def __init__(self, repo: UserRepository):
+    def __init__(
+        self,
+        repo: UserRepository,
+        hasher: PasswordHasher,
+        bulk_batch_size: int = 500,
+        export_batch_size: int = 2000,
+        submit_registration: Callable[[dict], User | None] | None = None,
+    ):
+        """
+        Args:
+            submit_registration: Group commit stage (BatchWriter.submit bound
+                to the client) taking a user row; registrations then bypass
+                repo.register and are inserted in batches
+        """
         self.repo = repo
+        self.hasher = hasher
+        self.bulk_batch_size = bulk_batch_size
+        self.export_batch_size = export_batch_size
+        self.submit_registration = submit_registration
 
     def register_user(self, user_create: UserCreate) -> User:
-        existing = self.repo.get_by_email(user_create.email)
-        if existing:
+        try:
+            hashed = self.hasher.hash(user_create.password)
+        except HashingSaturatedError:
+            raise hashing_saturated()
+        if self.submit_registration is not None:
+            user = self.submit_registration(
+                build_user_rows([(0, user_create)], [hashed])[0]
+            )
+        else:
+            user = self.repo.register(user_create=user_create, hashed_password=hashed)
+        if user is None:
             raise HTTPException(
                 status_code=status.HTTP_409_CONFLICT, detail="Email already registered"
             )
+        return user
+
+    def register_users_bulk(self, items: list[Any]) -> BulkUserResponse:
+        """
+        Register many users at once.
+
+        Items are validated in one pass, then processed in batches of
+        bulk_batch_size: one SELECT to skip known emails, one parallel hash
+        round on the process pool and one multi-row INSERT per batch.
+        """
+        results, candidates = validate_bulk_items(items)
+
+        for start in range(0, len(candidates), self.bulk_batch_size):
+            end = start + self.bulk_batch_size
+            batch = candidates[start:end]
+            existing = self.repo.existing_emails([user.email for _, user in batch])
+            fresh = []
+            for index, user in batch:
+                if user.email in existing:
+                    results[index] = duplicate_result(index, user)
+                else:
+                    fresh.append((index, user))
 
-        hashed = get_hash_password(user_create.password)
-        user = self.repo.create(user_create=user_create, hashed_password=hashed)
+            try:
+                hashes = self.hasher.hash_many([user.password for _, user in fresh])
+            except HashingSaturatedError:
+                raise hashing_saturated()
+
+            inserted = self.repo.insert_many(build_user_rows(fresh, hashes))
+            apply_insert_results(results, fresh, inserted)
+
+        return summarize_bulk_results(results)
+
+    def export_users(
+        self,
+        fmt: Literal["ndjson", "csv"],
+        is_active: bool | None = None,
+        created_from: datetime | None = None,
+        created_to: datetime | None = None,
+    ) -> Iterator[bytes]:
+        """
+        Encode all matching users chunk by chunk, one chunk per cursor batch.
+        """
+        batches = self.repo.stream_export(
+            is_active=is_active,
+            created_from=created_from,
+            created_to=created_to,
+            batch_size=self.export_batch_size,
+        )
+        if fmt == "csv":
+            yield encode_csv([], header=True)
+            for rows in batches:
+                yield encode_csv(rows)
+        else:
+            for rows in batches:
+                yield encode_ndjson(rows)
+
+    def get_user(self, user_id: UUID) -> User:
+        user = self.repo.get_by_id(user_id)
+        if user is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
+            )
         return user
 
-    def list_users(self, limit: int = 100, offset: int = 0) -> Sequence[User]:
-        return self.repo.list(limit=limit, offset=offset)
+    def get_users(self, ids: str) -> list[User]:
+        """
+        Users with the given comma-separated ids, fetched in one query (or
+        from the cache), in the requested order; unknown ids are left out.
+        """
+        user_ids = parse_ids(ids)
+        found = {user.id: user for user in self.repo.get_many(user_ids)}
+        return [found[user_id] for user_id in user_ids if user_id in found]
+
+    def update_user(
+        self, user_id: UUID, changes: userUpdate, if_match: str | None = None
+    ) -> User:
+        """
+        Apply the fields sent in a PATCH with a single UPDATE ... RETURNING.
+
+        With If-Match, the UPDATE only matches the listed versions; the user
+        is only read afterwards, to tell a missing user (404) from a stale
+        version (412).
+        """
+        expected = if_match_versions(if_match) if if_match is not None else None
+        if expected == []:
+            raise precondition_failed()
+        values = changes.model_dump(exclude_unset=True)
+        if not values:
+            user = self.get_user(user_id)
+            if (
+                expected is not None
+                and user_version(user.create_at, user.update_at) not in expected
+            ):
+                raise precondition_failed()
+            return user
+
+        user = self.repo.patch(user_id, values, expected)
+        if user is None:
+            if expected is None or self.repo.get_by_id(user_id) is None:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
+                )
+            raise precondition_failed()
+        return user
+
+    def list_users(
+        self, limit: int = 100, offset: int = 0, cursor: str | None = None
+    ) -> tuple[Sequence[Row], PageVersion]:
+        """
+        Page of UserRead rows (plus create_at), without ORM objects, and the
+        version of the page for its ETag.
+        """
+        after = parse_cursor(cursor)
+        return self.repo.list_page(limit=limit, offset=offset, after=after)
+
+    def page_version(
+        self, limit: int = 100, offset: int = 0, cursor: str | None = None
+    ) -> PageVersion:
+        """Version of the page list_users() would return, without its rows."""
+        after = parse_cursor(cursor)
+        return self.repo.page_version(limit=limit, offset=offset, after=after)
+
+    def search_users(
+        self, query: str, limit: int = 20, cursor: str | None = None
+    ) -> Sequence[Row]:
+        """Ranked page of users matching query, see UserRepository.search."""
+        after = None
+        if cursor:
+            try:
+                after = decode_search_cursor(cursor)
+            except ValueError:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+                )
+        return self.repo.search(query, limit=limit, after=after)
+
+    def count_users(self, exact: bool = False) -> int | None:
+        return self.repo.count_exact() if exact else self.repo.count_estimate()
+
+
+def hashing_saturated() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Password hashing is saturated, retry shortly",
+        headers={"Retry-After": "1"},
+    )
+
+
+def precondition_failed() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_412_PRECONDITION_FAILED,
+        detail="User was modified since the If-Match version",
+    )
+
+
+def parse_ids(ids: str) -> list[UUID]:
+    """Decode a comma-separated id list, without duplicates; bad input is a 400."""
+    try:
+        user_ids = list(dict.fromkeys(UUID(value.strip()) for value in ids.split(",")))
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid id"
+        )
+    if len(user_ids) > MAX_BATCH_IDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {MAX_BATCH_IDS} ids per request",
+        )
+    return user_ids
+
+
+def parse_cursor(cursor: str | None) -> tuple[datetime, UUID] | None:
+    """Decode an optional list cursor; a malformed one is a 400."""
+    if not cursor:
+        return None
+    try:
+        return decode_cursor(cursor)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+        )
+
+
+def validate_bulk_items(
+    items: list[Any],
+) -> tuple[list[BulkUserResult | None], list[tuple[int, UserCreate]]]:
+    """
+    Validate raw bulk payload items in a single pass.
+
+    Returns:
+        tuple: Per-item results with invalid and in-payload duplicate items
+            already resolved (None for the rest), and the (index, UserCreate)
+            candidates left to insert, one per email
+    """
+    results: list[BulkUserResult | None] = [None] * len(items)
+    candidates: list[tuple[int, UserCreate]] = []
+    seen: set[str] = set()
+
+    for index, item in enumerate(items):
+        try:
+            user = UserCreate.model_validate(item)
+        except ValidationError as exc:
+            results[index] = BulkUserResult(
+                index=index,
+                status="invalid",
+                email=item.get("email") if isinstance(item, dict) else None,
+                errors=exc.errors(
+                    include_url=False, include_context=False, include_input=False
+                ),
+            )
+            continue
+
+        if user.email in seen:
+            results[index] = duplicate_result(index, user)
+            continue
+        seen.add(user.email)
+        candidates.append((index, user))
+
+    return results, candidates
+
+
+def duplicate_result(index: int, user: UserCreate) -> BulkUserResult:
+    return BulkUserResult(index=index, status="duplicate", email=user.email)
+
+
+def build_user_rows(
+    users: list[tuple[int, UserCreate]], hashes: list[str]
+) -> list[dict]:
+    return [
+        {
+            "id": uuid4(),
+            "email": user.email,
+            "full_name": user.full_name,
+            "is_active": True,
+            "hashed_password": hashed,
+        }
+        for (_, user), hashed in zip(users, hashes)
+    ]
+
+
+def apply_insert_results(
+    results: list[BulkUserResult | None],
+    users: list[tuple[int, UserCreate]],
+    inserted: list[tuple[Any, str]],
+) -> None:
+    """Mark each attempted user created, or duplicate if the INSERT skipped it."""
+    ids_by_email = {email: user_id for user_id, email in inserted}
+    for index, user in users:
+        user_id = ids_by_email.get(user.email)
+        if user_id is None:
+            # Registered concurrently between the email check and the INSERT
+            results[index] = duplicate_result(index, user)
+        else:
+            results[index] = BulkUserResult(
+                index=index, status="created", email=user.email, id=user_id
+            )
+
+
+def summarize_bulk_results(results: list[BulkUserResult | None]) -> BulkUserResponse:
+    resolved = [result for result in results if result is not None]
+    return BulkUserResponse(
+        created=sum(result.status == "created" for result in resolved),
+        duplicates=sum(result.status == "duplicate" for result in resolved),
+        invalid=sum(result.status == "invalid" for result in resolved),
+        results=resolved,
+    )
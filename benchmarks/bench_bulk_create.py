@@ -0,0 +1,76 @@
+"""
+Bulk registration vs looping the single-create endpoint.
+
+Drives the app in-process (httpx ASGITransport) against the database from the
+environment. Set BCRYPT_ROUNDS low (e.g. 4) to measure the database work
+rather than bcrypt.
+
+Usage:
+    BCRYPT_ROUNDS=4 python -m benchmarks.bench_bulk_create --users 2000
+"""
+
+import argparse
+import asyncio
+import time
+import uuid
+
+import httpx
+
+from app.main import app
+
+
+def payloads(count: int, tag: str) -> list[dict]:
+    return [
+        {"email": f"bench-{tag}-{i}@example.com", "password": "password123"}
+        for i in range(count)
+    ]
+
+
+async def loop_single(client: httpx.AsyncClient, users: list[dict], concurrency: int):
+    queue = iter(users)
+
+    async def worker() -> None:
+        for payload in queue:
+            response = await client.post("/users/", json=payload)
+            response.raise_for_status()
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+
+async def bulk(client: httpx.AsyncClient, users: list[dict], chunk: int):
+    for start in range(0, len(users), chunk):
+        end = start + chunk
+        response = await client.post("/users/bulk", json=users[start:end])
+        response.raise_for_status()
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--chunk", type=int, default=5000, help="items per bulk call")
+    args = parser.parse_args()
+
+    tag = uuid.uuid4().hex[:8]
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=None
+    ) as client:
+        started = time.perf_counter()
+        await loop_single(client, payloads(args.users, f"{tag}-s"), args.concurrency)
+        single = time.perf_counter() - started
+
+        started = time.perf_counter()
+        await bulk(client, payloads(args.users, f"{tag}-b"), args.chunk)
+        batched = time.perf_counter() - started
+
+    print(
+        f"POST /users/     x{args.users}: {single:7.2f}s  {args.users / single:9.1f} users/s"
+    )
+    print(
+        f"POST /users/bulk x{args.users}: {batched:7.2f}s  {args.users / batched:9.1f} users/s"
+    )
+    print(f"speedup: {single / batched:.1f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
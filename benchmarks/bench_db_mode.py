@@ -0,0 +1,113 @@
+"""
+Compare requests/sec of the sync (threadpool) and async (event loop) DB paths.
+
+Starts one uvicorn server per DB_MODE against the database configured in the
+environment and drives GET /users/ at a high concurrency level.
+
+Usage:
+    python -m benchmarks.bench_db_mode --concurrency 200 --requests 5000
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+
+def start_server(
+    mode: str, port: int, extra_env: dict[str, str] | None = None
+) -> subprocess.Popen:
+    env = {**os.environ, "DB_MODE": mode, **(extra_env or {})}
+    process = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "app.main:app",
+            "--port",
+            str(port),
+            "--log-level",
+            "warning",
+        ],
+        env=env,
+    )
+    deadline = time.monotonic() + 15
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/", timeout=0.5)
+            return process
+        except httpx.HTTPError:
+            time.sleep(0.1)
+    process.terminate()
+    raise RuntimeError(f"uvicorn ({mode}) did not start on port {port}")
+
+
+async def drive(base_url: str, path: str, concurrency: int, total: int) -> dict:
+    latencies: list[float] = []
+    errors = 0
+    remaining = iter(range(total))
+    limits = httpx.Limits(max_connections=concurrency)
+
+    async with httpx.AsyncClient(
+        base_url=base_url, limits=limits, timeout=30
+    ) as client:
+
+        async def worker() -> None:
+            nonlocal errors
+            for _ in remaining:
+                started = time.perf_counter()
+                response = await client.get(path)
+                latencies.append(time.perf_counter() - started)
+                if response.status_code != 200:
+                    errors += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "rps": total / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+        "errors": errors,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--path", default="/users/?limit=10")
+    parser.add_argument("--port", type=int, default=8100)
+    args = parser.parse_args()
+
+    for offset, mode in enumerate(("sync", "async")):
+        port = args.port + offset
+        server = start_server(mode, port)
+        try:
+            result = asyncio.run(
+                drive(
+                    f"http://127.0.0.1:{port}",
+                    args.path,
+                    args.concurrency,
+                    args.requests,
+                )
+            )
+        finally:
+            server.terminate()
+            server.wait()
+        print(
+            f"{mode:>5}: {result['rps']:8.1f} req/s  "
+            f"p50={result['p50_ms']:.1f}ms  p99={result['p99_ms']:.1f}ms  "
+            f"errors={result['errors']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
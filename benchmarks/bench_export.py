@@ -0,0 +1,65 @@
+"""
+Throughput and server memory of the streaming user export.
+
+Starts uvicorn against the database from the environment, downloads
+GET /users/export and reports rows/sec plus the server's peak RSS, which
+should stay flat whether the table has 10k or 10M rows.
+
+Usage:
+    python -m benchmarks.bench_export --format ndjson
+"""
+
+import argparse
+import time
+
+import httpx
+
+from benchmarks.bench_db_mode import start_server
+
+
+def peak_rss_mb(pid: int) -> float:
+    with open(f"/proc/{pid}/status") as status:
+        for line in status:
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) / 1024
+    return float("nan")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--format", choices=["ndjson", "csv"], default="ndjson")
+    parser.add_argument("--port", type=int, default=8110)
+    args = parser.parse_args()
+
+    server = start_server("sync", args.port)
+    try:
+        rss_before = peak_rss_mb(server.pid)
+        rows = 0
+        size = 0
+        started = time.perf_counter()
+        with httpx.stream(
+            "GET",
+            f"http://127.0.0.1:{args.port}/users/export",
+            params={"format": args.format},
+            timeout=None,
+        ) as response:
+            response.raise_for_status()
+            for chunk in response.iter_bytes():
+                rows += chunk.count(b"\n")
+                size += len(chunk)
+        elapsed = time.perf_counter() - started
+        if args.format == "csv":
+            rows -= 1
+        rss_after = peak_rss_mb(server.pid)
+    finally:
+        server.terminate()
+        server.wait()
+
+    print(f"rows:      {rows}")
+    print(f"bytes:     {size / 1024 / 1024:.1f} MiB")
+    print(f"rows/sec:  {rows / elapsed:,.0f}")
+    print(f"peak RSS:  {rss_before:.1f} MiB before, {rss_after:.1f} MiB after")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Concurrent registrations, one transaction each vs group commit.
+
+Threads stand in for POST /users/ requests (with a fixed password hash, so
+bcrypt does not hide the database cost). Each mode registers for the given
+time; reports registrations/s, commits/s, registrations per commit and
+latency percentiles. The rows are deleted afterwards.
+
+Usage:
+    ENV=development python -m benchmarks.bench_group_commit --threads 32 --seconds 5
+"""
+
+import argparse
+import itertools
+import statistics
+import threading
+import time
+from typing import Callable
+
+from sqlalchemy import delete, event
+
+from app.core.batching import BatchWriter
+from app.db.database import get_postgres_client
+from app.models.user import User
+from app.respositories.cached_user_repository import commit_registrations
+from app.respositories.user_repository import UserRepository
+from app.schemas.user import UserCreate
+from app.services.user_service import build_user_rows
+
+EMAIL_PREFIX = "bench-group-commit-"
+
+
+def run(register: Callable[[UserCreate], object], threads: int, seconds: float):
+    latencies: list[float] = []
+    lock = threading.Lock()
+    counter = itertools.count()
+    deadline = time.perf_counter() + seconds
+
+    def worker() -> None:
+        own = []
+        while time.perf_counter() < deadline:
+            user = UserCreate(
+                email=f"{EMAIL_PREFIX}{next(counter)}@mail.com",
+                password="bench-password",
+            )
+            started = time.perf_counter()
+            register(user)
+            own.append(time.perf_counter() - started)
+        with lock:
+            latencies.extend(own)
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return sorted(latencies)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--window-ms", type=float, default=5.0)
+    parser.add_argument("--max-batch", type=int, default=100)
+    args = parser.parse_args()
+
+    client = get_postgres_client()
+    commits = [0]
+
+    @event.listens_for(client.engine, "commit")
+    def count(*_):
+        commits[0] += 1
+
+    repo = UserRepository(client)
+    writer = BatchWriter(
+        commit_registrations,
+        window_seconds=args.window_ms / 1000,
+        max_batch=args.max_batch,
+    )
+    modes = {
+        "direct": lambda user: repo.register(user, "bench-hash"),
+        "group": lambda user: writer.submit(
+            build_user_rows([(0, user)], ["bench-hash"])[0], client
+        ),
+    }
+
+    print(
+        f"{'mode':<8} {'regs/s':>8} {'commits/s':>10} {'regs/commit':>12} "
+        f"{'p50 ms':>8} {'p99 ms':>8}"
+    )
+    try:
+        for name, register in modes.items():
+            commits[0] = 0
+            latencies = run(register, args.threads, args.seconds)
+            p99 = latencies[int(len(latencies) * 0.99)]
+            print(
+                f"{name:<8} {len(latencies) / args.seconds:>8.0f} "
+                f"{commits[0] / args.seconds:>10.0f} "
+                f"{len(latencies) / max(commits[0], 1):>12.1f} "
+                f"{statistics.median(latencies) * 1000:>8.2f} {p99 * 1000:>8.2f}"
+            )
+    finally:
+        with client.get_session_context() as session:
+            session.exec(delete(User).where(User.email.startswith(EMAIL_PREFIX)))
+            session.commit()
+        client.close()
+
+
+if __name__ == "__main__":
+    main()
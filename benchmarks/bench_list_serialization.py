@@ -0,0 +1,86 @@
+"""
+Per-row cost of GET /users/ pages: ORM + response_model vs the row fast path.
+
+The current path loads User entities and lets FastAPI validate them against
+Sequence[UserRead] before encoding (emulated here with the same TypeAdapter
+steps and json.dumps). The fast path selects the UserRead columns as plain
+rows and dumps them to JSON bytes with the prebuilt user_read_rows_adapter.
+Fetch and serialization are timed separately. Needs a users table with at
+least --limit rows (see app/db/seed.py).
+
+Usage:
+    python -m benchmarks.bench_list_serialization --limit 100 --repeat 200
+"""
+
+import argparse
+import json
+import statistics
+import time
+from typing import Sequence
+
+from pydantic import TypeAdapter
+
+from app.db.database import get_postgres_client
+from app.respositories.user_repository import UserRepository
+from app.schemas.user import UserRead, user_read_rows_adapter
+
+response_model_adapter = TypeAdapter(Sequence[UserRead])
+
+
+def time_call(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings) * 1_000_000
+
+
+def serialize_orm(users) -> bytes:
+    validated = response_model_adapter.validate_python(users, from_attributes=True)
+    content = response_model_adapter.dump_python(validated, mode="json")
+    return json.dumps(content, separators=(",", ":")).encode("utf-8")
+
+
+def serialize_rows(rows) -> bytes:
+    return user_read_rows_adapter.dump_json([row._asdict() for row in rows])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    repo = UserRepository(get_postgres_client())
+    users = repo.list(limit=args.limit)
+    rows = repo.list_rows(limit=args.limit)
+    if len(rows) < args.limit:
+        print(f"table has fewer than {args.limit} rows, seed it first")
+        return
+    assert json.loads(serialize_orm(users)) == json.loads(serialize_rows(rows))
+
+    results = {
+        "orm": (
+            time_call(lambda: repo.list(limit=args.limit), args.repeat),
+            time_call(lambda: serialize_orm(users), args.repeat),
+        ),
+        "rows": (
+            time_call(lambda: repo.list_rows(limit=args.limit), args.repeat),
+            time_call(lambda: serialize_rows(rows), args.repeat),
+        ),
+    }
+
+    print(f"{args.limit}-row pages, median of {args.repeat} runs")
+    print(
+        f"{'path':>6} {'fetch us/row':>13} {'encode us/row':>14} {'total us/row':>13}"
+    )
+    for path, (fetch_us, encode_us) in results.items():
+        print(
+            f"{path:>6} {fetch_us / args.limit:>13.2f} {encode_us / args.limit:>14.2f}"
+            f" {(fetch_us + encode_us) / args.limit:>13.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Fan-out user lookups by id, one query each vs coalesced by the BatchLoader.
+
+Threads stand in for threadpool requests that each look up one random user
+(no cache in front). Reports lookups/s, latency percentiles and how many
+statements reached Postgres per lookup.
+
+Usage:
+    ENV=development python -m benchmarks.bench_loader --threads 32 --seconds 5
+"""
+
+import argparse
+import random
+import statistics
+import threading
+import time
+
+from sqlalchemy import event, select
+
+from app.core.batching import BatchLoader
+from app.db.database import get_postgres_client
+from app.models.user import User
+from app.respositories.user_repository import UserRepository, load_users
+
+
+def run(repo: UserRepository, ids: list, threads: int, seconds: float) -> list:
+    latencies: list[float] = []
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+
+    def worker() -> None:
+        own = []
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            repo.get_by_id(random.choice(ids))
+            own.append(time.perf_counter() - started)
+        with lock:
+            latencies.extend(own)
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return latencies
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--window-ms", type=float, default=2.0)
+    parser.add_argument("--max-batch", type=int, default=100)
+    parser.add_argument("--sample", type=int, default=50_000)
+    args = parser.parse_args()
+
+    client = get_postgres_client()
+    statements = [0]
+
+    @event.listens_for(client.engine, "before_cursor_execute")
+    def count(*_):
+        statements[0] += 1
+
+    with client.get_session_context(read_only=True) as session:
+        ids = session.scalars(select(User.id).limit(args.sample)).all()
+
+    loader = BatchLoader(
+        load_users, window_seconds=args.window_ms / 1000, max_batch=args.max_batch
+    )
+    print(
+        f"{'mode':<10} {'lookups/s':>10} {'p50 ms':>8} {'p99 ms':>8} {'stmts/lookup':>13}"
+    )
+    for name, repo in (
+        ("direct", UserRepository(client)),
+        ("loader", UserRepository(client, loader=loader)),
+    ):
+        statements[0] = 0
+        latencies = sorted(run(repo, ids, args.threads, args.seconds))
+        p99 = latencies[int(len(latencies) * 0.99)]
+        print(
+            f"{name:<10} {len(latencies) / args.seconds:>10.0f} "
+            f"{statistics.median(latencies) * 1000:>8.2f} {p99 * 1000:>8.2f} "
+            f"{statements[0] / len(latencies):>13.3f}"
+        )
+    stats = loader.stats()
+    print(
+        f"loader: {stats['batches']} batches, mean size "
+        f"{stats['mean_batch_size']:.1f}, {stats['coalesced']} coalesced"
+    )
+    client.close()
+
+
+if __name__ == "__main__":
+    main()
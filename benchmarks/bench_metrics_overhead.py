@@ -0,0 +1,56 @@
+"""
+Cost of the metrics subsystem: requests/sec with METRICS_ENABLED on vs off.
+
+Starts one uvicorn server per setting (same DB_MODE) and drives a cheap
+endpoint, where the per-request overhead is most visible, and a DB-backed
+one, where statement hooks also run.
+
+Usage:
+    python -m benchmarks.bench_metrics_overhead --concurrency 50 --requests 5000
+"""
+
+import argparse
+import asyncio
+
+from benchmarks.bench_db_mode import drive, start_server
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--mode", choices=["sync", "async"], default="sync")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--paths", nargs="+", default=["/", "/users/?limit=10"])
+    parser.add_argument("--port", type=int, default=8120)
+    args = parser.parse_args()
+
+    results: dict[tuple[str, str], dict] = {}
+    for offset, enabled in enumerate(("false", "true")):
+        port = args.port + offset
+        server = start_server(args.mode, port, {"METRICS_ENABLED": enabled})
+        try:
+            for path in args.paths:
+                base_url = f"http://127.0.0.1:{port}"
+                # Warm up connections and caches before measuring
+                asyncio.run(drive(base_url, path, args.concurrency, args.concurrency))
+                results[enabled, path] = asyncio.run(
+                    drive(base_url, path, args.concurrency, args.requests)
+                )
+        finally:
+            server.terminate()
+            server.wait()
+
+    print(
+        f"{'path':<20} {'off req/s':>10} {'on req/s':>10} {'overhead':>9} {'p99 on':>8}"
+    )
+    for path in args.paths:
+        off, on = results["false", path], results["true", path]
+        overhead = (1 - on["rps"] / off["rps"]) * 100
+        print(
+            f"{path:<20} {off['rps']:>10.1f} {on['rps']:>10.1f} {overhead:>8.1f}%"
+            f" {on['p99_ms']:>6.1f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Per-page cost of offset vs keyset pagination at increasing depth.
+
+Needs a populated users table (see app/db/seed.py). For every depth the
+keyset cursor is located once up front, then only the page fetch is timed.
+
+Usage:
+    python -m benchmarks.bench_pagination --limit 100 --pages 1 1000 100000
+"""
+
+import argparse
+import statistics
+import time
+
+from sqlmodel import select
+
+from app.db.database import get_postgres_client
+from app.models.user import User
+from app.respositories.user_repository import UserRepository
+
+
+def time_call(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 100, 10_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    postgres_client = get_postgres_client()
+    repo = UserRepository(postgres_client)
+    print(f"{'page':>8} {'offset ms':>10} {'keyset ms':>10}")
+    for page in args.pages:
+        offset = (page - 1) * args.limit
+        after = None
+        if offset:
+            with postgres_client.get_session_context() as session:
+                row = session.exec(
+                    select(User.create_at, User.id)
+                    .order_by(User.create_at, User.id)
+                    .offset(offset - 1)
+                    .limit(1)
+                ).first()
+            if row is None:
+                print(f"{page:>8} table has fewer than {offset} rows, stopping")
+                break
+            after = tuple(row)
+
+        offset_ms = time_call(
+            lambda: repo.list(limit=args.limit, offset=offset), args.repeat
+        )
+        keyset_ms = time_call(
+            lambda: repo.list(limit=args.limit, after=after), args.repeat
+        )
+        print(f"{page:>8} {offset_ms:>10.2f} {keyset_ms:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Plans and latency of GET /users/search on a large users table.
+
+Runs EXPLAIN (ANALYZE, BUFFERS) of search_statement() for a few query
+shapes and reports, per query, the indexes the plan reads, whether it falls
+back to a sequential scan of the user table, the shared buffers touched and
+the median latency. Needs a populated table; --seed-to tops it up with the
+COPY seeding engine first (e.g. --seed-to 3000000).
+
+GIN indexes cannot answer index-only scans: substring queries read the
+matching heap rows to rank them, but no more than those.
+
+Usage:
+    python -m benchmarks.bench_search --seed-to 3000000
+    python -m benchmarks.bench_search --queries se seed-0000012 smith zzq
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import time
+
+from app.config.settings import get_settings
+from app.db.bulk_seed import seed_users_copy
+from app.db.database import get_postgres_client
+from app.respositories.user_repository import UserRepository, search_statement
+
+
+def plan_nodes(node: dict):
+    yield node
+    for child in node.get("Plans", []):
+        yield from plan_nodes(child)
+
+
+def explain(connection, query: str, limit: int) -> dict:
+    compiled = search_statement(query, limit).compile(dialect=connection.dialect)
+    result = connection.exec_driver_sql(
+        f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {compiled}", compiled.params
+    )
+    return result.scalar()[0]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--queries", nargs="+", default=["se", "seed-0000012", "smith", "zzq"]
+    )
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--seed-to", type=int, default=0)
+    args = parser.parse_args()
+
+    client = get_postgres_client()
+    repo = UserRepository(client)
+    rows = repo.count_exact()
+    if rows < args.seed_to:
+        report = seed_users_copy(
+            get_settings().database_url,
+            count=args.seed_to - rows,
+            rounds=get_settings().bcrypt_rounds or 4,
+        )
+        rows += report.rows
+    with client.engine.connect() as connection:
+        connection.exec_driver_sql('ANALYZE "user"')
+        connection.commit()
+    print(f"users: {rows:,}")
+
+    print(
+        f"{'query':<16} {'rows':>5} {'median ms':>10} {'buffers':>8} "
+        f"{'seq scan':>8}  indexes"
+    )
+    seq_scans = 0
+    with client.engine.connect() as connection:
+        for query in args.queries:
+            plan = explain(connection, query, args.limit)
+            nodes = list(plan_nodes(plan["Plan"]))
+            indexes = sorted({n["Index Name"] for n in nodes if "Index Name" in n})
+            seq_scan = any(n["Node Type"] == "Seq Scan" for n in nodes)
+            seq_scans += seq_scan
+            buffers = plan["Plan"].get("Shared Hit Blocks", 0) + plan["Plan"].get(
+                "Shared Read Blocks", 0
+            )
+
+            timings = []
+            for _ in range(args.repeat):
+                started = time.perf_counter()
+                found = repo.search(query, limit=args.limit)
+                timings.append(time.perf_counter() - started)
+            print(
+                f"{query:<16} {len(found):>5} {statistics.median(timings) * 1000:>10.2f}"
+                f" {buffers:>8} {str(seq_scan).lower():>8}  {', '.join(indexes)}"
+            )
+            if seq_scan:
+                print(json.dumps(plan["Plan"], indent=2)[:2000], file=sys.stderr)
+    client.close()
+    sys.exit(1 if seq_scans else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Throughput of the multi-process server (app/server.py) by worker count.
+
+Starts `python -m app.server` with WEB_CONCURRENCY set to each worker count
+against the database configured in the environment, and drives the path
+from several load processes (a single Python client saturates before a few
+workers do). Reports req/s, the speedup over one worker and the scaling
+efficiency (speedup / workers); it stays close to 1 while workers have
+cores of their own and the database keeps up.
+
+Usage:
+    BCRYPT_ROUNDS=4 python -m benchmarks.bench_workers --workers 1,2,4 \\
+        --load-processes 4 --concurrency 50 --requests 5000
+"""
+
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import httpx
+
+from benchmarks.bench_db_mode import drive
+
+
+def start_launcher(workers: int, port: int) -> subprocess.Popen:
+    env = {**os.environ, "WEB_CONCURRENCY": str(workers), "PORT": str(port)}
+    process = subprocess.Popen(
+        [sys.executable, "-m", "app.server"],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/", timeout=0.5)
+            # The first worker answered; give the others time to finish
+            # their lifespan too
+            time.sleep(1)
+            return process
+        except httpx.HTTPError:
+            time.sleep(0.1)
+    process.terminate()
+    raise RuntimeError(f"app.server ({workers} workers) did not start on {port}")
+
+
+def load(base_url: str, path: str, concurrency: int, total: int) -> dict:
+    return asyncio.run(drive(base_url, path, concurrency, total))
+
+
+def measure(args: argparse.Namespace, workers: int) -> dict:
+    server = start_launcher(workers, args.port)
+    base_url = f"http://127.0.0.1:{args.port}"
+    per_process = args.requests // args.load_processes
+    try:
+        # Warm up every worker's pools and caches before measuring
+        load(base_url, args.path, args.concurrency, workers * 50)
+        with ProcessPoolExecutor(max_workers=args.load_processes) as pool:
+            started = time.perf_counter()
+            results = list(
+                pool.map(
+                    load,
+                    [base_url] * args.load_processes,
+                    [args.path] * args.load_processes,
+                    [args.concurrency] * args.load_processes,
+                    [per_process] * args.load_processes,
+                )
+            )
+            elapsed = time.perf_counter() - started
+    finally:
+        server.terminate()
+        server.wait()
+    return {
+        "rps": per_process * args.load_processes / elapsed,
+        "p99_ms": max(result["p99_ms"] for result in results),
+        "errors": sum(result["errors"] for result in results),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workers", default="1,2,4")
+    parser.add_argument("--load-processes", type=int, default=4)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--path", default="/users/?limit=10")
+    parser.add_argument("--port", type=int, default=8200)
+    args = parser.parse_args()
+
+    print(f"CPU cores: {os.cpu_count()}")
+    print(
+        f"{'workers':>7} {'req/s':>9} {'speedup':>8} {'efficiency':>10} {'p99 ms':>8}"
+    )
+    single = None
+    for workers in [int(count) for count in args.workers.split(",")]:
+        result = measure(args, workers)
+        single = single or result["rps"]
+        speedup = result["rps"] / single
+        print(
+            f"{workers:>7} {result['rps']:>9.1f} {speedup:>8.2f} "
+            f"{speedup / workers:>10.2f} {result['p99_ms']:>8.1f}"
+            + (f"  errors={result['errors']}" if result["errors"] else "")
+        )
+
+
+if __name__ == "__main__":
+    main()
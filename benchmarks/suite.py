@@ -0,0 +1,344 @@
+"""
+Load-benchmark suite with regression baselines.
+
+Drives the real app, in-process (httpx ASGITransport, app lifespan included)
+and/or through a uvicorn server, against the database from the environment:
+
+- GET /
+- GET /users/ at every --page-sizes x --offsets combination
+- POST /users/ at every --post-concurrency level (unique emails, removed
+  afterwards)
+
+Each scenario records throughput and p50/p95/p99 latency. Results are written
+to JSON and compared against a baseline: a scenario regresses when its
+throughput drops, or its p95 grows, by more than --tolerance. The exit code
+is 1 when anything regressed, so the suite can gate CI.
+
+Deep offsets need a populated table (python -m app.db.seed --count 100000),
+and BCRYPT_ROUNDS=4 keeps POST /users/ measuring the app rather than bcrypt.
+Baselines are only comparable on the same machine and settings; the settings
+are stored with the results and differences are reported.
+
+Usage:
+    BCRYPT_ROUNDS=4 python -m benchmarks.suite --update-baseline
+    BCRYPT_ROUNDS=4 python -m benchmarks.suite --tolerance 0.15
+"""
+
+import argparse
+import asyncio
+import json
+import platform
+import subprocess
+import sys
+import time
+import uuid
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+
+import httpx
+from sqlmodel import col, delete
+
+from app.config.settings import get_settings
+from app.db.database import get_postgres_client
+from app.models.user import User
+from benchmarks.bench_db_mode import start_server
+
+BENCHMARKS_DIR = Path(__file__).resolve().parent
+DEFAULT_BASELINE = BENCHMARKS_DIR / "results" / "baseline.json"
+DEFAULT_OUTPUT = BENCHMARKS_DIR / "results" / "latest.json"
+# Settings that change the numbers; compared between results and baseline
+COMPARED_SETTINGS = ("db_mode", "bcrypt_rounds", "unit_of_work_enabled")
+EMAIL_PREFIX = "bench-suite-"
+
+
+@dataclass
+class Scenario:
+    name: str
+    method: str
+    path: str
+    concurrency: int
+    requests: int
+    warmup: int = 20
+
+
+@dataclass
+class ScenarioResult:
+    requests: int
+    concurrency: int
+    errors: int
+    seconds: float
+    rps: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+
+
+@dataclass
+class Regression:
+    key: str
+    metric: str
+    baseline: float
+    current: float
+    change: float = field(init=False)
+
+    def __post_init__(self):
+        self.change = (self.current - self.baseline) / self.baseline
+
+
+def percentile(sorted_values: list[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    index = max(
+        0, min(len(sorted_values) - 1, round(fraction * len(sorted_values)) - 1)
+    )
+    return sorted_values[index]
+
+
+def build_scenarios(args: argparse.Namespace) -> list[Scenario]:
+    scenarios = [Scenario("GET /", "GET", "/", args.concurrency, args.requests)]
+    for limit in args.page_sizes:
+        for offset in args.offsets:
+            scenarios.append(
+                Scenario(
+                    f"GET /users/ limit={limit} offset={offset}",
+                    "GET",
+                    f"/users/?limit={limit}&offset={offset}",
+                    args.concurrency,
+                    args.requests,
+                )
+            )
+    for concurrency in args.post_concurrency:
+        scenarios.append(
+            Scenario(
+                f"POST /users/ concurrency={concurrency}",
+                "POST",
+                "/users/",
+                concurrency,
+                args.post_requests,
+                warmup=0,
+            )
+        )
+    return scenarios
+
+
+async def run_scenario(client: httpx.AsyncClient, scenario: Scenario) -> ScenarioResult:
+    """Send scenario.requests requests from scenario.concurrency workers."""
+    run_tag = uuid.uuid4().hex[:8]
+    sequence = iter(range(scenario.warmup + scenario.requests))
+    latencies: list[float] = []
+    errors = 0
+
+    async def send(index: int) -> httpx.Response:
+        if scenario.method == "POST":
+            payload = {
+                "email": f"{EMAIL_PREFIX}{run_tag}-{index}@example.com",
+                "password": "password123",
+            }
+            return await client.post(scenario.path, json=payload)
+        return await client.get(scenario.path)
+
+    # Warm-up requests fill pools and caches and are not measured
+    for index in range(scenario.warmup):
+        await send(next(sequence))
+
+    async def worker() -> None:
+        nonlocal errors
+        for index in sequence:
+            started = time.perf_counter()
+            response = await send(index)
+            latencies.append(time.perf_counter() - started)
+            if not response.is_success:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(scenario.concurrency)))
+    seconds = time.perf_counter() - started
+
+    latencies.sort()
+    return ScenarioResult(
+        requests=len(latencies),
+        concurrency=scenario.concurrency,
+        errors=errors,
+        seconds=seconds,
+        rps=len(latencies) / seconds,
+        p50_ms=percentile(latencies, 0.50) * 1000,
+        p95_ms=percentile(latencies, 0.95) * 1000,
+        p99_ms=percentile(latencies, 0.99) * 1000,
+    )
+
+
+async def run_scenarios(
+    client: httpx.AsyncClient, transport: str, scenarios: list[Scenario]
+) -> dict[str, ScenarioResult]:
+    results = {}
+    for scenario in scenarios:
+        result = await run_scenario(client, scenario)
+        results[f"{transport}: {scenario.name}"] = result
+        print(
+            f"{transport:>7} {scenario.name:<36} {result.rps:9.1f} req/s  "
+            f"p50={result.p50_ms:7.2f}ms  p95={result.p95_ms:7.2f}ms  "
+            f"p99={result.p99_ms:7.2f}ms  errors={result.errors}"
+        )
+    return results
+
+
+async def run_in_process(scenarios: list[Scenario]) -> dict[str, ScenarioResult]:
+    # Imported here so the uvicorn-only runs do not build the app twice
+    from app.main import app
+
+    concurrency = max(scenario.concurrency for scenario in scenarios)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app),
+            base_url="http://bench",
+            limits=httpx.Limits(max_connections=concurrency),
+            timeout=60,
+        ) as client:
+            return await run_scenarios(client, "asgi", scenarios)
+
+
+def run_uvicorn(scenarios: list[Scenario], port: int) -> dict[str, ScenarioResult]:
+    server = start_server(get_settings().db_mode, port)
+    try:
+        concurrency = max(scenario.concurrency for scenario in scenarios)
+
+        async def drive() -> dict[str, ScenarioResult]:
+            async with httpx.AsyncClient(
+                base_url=f"http://127.0.0.1:{port}",
+                limits=httpx.Limits(max_connections=concurrency),
+                timeout=60,
+            ) as client:
+                return await run_scenarios(client, "uvicorn", scenarios)
+
+        return asyncio.run(drive())
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def remove_benchmark_users() -> None:
+    with get_postgres_client().get_session_context() as session:
+        session.exec(delete(User).where(col(User.email).startswith(EMAIL_PREFIX)))
+        session.commit()
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=BENCHMARKS_DIR,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def metadata() -> dict:
+    settings = get_settings()
+    return {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "machine": platform.node(),
+        "settings": {name: getattr(settings, name) for name in COMPARED_SETTINGS},
+    }
+
+
+def compare(current: dict, baseline: dict, tolerance: float) -> list[Regression]:
+    """
+    Scenarios whose throughput fell, or whose p95 rose, past the tolerance.
+    Scenarios missing from either side are not compared.
+    """
+    regressions = []
+    for key, result in current["results"].items():
+        reference = baseline["results"].get(key)
+        if reference is None:
+            continue
+        if result["rps"] < reference["rps"] * (1 - tolerance):
+            regressions.append(Regression(key, "rps", reference["rps"], result["rps"]))
+        if result["p95_ms"] > reference["p95_ms"] * (1 + tolerance):
+            regressions.append(
+                Regression(key, "p95_ms", reference["p95_ms"], result["p95_ms"])
+            )
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument(
+        "--transport", choices=("asgi", "uvicorn", "both"), default="both"
+    )
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50, help="for GETs")
+    parser.add_argument("--page-sizes", type=int, nargs="+", default=[10, 50, 100])
+    parser.add_argument("--offsets", type=int, nargs="+", default=[0, 1000, 10_000])
+    parser.add_argument("--post-requests", type=int, default=500)
+    parser.add_argument("--post-concurrency", type=int, nargs="+", default=[1, 10, 50])
+    parser.add_argument("--port", type=int, default=8200)
+    parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT)
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.15,
+        help="allowed relative change of req/s and p95 (0.15 = 15%%)",
+    )
+    parser.add_argument(
+        "--update-baseline",
+        action="store_true",
+        help="store this run as the baseline instead of comparing",
+    )
+    args = parser.parse_args()
+
+    scenarios = build_scenarios(args)
+    results: dict[str, ScenarioResult] = {}
+    try:
+        if args.transport in ("asgi", "both"):
+            results.update(asyncio.run(run_in_process(scenarios)))
+        if args.transport in ("uvicorn", "both"):
+            results.update(run_uvicorn(scenarios, args.port))
+    finally:
+        remove_benchmark_users()
+
+    current = {
+        "meta": metadata(),
+        "results": {key: asdict(result) for key, result in results.items()},
+    }
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(current, indent=2))
+    print(f"\nResults written to {args.output}")
+
+    if args.update_baseline:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps(current, indent=2))
+        print(f"Baseline updated: {args.baseline}")
+        return
+    if not args.baseline.exists():
+        print(f"No baseline at {args.baseline}; run with --update-baseline first")
+        return
+
+    baseline = json.loads(args.baseline.read_text())
+    if baseline["meta"]["settings"] != current["meta"]["settings"]:
+        print(
+            "Warning: baseline was recorded with different settings: "
+            f"{baseline['meta']['settings']} (now {current['meta']['settings']})"
+        )
+    regressions = compare(current, baseline, args.tolerance)
+    if not regressions:
+        print(f"No regression beyond {args.tolerance:.0%} against {args.baseline}")
+        return
+    print(f"\n{len(regressions)} regression(s) beyond {args.tolerance:.0%}:")
+    for regression in regressions:
+        print(
+            f"  {regression.key} {regression.metric}: {regression.baseline:.2f} -> "
+            f"{regression.current:.2f} ({regression.change:+.1%})"
+        )
+    sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+"""
+Helpers for tests of batched calls.
+
+A batcher only waits its window while a batch of the same group is running,
+so tests of concurrent callers sharing a batch hold one in flight first.
+"""
+
+import threading
+from contextlib import contextmanager
+
+
+@contextmanager
+def group_busy(batcher, call, result):
+    """
+    Keep one batch of the group running, as under load: callers arriving
+    meanwhile wait the window and share a batch. The held batch returns result.
+    """
+    started, release = threading.Event(), threading.Event()
+    batch_fn = batcher.batch_fn
+
+    def held(group, items):
+        started.set()
+        release.wait()
+        return result
+
+    batcher.batch_fn = held
+    thread = threading.Thread(target=call)
+    thread.start()
+    started.wait()
+    batcher.batch_fn = batch_fn
+    try:
+        yield
+    finally:
+        release.set()
+        thread.join()
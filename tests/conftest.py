@@ -1,41 +1,155 @@
+import os
+
+import asyncio
+
 import pytest
-from sqlmodel import SQLModel
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+from sqlmodel import Session
+
+# Requests and tracked blocks that go over their query budget fail in tests
+os.environ.setdefault("QUERY_BUDGET_STRICT", "true")
+# Cheap hashes for the registrations sent through the app
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+
+from app.config.settings import get_settings  # noqa: E402
+from tests.databases import prepare_database, worker_database_url  # noqa: E402
+
+# Each xdist worker runs on its own copy of the test database; point the
+# settings at it before the test client is built
+settings = get_settings()
+TEST_TEMPLATE_DATABASE = f"{make_url(settings.test_database_url).database}_template"
+settings.test_database_url = worker_database_url(
+    settings.test_database_url, os.environ.get("PYTEST_XDIST_WORKER")
+)
+
+from app.db.database import build_pool_config, get_test_postgres_client  # noqa: E402
+from app.models.user import User  # noqa: E402
+
+DB_MODES = ["sync", "async"]
+
+
+def pytest_generate_tests(metafunc):
+    """Run every test of the HTTP API under both DB_MODE request paths."""
+    if "api_client" in metafunc.fixturenames:
+        metafunc.parametrize("db_mode", DB_MODES)
 
-from app.db.database import test_postgres_client
+
+@pytest.fixture
+def db_mode() -> str:
+    """DB_MODE of the app under test; parametrized for api_client tests."""
+    return "sync"
 
 
 @pytest.fixture(scope="session")
 def setup_test_db():
     """
-    Create all tables in test database at session start.
-    Runs once per test session.
+    Create this worker's test database from the migrated template.
+    Runs once per test session (per worker under pytest-xdist).
     """
-    test_postgres_client.create_tables(SQLModel.metadata)
+    prepare_database(settings.test_database_url, TEST_TEMPLATE_DATABASE)
     yield
-    # Cleanup after all tests - drop all tables in reverse order
-    with test_postgres_client.get_session_context() as session:
-        for table in reversed(SQLModel.metadata.sorted_tables):
-            session.query(table).delete()
-        session.commit()
-        # Drop tables
-        SQLModel.metadata.drop_all(test_postgres_client.engine)
+    get_test_postgres_client().close()
+
+
+@pytest.fixture
+def db_connection(setup_test_db, db_mode):
+    """
+    Bind the test client to one connection inside an outer transaction.
+
+    Sessions of repositories, services and units of work run in savepoints
+    of that transaction, and everything is rolled back after the test.
+
+    The DB_MODE=async app runs on connections of its own, which cannot join
+    that transaction: under it, the test client commits for real and the
+    tables are emptied after the test instead.
+    """
+    client = get_test_postgres_client()
+    if db_mode == "async":
+        with client.engine.connect() as connection:
+            yield connection
+        with client.engine.begin() as connection:
+            connection.execute(text(f'TRUNCATE "{User.__tablename__}"'))
+        return
+    connection = client.engine.connect()
+    transaction = connection.begin()
+    with client.bind(connection):
+        yield connection
+    transaction.rollback()
+    connection.close()
 
 
 @pytest.fixture
-def db_session(setup_test_db):
+def db_session(db_connection):
     """
-    Provide a clean database session for each test.
-    Rolls back all changes after test completes for test isolation.
+    Provide a session that sees the writes of the test client.
+    Rolled back with the rest of the test's transaction.
     """
-    session = next(test_postgres_client.get_session())
-    yield session
-    session.rollback()
-    session.close()
+    with Session(
+        db_connection, expire_on_commit=False, join_transaction_mode="create_savepoint"
+    ) as session:
+        yield session
 
 
 @pytest.fixture
-def test_client():
+def test_client(db_connection):
     """
     Provide test postgres client instance for direct repository testing.
+    Its writes are rolled back after the test.
     """
-    return test_postgres_client
+    return get_test_postgres_client()
+
+
+@pytest.fixture
+def committing_client(setup_test_db):
+    """
+    Provide the test postgres client with real commits, for tests that need
+    several connections (concurrency, other processes, pool counters).
+    Tests clean up their own rows.
+    """
+    return get_test_postgres_client()
+
+
+@pytest.fixture
+def api_client(test_client, db_mode, monkeypatch):
+    """
+    HTTP client for the app in each DB_MODE (see pytest_generate_tests).
+
+    Sync requests run on the test client, each in its own unit of work;
+    async requests on an async client of the test database.
+    """
+    from fastapi.testclient import TestClient
+
+    from app.clients.async_postgres_client import AsyncPostgresClient
+    from app.core.pagination import get_count_cache
+    from app.db.database import get_user_cache
+    from app.db.unit_of_work import UnitOfWork
+    from app.dependencies.db_dependencies import get_async_db_client, get_db_client
+    from app.main import app as sync_app, create_app
+
+    def get_test_db_client():
+        with UnitOfWork(test_client) as uow:
+            yield uow
+
+    app, async_client = sync_app, None
+    if db_mode == "async":
+        monkeypatch.setattr(settings, "db_mode", "async")
+        app = create_app()
+        async_client = AsyncPostgresClient(
+            settings.test_database_url, pool=build_pool_config()
+        )
+
+        async def get_test_async_db_client():
+            return async_client
+
+        app.dependency_overrides[get_async_db_client] = get_test_async_db_client
+
+    app.dependency_overrides[get_db_client] = get_test_db_client
+    yield TestClient(app)
+    app.dependency_overrides.pop(get_db_client, None)
+    app.dependency_overrides.pop(get_async_db_client, None)
+    if async_client is not None:
+        asyncio.run(async_client.close())
+    # Users cached and counted by these requests were rolled back
+    get_user_cache().clear()
+    get_count_cache.cache_clear()
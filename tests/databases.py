@@ -0,0 +1,116 @@
+"""
+Per-worker test databases cloned from a migrated template.
+
+The first worker to start migrates <test db>_template with Alembic; every
+worker then gets its own copy through CREATE DATABASE ... TEMPLATE, which is
+a file-level copy and takes milliseconds whatever the number of migrations.
+The template is rebuilt only when the migrations change, detected through a
+fingerprint stored as the template's database comment. An advisory lock on
+the maintenance database serializes all of this across xdist workers.
+"""
+
+import hashlib
+from pathlib import Path
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import Connection, create_engine, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import NullPool
+
+ALEMBIC_DIR = Path(__file__).resolve().parent.parent / "alembic"
+# Arbitrary key of the advisory lock taken while templates are prepared
+TEMPLATE_LOCK_KEY = 7_340_015
+
+
+def worker_database_url(database_url: str, worker: str | None) -> str:
+    """The test database of one xdist worker (gw0, gw1, ...)."""
+    if not worker:
+        return database_url
+    url = make_url(database_url)
+    return url.set(database=f"{url.database}_{worker}").render_as_string(
+        hide_password=False
+    )
+
+
+def migrations_fingerprint() -> str:
+    """Hash of the migration scripts; changes whenever a migration does."""
+    digest = hashlib.sha256()
+    for path in sorted(ALEMBIC_DIR.glob("versions/*.py")):
+        digest.update(path.name.encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()[:16]
+
+
+def migrate(database_url: str) -> None:
+    """Run the Alembic migrations up to head on a database."""
+    config = Config()
+    config.set_main_option("script_location", str(ALEMBIC_DIR))
+    engine = create_engine(database_url, poolclass=NullPool)
+    try:
+        # Alembic manages the transaction itself (some migrations step out of
+        # it to build indexes concurrently)
+        with engine.connect() as connection:
+            config.attributes["connection"] = connection
+            command.upgrade(config, "head")
+    finally:
+        engine.dispose()
+
+
+def _template_fingerprint(admin: Connection, name: str) -> str | None:
+    return admin.execute(
+        text(
+            "SELECT shobj_description(oid, 'pg_database') FROM pg_database "
+            "WHERE datname = :name"
+        ),
+        {"name": name},
+    ).scalar_one_or_none()
+
+
+def prepare_database(database_url: str, template_name: str) -> None:
+    """
+    Recreate the database of database_url as a copy of the migrated template.
+
+    Args:
+        database_url: Database to (re)create; anything in it is dropped
+        template_name: Template database, built on the same server if missing
+            or migrated from older migration scripts
+    """
+    url = make_url(database_url)
+    admin_engine = create_engine(
+        url.set(database="postgres"), isolation_level="AUTOCOMMIT", poolclass=NullPool
+    )
+    fingerprint = migrations_fingerprint()
+    try:
+        with admin_engine.connect() as admin:
+            admin.execute(
+                text("SELECT pg_advisory_lock(:key)"), {"key": TEMPLATE_LOCK_KEY}
+            )
+            try:
+                if _template_fingerprint(admin, template_name) != fingerprint:
+                    admin.execute(
+                        text(f'DROP DATABASE IF EXISTS "{template_name}" WITH (FORCE)')
+                    )
+                    admin.execute(text(f'CREATE DATABASE "{template_name}"'))
+                    migrate(
+                        url.set(database=template_name).render_as_string(
+                            hide_password=False
+                        )
+                    )
+                    admin.execute(
+                        text(
+                            f"COMMENT ON DATABASE \"{template_name}\" IS '{fingerprint}'"
+                        )
+                    )
+                admin.execute(
+                    text(f'DROP DATABASE IF EXISTS "{url.database}" WITH (FORCE)')
+                )
+                admin.execute(
+                    text(f'CREATE DATABASE "{url.database}" TEMPLATE "{template_name}"')
+                )
+            finally:
+                admin.execute(
+                    text("SELECT pg_advisory_unlock(:key)"), {"key": TEMPLATE_LOCK_KEY}
+                )
+    finally:
+        admin_engine.dispose()
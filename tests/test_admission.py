@@ -0,0 +1,127 @@
+import asyncio
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from app.core.admission import AdmissionController, ClassConfig, route_class
+from app.core.middleware import AdmissionMiddleware
+
+
+def controller(limit: int = 1, capacity: int = 10, **kwargs) -> AdmissionController:
+    return AdmissionController(
+        classes={
+            "read": ClassConfig(0.1, initial_limit=limit),
+            "write": ClassConfig(0.1, initial_limit=limit),
+        },
+        capacity=lambda: capacity,
+        **kwargs,
+    )
+
+
+@pytest.mark.unit
+class TestAdmissionController:
+    """Test admission, queueing and shedding decisions"""
+
+    def test_route_classes(self):
+        """Case: /users and /auth are gated by method, the rest bypasses"""
+        assert route_class("GET", "/users/") == "read"
+        assert route_class("POST", "/auth/login") == "write"
+        assert route_class("GET", "/internal/pool") is None
+        assert route_class("GET", "/metrics") is None
+        # Answered from the token alone
+        assert route_class("GET", "/auth/me") is None
+
+    async def test_full_queue_sheds_at_once(self):
+        """Case: over the limit with no queue room, the request is shed"""
+        admission = controller(limit=1, max_queue=0)
+
+        assert await admission.acquire("read")
+        assert not await admission.acquire("read")
+        # Classes have limits of their own
+        assert await admission.acquire("write")
+        assert admission.stats()["classes"]["read"]["shed"] == 1
+
+    async def test_capacity_is_shared(self):
+        """Case: all classes together stay within the capacity"""
+        admission = controller(limit=5, capacity=1, max_queue=0)
+
+        assert await admission.acquire("read")
+        assert not await admission.acquire("write")
+
+    async def test_waiter_gets_released_slot(self):
+        """Case: a queued request is admitted when a slot frees up"""
+        admission = controller(limit=1, queue_interval_seconds=1)
+        assert await admission.acquire("read")
+
+        waiting = asyncio.ensure_future(admission.acquire("read"))
+        await asyncio.sleep(0.01)
+        assert admission.stats()["classes"]["read"]["queued"] == 1
+        admission.release("read", 0.01)
+
+        assert await waiting
+        assert admission.stats()["classes"]["read"]["inflight"] == 1
+
+    async def test_standing_queue_sheds_after_target(self):
+        """Case: once waits stay above the target for an interval (CoDel),
+        queued requests only get the target before being shed"""
+        admission = controller(
+            limit=1, queue_target_seconds=0.001, queue_interval_seconds=0.02
+        )
+        assert await admission.acquire("read")
+
+        # A full interval of waits above the target: the queue is standing
+        assert not await admission.acquire("read")
+        assert not await admission.acquire("read")
+        assert admission.classes["read"].overloaded
+
+        started = asyncio.get_running_loop().time()
+        assert not await admission.acquire("read")
+        assert asyncio.get_running_loop().time() - started < 0.015
+
+    def test_limit_adapts_to_latency(self):
+        """Case: slow responses shrink the limit, fast saturated ones grow it"""
+        admission = controller(limit=10, capacity=20)
+        limit = admission.classes["read"]
+
+        limit.inflight = 9
+        limit.record_latency(0.01, max_limit=20, interval=0.1)
+        assert limit.limit == pytest.approx(10.1)
+
+        limit.record_latency(0.5, max_limit=20, interval=0.1)
+        assert limit.limit == pytest.approx(9.09)
+        # One decrease per interval
+        limit.record_latency(0.5, max_limit=20, interval=0.1)
+        assert limit.limit == pytest.approx(9.09)
+
+
+@pytest.mark.unit
+class TestAdmissionMiddleware:
+    """Test shedding through the middleware"""
+
+    async def test_excess_requests_get_503(self):
+        """Case: with one slot and no queue, a concurrent request is shed"""
+        app = FastAPI()
+        release = asyncio.Event()
+
+        @app.get("/users/slow")
+        async def slow() -> dict:
+            await release.wait()
+            return {"ok": True}
+
+        app.add_middleware(
+            AdmissionMiddleware,
+            controller=controller(limit=1, max_queue=0),
+            retry_after_seconds=2,
+        )
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://t") as http:
+            first = asyncio.ensure_future(http.get("/users/slow"))
+            await asyncio.sleep(0.05)
+            shed = await http.get("/users/slow")
+            release.set()
+
+            assert shed.status_code == 503
+            assert shed.headers["Retry-After"] == "2"
+            assert (await first).status_code == 200
+            assert (await http.get("/users/slow")).status_code == 200
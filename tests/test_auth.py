@@ -0,0 +1,224 @@
+import time
+from uuid import uuid4
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+from app.core.hashing import PasswordHasher
+from app.core.tokens import (
+    InvalidTokenError,
+    RevocationList,
+    TokenSigner,
+    get_token_signer,
+)
+from app.db.database import get_revocation_list
+from app.main import app
+from app.respositories.user_repository import UserRepository
+from app.schemas.user import UserCreate
+from app.services.auth_service import AuthService
+
+PASSWORD = "pass-0001"
+
+
+@pytest.fixture
+def hasher():
+    hasher = PasswordHasher(max_workers=1, rounds=4)
+    yield hasher
+    hasher.shutdown()
+
+
+@pytest.fixture
+def signer():
+    return TokenSigner("test-secret", access_ttl_seconds=60, refresh_ttl_seconds=600)
+
+
+@pytest.fixture
+def auth_service(test_client, hasher, signer):
+    return AuthService(UserRepository(test_client), hasher, signer, RevocationList(600))
+
+
+@pytest.fixture
+def user(test_client, hasher):
+    return UserRepository(test_client).register(
+        UserCreate(email="login@mail.com", password=PASSWORD),
+        hashed_password=hasher.hash(PASSWORD),
+    )
+
+
+@pytest.mark.unit
+@pytest.mark.security
+class TestTokenSigner:
+    """Test HMAC-signed tokens"""
+
+    def test_round_trip(self, signer):
+        """Case: an issued token verifies to the same claims"""
+        user_id = uuid4()
+        claims = signer.verify(signer.issue(user_id, 3))
+
+        assert claims.user_id == user_id
+        assert claims.generation == 3
+        assert claims.token_type == "access"
+        assert claims.expires_at == claims.issued_at + 60
+
+    def test_rejects_tampered_and_foreign_tokens(self, signer):
+        """Case: a modified payload or another key's signature is refused"""
+        token = signer.issue(uuid4(), 0)
+        header, payload, signature = token.split(".")
+        other = TokenSigner("other-secret").issue(uuid4(), 0)
+
+        for bad in (
+            f"{header}.{payload[:-2]}xx.{signature}",
+            other,
+            "not-a-token",
+            "",
+        ):
+            with pytest.raises(InvalidTokenError):
+                signer.verify(bad)
+
+    def test_rejects_expired_and_wrong_type(self):
+        """Case: expired tokens and refresh tokens used as access are refused"""
+        signer = TokenSigner("test-secret", access_ttl_seconds=-1)
+        with pytest.raises(InvalidTokenError, match="expired"):
+            signer.verify(signer.issue(uuid4(), 0))
+        with pytest.raises(InvalidTokenError, match="access"):
+            signer.verify(signer.issue(uuid4(), 0, "refresh"))
+
+
+@pytest.mark.unit
+@pytest.mark.security
+class TestRevocationList:
+    """Test the generation-based denylist"""
+
+    def test_older_generations_are_revoked(self, signer):
+        """Case: tokens below the revoked generation are refused, newer pass"""
+        user_id = uuid4()
+        revocations = RevocationList(600)
+        revocations.revoke(user_id, 2)
+        # An out-of-order notification does not lower the generation
+        revocations.revoke(user_id, 1)
+
+        assert revocations.is_revoked(signer.verify(signer.issue(user_id, 1)))
+        assert not revocations.is_revoked(signer.verify(signer.issue(user_id, 2)))
+        assert not revocations.is_revoked(signer.verify(signer.issue(uuid4(), 0)))
+
+    def test_entries_expire_after_retention(self):
+        """Case: revocations older than the longest token lifetime are dropped"""
+        revocations = RevocationList(60)
+        revocations.revoke(uuid4(), 1, revoked_at=time.time() - 120)
+        assert len(revocations) == 0
+
+
+@pytest.mark.integration
+@pytest.mark.service
+@pytest.mark.security
+class TestAuthService:
+    """Test login, refresh and logout"""
+
+    def test_login_and_refresh(self, auth_service, user):
+        """Case: valid credentials get a token pair, the refresh token renews it"""
+        tokens = auth_service.login(user.email, PASSWORD)
+        claims = auth_service.verify_token(tokens.access_token)
+        assert claims.user_id == user.id
+
+        renewed = auth_service.refresh(tokens.refresh_token)
+        assert auth_service.verify_token(renewed.access_token).user_id == user.id
+        with pytest.raises(HTTPException) as exc_info:
+            auth_service.refresh(tokens.access_token)
+        assert exc_info.value.status_code == 401
+
+    def test_login_rejects_bad_credentials(self, auth_service, user):
+        """Case: wrong password and unknown email both answer 401"""
+        for email, password in (
+            (user.email, "wrong-pass"),
+            ("nobody@mail.com", PASSWORD),
+        ):
+            with pytest.raises(HTTPException) as exc_info:
+                auth_service.login(email, password)
+            assert exc_info.value.status_code == 401
+            assert exc_info.value.headers == {"WWW-Authenticate": "Bearer"}
+
+    def test_logout_revokes_issued_tokens(self, auth_service, user):
+        """Case: after logout, older access and refresh tokens are refused"""
+        tokens = auth_service.login(user.email, PASSWORD)
+        auth_service.logout(auth_service.verify_token(tokens.access_token))
+
+        for token, token_type in (
+            (tokens.access_token, "access"),
+            (tokens.refresh_token, "refresh"),
+        ):
+            with pytest.raises(HTTPException):
+                auth_service.verify_token(token, token_type)
+        # A new login gets the new generation
+        fresh = auth_service.login(user.email, PASSWORD)
+        assert auth_service.verify_token(fresh.access_token).generation == 1
+
+    def test_refresh_checks_generation_on_the_user_row(
+        self, test_client, auth_service, user
+    ):
+        """Case: a revocation missed by this worker's denylist still stops refresh"""
+        tokens = auth_service.login(user.email, PASSWORD)
+        UserRepository(test_client).revoke_tokens(user.id)
+
+        with pytest.raises(HTTPException) as exc_info:
+            auth_service.refresh(tokens.refresh_token)
+        assert exc_info.value.status_code == 401
+
+
+@pytest.mark.router
+@pytest.mark.security
+class TestTokenDependency:
+    """Test bearer authentication without the database"""
+
+    def test_me_reads_the_token(self):
+        """Case: a valid token is accepted, a missing or revoked one gets 401"""
+        client = TestClient(app)
+        user_id = uuid4()
+        token = get_token_signer().issue(user_id, 0)
+
+        response = client.get("/auth/me", headers={"Authorization": f"Bearer {token}"})
+        assert response.status_code == 200
+        assert response.json()["user_id"] == str(user_id)
+
+        assert client.get("/auth/me").status_code == 401
+        get_revocation_list().revoke(user_id, 1)
+        response = client.get("/auth/me", headers={"Authorization": f"Bearer {token}"})
+        assert response.status_code == 401
+        assert response.headers["WWW-Authenticate"] == "Bearer"
+
+
+@pytest.mark.router
+@pytest.mark.security
+class TestAuthEndpoints:
+    """Test the /auth routes in both DB_MODEs"""
+
+    def test_login_refresh_logout(self, api_client):
+        """Case: a registered user logs in, refreshes, and logs out everywhere"""
+        payload = {"email": "endpoint@mail.com", "password": PASSWORD}
+        assert api_client.post("/users/", json=payload).status_code == 200
+
+        response = api_client.post("/auth/login", json=payload)
+        assert response.status_code == 200
+        tokens = response.json()
+        headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+        assert api_client.get("/auth/me", headers=headers).status_code == 200
+
+        refresh = {"refresh_token": tokens["refresh_token"]}
+        assert api_client.post("/auth/refresh", json=refresh).status_code == 200
+        assert api_client.post("/auth/logout", headers=headers).status_code == 204
+        assert api_client.post("/auth/refresh", json=refresh).status_code == 401
+        assert api_client.get("/auth/me", headers=headers).status_code == 401
+
+    def test_routes_match_the_db_mode(self, api_client, db_mode):
+        """Case: DB_MODE=async serves /auth from the async router"""
+        expected = {"sync": "app.routers.auth", "async": "app.routers.async_auth"}
+        modules = {
+            route.path: route.endpoint.__module__
+            for route in api_client.app.routes
+            if getattr(route, "path", "").startswith("/auth")
+            and route.path != "/auth/me"
+        }
+
+        assert modules == dict.fromkeys(
+            ["/auth/login", "/auth/refresh", "/auth/logout"], expected[db_mode]
+        )
@@ -0,0 +1,309 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from uuid import UUID, uuid4
+
+import pytest
+
+from app.core.batching import AsyncBatchLoader, BatchLoader, BatchWriter
+from app.db.unit_of_work import UnitOfWork
+from app.respositories.user_repository import (
+    UserRepository,
+    load_users,
+    loader_group,
+)
+from tests.batching import group_busy
+
+
+def recording_batch_fn(calls: list):
+    def batch_fn(group, keys):
+        calls.append((group, list(keys)))
+        return {key: key * 10 for key in keys if key >= 0}
+
+    return batch_fn
+
+
+def load_together(loader: BatchLoader, keys: list, group=None) -> list:
+    """Load keys from one thread each, all released at once."""
+    barrier = threading.Barrier(len(keys))
+
+    def load(key):
+        barrier.wait()
+        return loader.load(key, group)
+
+    with ThreadPoolExecutor(max_workers=len(keys)) as pool:
+        return list(pool.map(load, keys))
+
+
+@pytest.fixture
+def users(test_client):
+    rows = [
+        {
+            "id": uuid4(),
+            "email": f"batch{i}@mail.com",
+            "full_name": f"Batch User {i}",
+            "is_active": True,
+            "hashed_password": "not-a-hash",
+        }
+        for i in range(3)
+    ]
+    UserRepository(test_client).insert_many(rows)
+    return rows
+
+
+@pytest.mark.unit
+class TestBatchLoader:
+    """Test coalescing of concurrent point lookups"""
+
+    def test_concurrent_loads_share_one_batch(self):
+        """Case: keys asked for within the window are fetched together"""
+        calls = []
+        loader = BatchLoader(recording_batch_fn(calls), window_seconds=0.05)
+
+        with group_busy(loader, lambda: loader.load(0), {}):
+            results = load_together(loader, [1, 2, 3, -1])
+
+        assert results == [10, 20, 30, None]
+        assert len(calls) == 1
+        assert sorted(calls[0][1]) == [-1, 1, 2, 3]
+
+    def test_in_flight_keys_are_deduplicated(self):
+        """Case: callers of the same key share one result"""
+        calls = []
+        loader = BatchLoader(recording_batch_fn(calls), window_seconds=0.05)
+
+        with group_busy(loader, lambda: loader.load(0), {}):
+            assert load_together(loader, [7] * 6) == [70] * 6
+        assert calls == [(None, [7])]
+        assert loader.stats()["coalesced"] == 5
+        assert loader.stats()["queries_saved"] == 5
+
+    def test_groups_are_batched_apart(self):
+        """Case: keys of different groups never share a batch"""
+        calls = []
+        loader = BatchLoader(recording_batch_fn(calls), window_seconds=0.05)
+        barrier = threading.Barrier(2)
+
+        def load(group):
+            barrier.wait()
+            return loader.load(1, group)
+
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            assert list(pool.map(load, ["a", "b"])) == [10, 10]
+        assert sorted(group for group, _ in calls) == ["a", "b"]
+
+    def test_full_batch_runs_without_waiting(self):
+        """Case: max_batch keys close the batch before the window ends"""
+        calls = []
+        loader = BatchLoader(recording_batch_fn(calls), window_seconds=10, max_batch=2)
+
+        with group_busy(loader, lambda: loader.load(0), {}):
+            assert load_together(loader, [1, 2]) == [10, 20]
+        assert len(calls) == 1
+
+    def test_lone_load_does_not_wait(self):
+        """Case: with no batch of the group running, a load skips the window"""
+        loader = BatchLoader(recording_batch_fn([]), window_seconds=10)
+
+        started = time.perf_counter()
+        assert loader.load(1) == 10
+        assert loader.load(2, "other") == 20
+        assert time.perf_counter() - started < 1
+
+    def test_errors_reach_every_caller(self):
+        """Case: a failed batch raises in each caller, later loads retry"""
+
+        def failing(group, keys):
+            raise RuntimeError("database down")
+
+        loader = BatchLoader(failing, window_seconds=0.05)
+        with pytest.raises(RuntimeError, match="database down"):
+            load_together(loader, [1, 2])
+
+        loader.batch_fn = recording_batch_fn([])
+        assert loader.load(1) == 10
+
+
+@pytest.mark.unit
+class TestBatchWriter:
+    """Test group commit of concurrent writes"""
+
+    def test_each_item_gets_its_own_result(self):
+        """Case: equal items are written once each, in one batch"""
+        calls = []
+
+        def batch_fn(group, items):
+            calls.append(list(items))
+            return [f"row-{i}" for i in range(len(items))]
+
+        writer = BatchWriter(batch_fn, window_seconds=0.05)
+        barrier = threading.Barrier(4)
+
+        def submit(item):
+            barrier.wait()
+            return writer.submit(item)
+
+        with group_busy(writer, lambda: writer.submit("held"), ["held"]):
+            with ThreadPoolExecutor(max_workers=4) as pool:
+                results = list(pool.map(submit, ["a", "a", "b", "c"]))
+
+        assert len(calls) == 1
+        assert sorted(calls[0]) == ["a", "a", "b", "c"]
+        assert sorted(results) == ["row-0", "row-1", "row-2", "row-3"]
+        assert writer.stats()["transactions_saved"] == 3
+
+    def test_item_errors_reach_their_caller_only(self):
+        """Case: an exception result is raised to its caller, not the batch"""
+
+        def batch_fn(group, items):
+            return [ValueError(item) if item == "bad" else item for item in items]
+
+        writer = BatchWriter(batch_fn, window_seconds=0.05)
+        barrier = threading.Barrier(3)
+
+        def submit(item):
+            barrier.wait()
+            try:
+                return writer.submit(item)
+            except ValueError:
+                return "error"
+
+        with group_busy(writer, lambda: writer.submit("held"), ["held"]):
+            with ThreadPoolExecutor(max_workers=3) as pool:
+                results = list(pool.map(submit, ["a", "bad", "b"]))
+
+        assert results == ["a", "error", "b"]
+        # The held batch, then one for the three items
+        assert writer.stats()["batches"] == 2
+
+
+@pytest.mark.unit
+class TestAsyncBatchLoader:
+    """Test coalescing on the event loop"""
+
+    async def test_concurrent_loads_share_one_batch(self):
+        """Case: concurrent and repeated keys cost one batch call"""
+        calls = []
+
+        async def batch_fn(group, keys):
+            calls.append(list(keys))
+            return {key: key * 10 for key in keys}
+
+        loader = AsyncBatchLoader(batch_fn, window_seconds=0.01)
+        results = await asyncio.gather(*(loader.load(key) for key in [1, 2, 1, 3]))
+
+        assert results == [10, 20, 10, 30]
+        assert calls == [[1, 2, 3]]
+        assert loader.stats()["coalesced"] == 1
+
+    async def test_window_only_while_a_batch_runs(self):
+        """Case: a lone load skips the window, loads behind a running batch wait"""
+        release = asyncio.Event()
+        calls = []
+
+        async def batch_fn(group, keys):
+            calls.append(list(keys))
+            if 0 in keys:
+                await release.wait()
+            return {key: key * 10 for key in keys}
+
+        loader = AsyncBatchLoader(batch_fn, window_seconds=0.05)
+        started = time.perf_counter()
+        assert await loader.load(1) == 10
+        assert time.perf_counter() - started < 0.05
+
+        held = asyncio.ensure_future(loader.load(0))
+        while len(calls) < 2:
+            await asyncio.sleep(0)
+        # Only the loader references the running batch's task
+        assert len(loader._tasks) == 1
+        later = [asyncio.ensure_future(loader.load(key)) for key in (2, 3)]
+        await asyncio.sleep(0.01)
+        assert calls == [[1], [0]]
+
+        assert await asyncio.gather(*later) == [20, 30]
+        assert calls == [[1], [0], [2, 3]]
+        release.set()
+        assert await held == 0
+        await asyncio.sleep(0)
+        assert not loader._tasks
+
+
+@pytest.mark.integration
+class TestUserLoader:
+    """Test batched user lookups by id"""
+
+    def test_get_many(self, test_client, users):
+        """Case: one query returns the existing users among the ids"""
+        ids = [row["id"] for row in users] + [uuid4()]
+
+        found = UserRepository(test_client).get_many(ids)
+
+        assert {user.id for user in found} == {row["id"] for row in users}
+
+    def test_concurrent_get_by_id_is_one_query(self, test_client, users):
+        """Case: concurrent lookups through the loader run as one batch"""
+        loader = BatchLoader(load_users, window_seconds=0.05)
+        repo = UserRepository(test_client, loader=loader)
+        ids = [row["id"] for row in users] + [users[0]["id"], uuid4()]
+        barrier = threading.Barrier(len(ids))
+
+        def get(user_id):
+            barrier.wait()
+            return repo.get_by_id(user_id)
+
+        busy = group_busy(
+            loader, lambda: loader.load(uuid4(), loader_group(test_client)), {}
+        )
+        with busy, ThreadPoolExecutor(max_workers=len(ids)) as pool:
+            found = list(pool.map(get, ids))
+
+        assert [user.email if user else None for user in found] == [
+            "batch0@mail.com",
+            "batch1@mail.com",
+            "batch2@mail.com",
+            "batch0@mail.com",
+            None,
+        ]
+        # Callers of the same id still get instances of their own
+        assert found[0] is not found[3]
+        # The held batch, then one for the five lookups
+        assert loader.stats()["batches"] == 2
+
+    def test_unit_of_work_reads_its_writes(self, test_client, users):
+        """Case: after a write, lookups bypass the loader and its batches"""
+        loader = BatchLoader(load_users, window_seconds=0)
+        with UnitOfWork(test_client) as uow:
+            repo = UserRepository(uow, loader=loader)
+            assert repo.get_by_id(users[0]["id"]) is not None
+            repo.patch(users[0]["id"], {"full_name": "Written In Uow"})
+
+            assert repo.get_by_id(users[0]["id"]).full_name == "Written In Uow"
+        assert loader.stats()["loads"] == 1
+
+
+@pytest.mark.integration
+class TestBatchEndpoint:
+    """Test GET /users?ids="""
+
+    def test_users_in_requested_order(self, api_client, users):
+        """Case: found users come back in request order, unknown ids omitted"""
+        ids = [users[2]["id"], uuid4(), users[0]["id"], users[2]["id"]]
+
+        response = api_client.get("/users/", params={"ids": ",".join(map(str, ids))})
+
+        assert response.status_code == 200
+        assert [user["email"] for user in response.json()] == [
+            "batch2@mail.com",
+            "batch0@mail.com",
+        ]
+        assert "hashed_password" not in response.json()[0]
+
+    @pytest.mark.parametrize(
+        "ids", ["not-a-uuid", "", ",".join(str(UUID(int=i)) for i in range(101))]
+    )
+    def test_invalid_ids(self, api_client, ids):
+        """Case: malformed ids and oversized batches are rejected"""
+        response = api_client.get("/users/", params={"ids": ids})
+        assert response.status_code == 400
@@ -0,0 +1,125 @@
+from uuid import uuid4
+
+import pytest
+
+from app.config.settings import get_settings
+from app.core.hashing import get_password_hasher
+from app.respositories.user_repository import UserRepository
+from app.services.user_service import (
+    apply_insert_results,
+    summarize_bulk_results,
+    validate_bulk_items,
+)
+
+
+@pytest.mark.service
+class TestBulkValidation:
+    """Test single-pass validation of bulk registration payloads"""
+
+    def test_invalid_and_duplicate_items(self):
+        """Case: invalid items and repeated emails are resolved up front"""
+        items = [
+            {"email": "first@mail.com", "password": "pass-0001"},
+            {"email": "testuser", "password": "pass-0001"},
+            {"email": "first@mail.com", "password": "pass-0002"},
+            "not an object",
+            {"email": "second@mail.com", "password": "pass-0003"},
+        ]
+
+        results, candidates = validate_bulk_items(items)
+
+        assert [index for index, _ in candidates] == [0, 4]
+        assert results[0] is None and results[4] is None
+        assert results[1].status == "invalid" and results[1].email == "testuser"
+        assert results[2].status == "duplicate"
+        assert results[3].status == "invalid" and results[3].email is None
+
+    def test_errors_do_not_echo_passwords(self):
+        """Case: validation errors never include the submitted input"""
+        results, _ = validate_bulk_items([{"email": "x@mail.com", "password": "p4ss"}])
+
+        assert "p4ss" not in str(results[0].errors)
+
+    def test_insert_results_mark_created_and_raced_duplicates(self):
+        """Case: rows skipped by ON CONFLICT are reported as duplicates"""
+        items = [
+            {"email": "first@mail.com", "password": "pass-0001"},
+            {"email": "second@mail.com", "password": "pass-0002"},
+        ]
+        results, candidates = validate_bulk_items(items)
+        user_id = uuid4()
+
+        apply_insert_results(results, candidates, [(user_id, "first@mail.com")])
+        summary = summarize_bulk_results(results)
+
+        assert summary.created == 1
+        assert summary.duplicates == 1
+        assert summary.results[0].id == user_id
+        assert summary.results[1].status == "duplicate"
+
+
+@pytest.mark.router
+@pytest.mark.integration
+class TestBulkEndpoint:
+    """Test POST /users/bulk against the users table"""
+
+    def test_mixed_items(self, api_client, test_client):
+        """Case: valid items are created, the others reported per item"""
+        UserRepository(test_client).insert_many(
+            [
+                {
+                    "id": uuid4(),
+                    "email": "bulk-taken@mail.com",
+                    "full_name": None,
+                    "is_active": True,
+                    "hashed_password": "not-a-hash",
+                }
+            ]
+        )
+        items = [
+            {"email": "bulk-first@mail.com", "password": "pass-0001"},
+            {"email": "testuser", "password": "pass-0001"},
+            {"email": "bulk-first@mail.com", "password": "pass-0002"},
+            {"email": "bulk-taken@mail.com", "password": "pass-0003"},
+            {"email": "bulk-second@mail.com", "password": "pass-0004"},
+        ]
+
+        response = api_client.post("/users/bulk", json=items)
+
+        assert response.status_code == 200
+        body = response.json()
+        assert (body["created"], body["duplicates"], body["invalid"]) == (2, 2, 1)
+        assert [result["status"] for result in body["results"]] == [
+            "created",
+            "invalid",
+            "duplicate",
+            "duplicate",
+            "created",
+        ]
+        created = api_client.get(f"/users/{body['results'][4]['id']}")
+        assert created.json()["email"] == "bulk-second@mail.com"
+
+    def test_too_many_items(self, api_client, test_client, monkeypatch):
+        """Case: a body over bulk_max_items is refused before any work"""
+        monkeypatch.setattr(get_settings(), "bulk_max_items", 2)
+        items = [
+            {"email": f"bulk-{index}@mail.com", "password": "pass-0001"}
+            for index in range(3)
+        ]
+
+        response = api_client.post("/users/bulk", json=items)
+
+        assert response.status_code == 413
+        emails = [item["email"] for item in items]
+        assert not UserRepository(test_client).existing_emails(emails)
+
+    def test_hashing_saturated(self, api_client, monkeypatch):
+        """Case: no free hashing slot answers 503 with Retry-After"""
+        monkeypatch.setattr(get_password_hasher(), "max_pending", 0)
+
+        response = api_client.post(
+            "/users/bulk", json=[{"email": "bulk@mail.com", "password": "pass-0001"}]
+        )
+
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "1"
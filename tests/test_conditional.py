@@ -0,0 +1,116 @@
+from datetime import timedelta
+from uuid import uuid4
+
+import pytest
+
+from app.core.conditional import etag_matches
+from app.respositories.user_repository import UserRepository
+
+
+@pytest.fixture
+def users(test_client):
+    repo = UserRepository(test_client)
+    repo.insert_many(
+        [
+            {
+                "id": uuid4(),
+                "email": f"etag-{index}@mail.com",
+                "full_name": f"Etag User {index}",
+                "is_active": True,
+                "hashed_password": "not-a-hash",
+            }
+            for index in range(3)
+        ]
+    )
+    return repo.list(limit=3)
+
+
+@pytest.mark.unit
+class TestEtagMatching:
+    """Test If-None-Match comparison"""
+
+    @pytest.mark.parametrize(
+        "header, matches",
+        [
+            ('W/"abc"', True),
+            ('"abc"', True),
+            ('W/"other", W/"abc"', True),
+            ("*", True),
+            ('W/"other"', False),
+            ("", False),
+            (None, False),
+        ],
+    )
+    def test_weak_comparison(self, header, matches):
+        """Case: tags match ignoring W/, in lists and with *"""
+        assert etag_matches(header, 'W/"abc"') is matches
+
+
+@pytest.mark.router
+@pytest.mark.integration
+class TestConditionalList:
+    """Test ETags on GET /users/"""
+
+    def test_unchanged_page_is_not_modified(self, api_client, users):
+        """Case: the same ETag answers 304 with the validators and next link"""
+        response = api_client.get("/users/?limit=2")
+        etag = response.headers["ETag"]
+        assert response.status_code == 200
+        assert etag.startswith('W/"')
+        assert "Last-Modified" in response.headers
+
+        again = api_client.get("/users/?limit=2", headers={"If-None-Match": etag})
+        assert again.status_code == 304
+        assert again.content == b""
+        assert again.headers["ETag"] == etag
+        assert again.headers["X-Next-Cursor"] == response.headers["X-Next-Cursor"]
+
+    def test_writes_change_the_etag(self, api_client, test_client, users):
+        """Case: updating or deleting a row of the page gives a new ETag"""
+        repo = UserRepository(test_client)
+        etag = api_client.get("/users/?limit=2").headers["ETag"]
+
+        # The test's writes share one transaction, hence one now()
+        later = users[1].create_at + timedelta(seconds=1)
+        repo.update(users[1], full_name="Renamed User", update_at=later)
+        response = api_client.get("/users/?limit=2", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.json()[1]["full_name"] == "Renamed User"
+
+        etag = response.headers["ETag"]
+        repo.delete(users[0])
+        response = api_client.get("/users/?limit=2", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert [user["email"] for user in response.json()] == [
+            users[1].email,
+            users[2].email,
+        ]
+
+    def test_page_version_matches_page(self, test_client, users):
+        """Case: the index-only version equals the one computed with the rows"""
+        repo = UserRepository(test_client)
+        for limit, offset in ((2, 0), (2, 2), (2, 10)):
+            _, version = repo.list_page(limit=limit, offset=offset)
+            assert repo.page_version(limit=limit, offset=offset) == version
+
+
+@pytest.mark.router
+@pytest.mark.integration
+class TestGetUser:
+    """Test GET /users/{id}"""
+
+    def test_get_user_and_revalidate(self, api_client, users):
+        """Case: a user is returned with an ETag that later answers 304"""
+        response = api_client.get(f"/users/{users[0].id}")
+        assert response.status_code == 200
+        assert response.json()["email"] == users[0].email
+
+        again = api_client.get(
+            f"/users/{users[0].id}",
+            headers={"If-None-Match": response.headers["ETag"]},
+        )
+        assert again.status_code == 304
+
+    def test_unknown_user(self, api_client, setup_test_db):
+        """Case: an unknown id is a 404"""
+        assert api_client.get(f"/users/{uuid4()}").status_code == 404
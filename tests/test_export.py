@@ -0,0 +1,44 @@
+import csv
+import io
+import json
+from datetime import datetime, timezone
+from uuid import uuid4
+
+import pytest
+
+from app.core.export import EXPORT_FIELDS, encode_csv, encode_ndjson
+
+ROWS = [
+    (uuid4(), "first@mail.com", "First user", True, datetime.now(timezone.utc)),
+    (uuid4(), "second@mail.com", None, False, datetime.now(timezone.utc)),
+]
+
+
+@pytest.mark.unit
+class TestExportEncoding:
+    """Test chunk encoders of the streaming export"""
+
+    def test_ndjson_one_object_per_line(self):
+        """Case: each row becomes one JSON object on its own line"""
+        lines = encode_ndjson(ROWS).decode("utf-8").splitlines()
+
+        assert len(lines) == 2
+        first = json.loads(lines[0])
+        assert list(first) == list(EXPORT_FIELDS)
+        assert first["id"] == str(ROWS[0][0])
+        assert json.loads(lines[1])["full_name"] is None
+
+    def test_csv_header_only_on_request(self):
+        """Case: the header is written once, data chunks have none"""
+        header = encode_csv([], header=True).decode("utf-8")
+        body = encode_csv(ROWS).decode("utf-8")
+
+        records = list(csv.reader(io.StringIO(header + body)))
+        assert records[0] == list(EXPORT_FIELDS)
+        assert records[1][1] == "first@mail.com"
+        assert len(records) == 3
+
+    def test_empty_batch(self):
+        """Case: an empty batch encodes to nothing"""
+        assert encode_ndjson([]) == b""
+        assert encode_csv([]) == b""
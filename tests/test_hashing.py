@@ -0,0 +1,109 @@
+import pytest
+
+from app.core.hashing import HashingSaturatedError, PasswordHasher
+from app.core.security import get_hash_password, verify_password
+
+
+@pytest.fixture
+def hasher():
+    hasher = PasswordHasher(max_workers=1, max_pending=4, rounds=4)
+    yield hasher
+    hasher.shutdown()
+
+
+@pytest.mark.security
+class TestPasswordHasher:
+    """Test the process-pool backed password hasher"""
+
+    def test_hash_and_verify(self, hasher):
+        """Case: hash in the pool, verify both in the pool and inline"""
+        hashed = hasher.hash("pass-0001")
+
+        assert hashed.startswith("$2b$04$")
+        assert hasher.verify("pass-0001", hashed)
+        assert not hasher.verify("wrong-pass", hashed)
+        assert verify_password("pass-0001", hashed)
+
+    async def test_hash_async(self, hasher):
+        """Case: awaiting a hash does not need a threadpool thread"""
+        hashed = await hasher.hash_async("pass-0001")
+
+        assert await hasher.verify_async("pass-0001", hashed)
+
+    def test_rejects_when_saturated(self):
+        """Case: jobs over max_pending are rejected immediately"""
+        hasher = PasswordHasher(max_workers=1, max_pending=1, rounds=10)
+        try:
+            future = hasher.submit_hash("pass-0001")
+            with pytest.raises(HashingSaturatedError):
+                hasher.submit_hash("pass-0002")
+            future.result()
+            assert hasher.stats()["rejected"] == 1
+        finally:
+            hasher.shutdown()
+
+    def test_failed_submit_releases_its_slot(self):
+        """Case: a pool that cannot take jobs does not leak pending slots"""
+        hasher = PasswordHasher(max_workers=1, max_pending=1, rounds=4)
+        try:
+            hasher.start()
+            hasher._executor.shutdown()
+            for _ in range(2):
+                with pytest.raises(RuntimeError):
+                    hasher.submit_hash("pass-0001")
+            assert hasher.stats()["pending"] == 0
+            assert hasher.stats()["rejected"] == 0
+        finally:
+            hasher.shutdown()
+
+    def test_hash_many_admits_each_password(self, hasher, monkeypatch):
+        """Case: a batch larger than max_pending never holds more than half of it"""
+        start, peak = hasher._start, []
+
+        def tracking_start(job, *args):
+            peak.append(hasher.stats()["pending"])
+            return start(job, *args)
+
+        monkeypatch.setattr(hasher, "_start", tracking_start)
+        passwords = [f"pass-{index:04}" for index in range(10)]
+
+        hashed = hasher.hash_many(passwords)
+
+        assert len(hashed) == len(passwords)
+        assert all(map(verify_password, passwords, hashed))
+        assert max(peak) <= hasher.max_pending // 2
+        assert hasher.stats()["pending"] == 0
+        assert hasher.stats()["rejected"] == 0
+
+    def test_hash_many_rejected_when_saturated(self):
+        """Case: a batch that cannot get a single slot is rejected"""
+        hasher = PasswordHasher(max_workers=1, max_pending=1, rounds=10)
+        try:
+            future = hasher.submit_hash("pass-0001")
+            with pytest.raises(HashingSaturatedError):
+                hasher.hash_many(["pass-0002", "pass-0003"])
+            future.result()
+            assert hasher.stats()["pending"] == 0
+        finally:
+            hasher.shutdown()
+
+    def test_stats_split_queue_wait_and_hash_time(self, hasher):
+        """Case: completed jobs report queue wait and hash time separately"""
+        hasher.hash("pass-0001")
+        stats = hasher.stats()
+
+        assert stats["completed"] == 1
+        assert stats["pending"] == 0
+        assert stats["hash_ms_avg"] > 0
+        assert stats["queue_wait_ms_avg"] >= 0
+
+    def test_calibrate_respects_bounds(self, hasher):
+        """Case: calibrated cost never drops below min_rounds"""
+        assert hasher.calibrate(target_ms=0.001, min_rounds=4) == 4
+        assert 4 <= hasher.calibrate(target_ms=50, min_rounds=4) <= 16
+
+
+@pytest.mark.security
+def test_get_hash_password_rounds():
+    """Case: explicit bcrypt cost is encoded in the hash"""
+    assert get_hash_password("pass-0001", rounds=5).startswith("$2b$05$")
@@ -0,0 +1,76 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+
+from app.core.metrics import InstrumentedRoute, route_label, server_timing
+from app.core.middleware import MetricsMiddleware
+from app.db.instrumentation import statement_operation
+
+
+def sample(name: str, **labels) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.router.route_class = InstrumentedRoute
+    app.add_middleware(MetricsMiddleware)
+
+    @app.get("/items/{item_id}")
+    def read_item(item_id: int, verbose: bool = False) -> dict:
+        return {"item_id": item_id, "verbose": verbose}
+
+    return TestClient(app)
+
+
+@pytest.mark.unit
+class TestMetricHelpers:
+    """Test label and header helpers"""
+
+    def test_statement_operation(self):
+        """Case: statements are labelled by keyword, others as OTHER"""
+        assert statement_operation("  select 1") == "SELECT"
+        assert statement_operation("INSERT INTO user VALUES (1)") == "INSERT"
+        assert statement_operation("BEGIN") == "OTHER"
+
+    def test_route_label(self):
+        """Case: unmatched requests share one label"""
+        assert route_label({"path": "/missing"}) == "unmatched"
+
+    def test_server_timing(self):
+        """Case: durations are reported in milliseconds"""
+        header = server_timing(0.5, 0.002, 3, 0.001)
+
+        assert (
+            header == 'db;dur=2.00;desc="statements: 3", queue;dur=1.00, app;dur=500.00'
+        )
+
+
+@pytest.mark.router
+class TestMetricsMiddleware:
+    """Test request metrics on a minimal app"""
+
+    def test_latency_recorded_by_route_template(self, client):
+        """Case: requests are counted under the route template and status"""
+        labels = {"method": "GET", "route": "/items/{item_id}", "status": "200"}
+        before = sample("http_request_duration_seconds_count", **labels)
+        queued = sample("threadpool_queue_wait_seconds_count")
+
+        response = client.get("/items/1?verbose=true")
+        client.get("/items/2")
+
+        assert response.json() == {"item_id": 1, "verbose": True}
+        assert "queue;dur=" in response.headers["Server-Timing"]
+        assert sample("http_request_duration_seconds_count", **labels) == before + 2
+        assert sample("threadpool_queue_wait_seconds_count") == queued + 2
+
+    def test_sync_endpoint_keeps_its_signature(self, client):
+        """Case: the wrapped endpoint still validates parameters"""
+        assert client.get("/items/not-a-number").status_code == 422
+        operation = client.app.openapi()["paths"]["/items/{item_id}"]["get"]
+        assert [param["name"] for param in operation["parameters"]] == [
+            "item_id",
+            "verbose",
+        ]
@@ -0,0 +1,187 @@
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import func, text
+from sqlmodel import select
+
+from app.core.pagination import (
+    CountCache,
+    decode_cursor,
+    encode_cursor,
+    get_count_cache,
+    next_cursor,
+)
+from app.db.unit_of_work import UnitOfWork
+from app.models.user import User
+from app.respositories import async_user_repository, user_repository
+from app.respositories.user_repository import UserRepository
+
+
+@pytest.mark.unit
+class TestCursor:
+    """Test opaque keyset cursors"""
+
+    def test_roundtrip(self):
+        """Case: a cursor decodes back to its (create_at, id) keyset"""
+        create_at = datetime(2025, 12, 6, 16, 18, 40, 621344, tzinfo=timezone.utc)
+        user_id = uuid4()
+
+        cursor = encode_cursor(create_at, user_id)
+
+        assert "=" not in cursor
+        assert decode_cursor(cursor) == (create_at, user_id)
+
+    @pytest.mark.parametrize("cursor", ["", "not-a-cursor", "bm8tc2VwYXJhdG9y"])
+    def test_invalid_cursor(self, cursor):
+        """Case: malformed cursors raise ValueError"""
+        with pytest.raises(ValueError):
+            decode_cursor(cursor)
+
+    def test_next_cursor_only_on_full_pages(self):
+        """Case: a short page is the last page"""
+        rows = [
+            SimpleNamespace(create_at=datetime.now(timezone.utc), id=uuid4())
+            for _ in range(3)
+        ]
+
+        assert next_cursor(rows, limit=4) is None
+        assert decode_cursor(next_cursor(rows, limit=3)) == (
+            rows[-1].create_at,
+            rows[-1].id,
+        )
+
+
+@pytest.mark.unit
+def test_count_cache_reuses_value_within_ttl():
+    """Case: count is computed once per TTL window"""
+    calls = []
+    cache = CountCache(ttl_seconds=60)
+
+    def compute():
+        calls.append(1)
+        return 42
+
+    assert cache.get_or_compute("db", compute) == 42
+    assert cache.get_or_compute("db", compute) == 42
+    assert len(calls) == 1
+    assert CountCache(ttl_seconds=0).get("db") is None
+
+
+@pytest.mark.unit
+def test_count_cache_invalidation():
+    """Case: a write drops the count, and a count computed across it is not kept"""
+    cache = CountCache(ttl_seconds=60)
+    cache.set("db", 42)
+
+    cache.invalidate("db")
+    assert cache.get("db") is None
+
+    def compute_during_write():
+        cache.invalidate("db")
+        return 42
+
+    assert cache.get_or_compute("db", compute_during_write) == 42
+    assert cache.get("db") is None
+
+
+@pytest.mark.unit
+async def test_count_cache_async_compute():
+    """Case: the coroutine path caches like get_or_compute, and skips counts
+    that raced a write"""
+    cache = CountCache(ttl_seconds=60)
+
+    async def compute_during_write():
+        cache.invalidate("db")
+        return 41
+
+    async def compute():
+        return 42
+
+    assert await cache.get_or_compute_async("db", compute_during_write) == 41
+    assert cache.get("db") is None
+    assert await cache.get_or_compute_async("db", compute) == 42
+    assert cache.get("db") == 42
+
+
+@pytest.mark.integration
+def test_count_invalidated_after_unit_of_work_commits(test_client):
+    """Case: a write in a unit of work drops the cached count on commit only"""
+    cache = get_count_cache()
+    cache.set(test_client.database_url, 42)
+    generation = cache.generation
+
+    with UnitOfWork(test_client) as uow:
+        UserRepository(uow).insert_many(
+            [
+                {
+                    "id": uuid4(),
+                    "email": "count-uow@mail.com",
+                    "full_name": None,
+                    "is_active": True,
+                    "hashed_password": "not-a-hash",
+                }
+            ]
+        )
+        assert cache.generation == generation
+        assert cache.get(test_client.database_url) == 42
+
+    assert cache.generation > generation
+    assert cache.get(test_client.database_url) is None
+
+
+@pytest.mark.router
+@pytest.mark.integration
+class TestTotalCount:
+    """Test X-Total-Count against the users table"""
+
+    def test_exact_total_follows_writes(self, api_client, test_client):
+        """Case: the exact total matches count(*) and includes a new sign-up"""
+        UserRepository(test_client).insert_many(
+            [
+                {
+                    "id": uuid4(),
+                    "email": f"total-{index}@mail.com",
+                    "full_name": f"Total User {index}",
+                    "is_active": True,
+                    "hashed_password": "not-a-hash",
+                }
+                for index in range(3)
+            ]
+        )
+        with test_client.get_session_context(read_only=True) as session:
+            expected = session.exec(select(func.count()).select_from(User)).one()
+
+        response = api_client.get("/users/?limit=1&total=exact")
+        assert response.status_code == 200
+        assert response.headers["X-Total-Count"] == str(expected)
+        assert response.headers["X-Total-Count-Estimated"] == "false"
+
+        created = api_client.post(
+            "/users/",
+            json={
+                "email": "total-new@mail.com",
+                "full_name": "Total New",
+                "password": "Password123!",
+            },
+        )
+        assert created.status_code == 200
+        response = api_client.get("/users/?limit=1&total=exact")
+        assert response.headers["X-Total-Count"] == str(expected + 1)
+
+    def test_estimate_is_omitted_before_analyze(self, api_client, monkeypatch):
+        """Case: reltuples of -1 leaves the header out instead of a count(*)"""
+        # reltuples stays -1 until the first ANALYZE (autovacuum may run one)
+        never_analyzed = text(
+            "SELECT -1::bigint FROM pg_class WHERE oid = to_regclass(:table_name)"
+        )
+        monkeypatch.setattr(user_repository, "ESTIMATED_COUNT_SQL", never_analyzed)
+        monkeypatch.setattr(
+            async_user_repository, "ESTIMATED_COUNT_SQL", never_analyzed
+        )
+
+        response = api_client.get("/users/?limit=1&total=estimate")
+        assert response.status_code == 200
+        assert "X-Total-Count" not in response.headers
+        assert "X-Total-Count-Estimated" not in response.headers
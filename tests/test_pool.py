@@ -0,0 +1,80 @@
+import pytest
+from sqlalchemy import exc, text
+
+from app.clients.pool import PoolConfig
+from app.clients.postgres_client import PostgresClient
+from app.config.settings import get_settings
+
+
+@pytest.fixture
+def make_client(setup_test_db):
+    clients = []
+
+    def _make(**pool) -> PostgresClient:
+        client = PostgresClient(
+            get_settings().test_database_url, pool=PoolConfig(**pool)
+        )
+        clients.append(client)
+        return client
+
+    yield _make
+    for client in clients:
+        client.close()
+
+
+def select_one(client: PostgresClient) -> None:
+    with client.engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+
+
+@pytest.mark.integration
+class TestPoolMonitor:
+    """Test connection pool settings and statistics"""
+
+    def test_reports_checkouts_and_overflow(self, make_client):
+        """Case: checked-out and overflow connections are visible while held"""
+        client = make_client(size=1, max_overflow=1)
+
+        with client.engine.connect(), client.engine.connect():
+            stats = client.pool_monitor.stats()
+            assert stats["checked_out"] == 2
+            assert stats["overflow"] == 1
+
+        stats = client.pool_monitor.stats()
+        assert stats["checked_out"] == 0
+        assert stats["checkouts"] == 2
+        assert stats["connects"] == 2
+        assert stats["checkout_wait_ms_max"] > 0
+
+    def test_counts_checkout_timeouts(self, make_client):
+        """Case: an exhausted pool times out and the timeout is counted"""
+        client = make_client(size=1, max_overflow=0, timeout=0.1)
+
+        with client.engine.connect():
+            with pytest.raises(exc.TimeoutError):
+                select_one(client)
+
+        assert client.pool_monitor.stats()["timeouts"] == 1
+
+    def test_idle_pre_ping_only_pings_idle_connections(self, make_client):
+        """Case: idle strategy pings reused connections past the idle limit"""
+        busy = make_client(size=1, pre_ping="idle", pre_ping_idle_seconds=60)
+        idle = make_client(size=1, pre_ping="idle", pre_ping_idle_seconds=0)
+
+        for client in (busy, idle):
+            select_one(client)
+            select_one(client)
+
+        assert busy.pool_monitor.stats()["pings"] == 0
+        assert idle.pool_monitor.stats()["pings"] == 1
+        assert idle.pool_monitor.stats()["connects"] == 1
+
+    def test_stats_survive_dispose(self, make_client):
+        """Case: counters keep going after the pool is recreated"""
+        client = make_client()
+        select_one(client)
+        client.engine.dispose()
+        select_one(client)
+
+        assert client.pool_monitor.stats()["checkouts"] == 2
+        assert client.pool_monitor.stats()["checkout_wait_ms_avg"] > 0
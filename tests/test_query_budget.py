@@ -0,0 +1,112 @@
+import logging
+
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+
+from app.config.settings import get_settings
+from app.core.middleware import DbStatsMiddleware
+from app.db.instrumentation import (
+    QueryBudgetExceededError,
+    normalize_sql,
+    parameter_shape,
+    track_request_db_stats,
+)
+from app.dependencies.db_dependencies import query_budget
+from app.respositories.user_repository import UserRepository
+
+
+@pytest.mark.unit
+class TestStatementDescription:
+    """Test how statements are described in logs"""
+
+    def test_normalize_collapses_values_and_lists(self):
+        """Case: batch size and literals do not change the normalized text"""
+        statement = (
+            'INSERT INTO "user" (id, email)\n VALUES (%(id_m0)s::UUID, %(email_m0)s),'
+            " (%(id_m1)s::UUID, %(email_m1)s)"
+        )
+
+        assert (
+            normalize_sql(statement)
+            == 'INSERT INTO "user" (id, email) VALUES (?...), ...'
+        )
+        assert (
+            normalize_sql(
+                "SELECT * FROM t WHERE a IN (%(a_1)s, %(a_2)s) AND b = 'x' LIMIT 10"
+            )
+            == "SELECT * FROM t WHERE a IN (?...) AND b = ? LIMIT ?"
+        )
+
+    def test_parameter_shape_hides_values(self):
+        """Case: only parameter names and types are reported"""
+        assert parameter_shape({"email_1": "secret@mail.com"}) == "{email_1: str}"
+        assert parameter_shape([{"id": 1}, {"id": 2}]) == "2 x {id: int}"
+        assert parameter_shape({f"p{i}": i for i in range(20)}) == "20 params: 20 int"
+
+
+@pytest.mark.integration
+class TestQueryBudget:
+    """Test per-request statement tracking"""
+
+    def test_budget_exceeded_fails_in_strict_mode(self, setup_test_db, test_client):
+        """Case: the statement over the budget raises"""
+        repo = UserRepository(test_client)
+
+        with pytest.raises(QueryBudgetExceededError, match="budget of 1"):
+            with track_request_db_stats(budget=1, strict=True):
+                repo.get_by_email("budget-1@mail.com")
+                repo.get_by_email("budget-2@mail.com")
+
+    def test_repeated_statement_logged_once(self, setup_test_db, test_client, caplog):
+        """Case: the same query run in a loop is reported as a possible N+1"""
+        repo = UserRepository(test_client)
+        threshold = get_settings().query_repeat_threshold
+
+        with caplog.at_level(logging.WARNING, logger="app.db.instrumentation"):
+            with track_request_db_stats(budget=0):
+                for i in range(threshold * 2):
+                    repo.get_by_email(f"repeat-{i}@mail.com")
+
+        messages = [r.getMessage() for r in caplog.records if "N+1" in r.getMessage()]
+        assert len(messages) == 1
+        assert "user_repository.py" in messages[0]
+        assert "get_by_email" in messages[0]
+
+    def test_slow_statement_logged_with_call_site(
+        self, setup_test_db, test_client, caplog, monkeypatch
+    ):
+        """Case: statements over SLOW_QUERY_MS are logged without values"""
+        monkeypatch.setattr(get_settings(), "slow_query_ms", 0.0)
+
+        with caplog.at_level(logging.WARNING, logger="app.db.instrumentation"):
+            UserRepository(test_client).get_by_email("slow@mail.com")
+
+        message = next(
+            r.getMessage() for r in caplog.records if "Slow statement" in r.getMessage()
+        )
+        assert "WHERE" in message and "{email_1: str}" in message
+        assert "slow@mail.com" not in message
+        assert "get_by_email" in message
+
+    def test_route_budget_fails_request(self, setup_test_db, test_client):
+        """Case: a path operation that exceeds its declared budget fails"""
+        app = FastAPI()
+        app.add_middleware(DbStatsMiddleware)
+
+        @app.get("/within", dependencies=[Depends(query_budget(2))])
+        def within() -> dict:
+            UserRepository(test_client).get_by_email("route-1@mail.com")
+            return {}
+
+        @app.get("/over", dependencies=[Depends(query_budget(1))])
+        def over() -> dict:
+            repo = UserRepository(test_client)
+            repo.get_by_email("route-1@mail.com")
+            repo.get_by_email("route-2@mail.com")
+            return {}
+
+        client = TestClient(app)
+        assert client.get("/within").status_code == 200
+        with pytest.raises(QueryBudgetExceededError):
+            client.get("/over")
@@ -0,0 +1,209 @@
+import socket
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from app.clients.async_postgres_client import AsyncPostgresClient
+from app.clients.postgres_client import PostgresClient
+from app.clients.replicas import Replica, ReplicaConfig, ReplicaSet, use_primary
+from app.config.settings import get_settings
+from app.db.unit_of_work import UnitOfWork
+from app.respositories.user_repository import UserRepository
+from app.schemas.user import UserCreate
+
+
+def fake_replica(name: str, checked_out: int = 0) -> Replica:
+    engine = SimpleNamespace(pool=SimpleNamespace(checkedout=lambda: checked_out))
+    return Replica(engine=engine, name=name)
+
+
+@pytest.fixture
+def replica_client():
+    client = PostgresClient(
+        get_settings().test_database_url,
+        replicas=ReplicaConfig(urls=[get_settings().test_database_url]),
+    )
+    # Measure now rather than waiting for the background probe
+    client.replicas.probe()
+    yield client
+    client.close()
+
+
+@pytest.mark.unit
+class TestReplicaSet:
+    """Test replica selection"""
+
+    def test_round_robin_skips_lagging_replicas(self):
+        """Case: healthy replicas take turns, lagging ones are skipped"""
+        replicas = [fake_replica("a"), fake_replica("b"), fake_replica("c")]
+        replica_set = ReplicaSet(replicas, ReplicaConfig(max_lag_seconds=1.0))
+        for replica, lag in zip(replicas, (0.0, 5.0, 0.5)):
+            replica_set.record_lag(replica, lag)
+
+        picks = [replica_set.choose().name for _ in range(4)]
+
+        assert picks == ["a", "c", "a", "c"]
+
+    def test_least_connections(self):
+        """Case: the replica with fewest checked-out connections wins"""
+        replicas = [fake_replica("busy", checked_out=4), fake_replica("idle")]
+        replica_set = ReplicaSet(replicas, ReplicaConfig(strategy="least_connections"))
+        for replica in replicas:
+            replica_set.record_lag(replica, 0.0)
+
+        assert replica_set.choose().name == "idle"
+
+    def test_no_healthy_replica(self):
+        """Case: unmeasured or unreachable replicas are never chosen"""
+        replicas = [fake_replica("unknown"), fake_replica("down")]
+        replica_set = ReplicaSet(replicas, ReplicaConfig())
+        replica_set.record_lag(replicas[1], None)
+
+        assert replica_set.choose() is None
+
+    def test_stale_measurement_is_not_trusted(self):
+        """Case: a replica whose probe stopped reporting is skipped"""
+        replica = fake_replica("stuck")
+        replica_set = ReplicaSet(
+            [replica],
+            ReplicaConfig(check_interval_seconds=0.01, probe_timeout_seconds=0.01),
+        )
+        replica_set.record_lag(replica, 0.0)
+        assert replica_set.choose() is replica
+
+        time.sleep(0.05)
+
+        assert replica_set.choose() is None
+
+    def test_due_claims_replicas_once_per_interval(self):
+        """Case: concurrent callers do not measure the same replica twice"""
+        replica_set = ReplicaSet(
+            [fake_replica("a")], ReplicaConfig(check_interval_seconds=60)
+        )
+
+        assert len(replica_set.due()) == 1
+        assert replica_set.due() == []
+
+
+@pytest.mark.integration
+class TestReplicaRouting:
+    """Test read routing of PostgresClient"""
+
+    def test_reads_use_replica_writes_use_primary(self, setup_test_db, replica_client):
+        """Case: read-only calls go to the replica, writes to the primary"""
+        replica = replica_client.replicas.replicas[0]
+        repo = UserRepository(replica_client)
+
+        repo.get_by_email("replica-read@mail.com")
+        repo.list_rows(limit=1)
+        assert replica.selected == 2
+        assert replica.lag_seconds == 0.0
+
+        primary_before = replica_client.pool_monitor.stats()["checkouts"]
+        repo.insert_many([])
+        with use_primary():
+            repo.get_by_email("replica-read@mail.com")
+        assert replica.selected == 2
+        assert replica_client.pool_monitor.stats()["checkouts"] > primary_before
+
+    def test_unit_of_work_reads_its_writes(
+        self, setup_test_db, replica_client, test_client
+    ):
+        """Case: after a write, the unit of work reads from its own session"""
+        replica = replica_client.replicas.replicas[0]
+        email = "replica-uow@mail.com"
+        with pytest.raises(RuntimeError):
+            with UnitOfWork(replica_client) as uow:
+                repo = UserRepository(uow)
+                assert repo.get_by_email(email) is None
+                assert replica.selected == 1
+
+                repo.register(UserCreate(email=email, password="pass-0001"), "hashed")
+                assert repo.get_by_email(email) is not None
+                assert replica.selected == 1
+                raise RuntimeError("roll back")
+
+        assert UserRepository(test_client).get_by_email(email) is None
+
+    def test_reads_do_not_wait_for_the_probe(self, setup_test_db, monkeypatch):
+        """Case: a slow lag probe runs in the background, reads go on"""
+        client = PostgresClient(
+            get_settings().test_database_url,
+            replicas=ReplicaConfig(urls=[get_settings().test_database_url]),
+        )
+        replica = client.replicas.replicas[0]
+        measure_lag = client.replicas.measure_lag
+
+        def slow_measure_lag(replica):
+            time.sleep(0.5)
+            return measure_lag(replica)
+
+        monkeypatch.setattr(client.replicas, "measure_lag", slow_measure_lag)
+        try:
+            started = time.perf_counter()
+            assert client.read_engine() is client.engine
+            assert time.perf_counter() - started < 0.25
+
+            deadline = time.monotonic() + 5
+            while replica.lag_seconds is None and time.monotonic() < deadline:
+                time.sleep(0.05)
+            assert client.read_engine() is replica.engine
+        finally:
+            client.close()
+
+    async def test_async_reads_do_not_measure(self, setup_test_db):
+        """Case: the async client only reads the background measurements"""
+        client = AsyncPostgresClient(
+            get_settings().test_database_url,
+            replicas=ReplicaConfig(
+                urls=[get_settings().test_database_url], check_interval_seconds=60
+            ),
+        )
+        replica = client.replicas.replicas[0]
+        # Claimed here: the background probe finds nothing due
+        client.replicas.due()
+        try:
+            assert await client.read_engine() is client.engine
+            client.replicas.record_lag(replica, 0.0)
+            assert await client.read_engine() is replica.engine
+        finally:
+            await client.close()
+
+    def test_probe_is_bounded_by_its_timeout(self, setup_test_db):
+        """Case: a replica that does not answer is given up on in time"""
+        # Accepts TCP connections and never answers the startup message
+        with socket.create_server(("127.0.0.1", 0)) as silent:
+            port = silent.getsockname()[1]
+            replica_set = ReplicaSet(
+                [
+                    Replica(
+                        engine=None,
+                        name="silent",
+                        url=f"postgresql+psycopg://postgres@127.0.0.1:{port}/db",
+                    )
+                ],
+                ReplicaConfig(probe_timeout_seconds=0.5),
+            )
+            started = time.perf_counter()
+            try:
+                replica_set.probe()
+            finally:
+                replica_set.stop_probing()
+
+        assert 0.5 < time.perf_counter() - started < 5
+        assert replica_set.replicas[0].lag_seconds is None
+
+    def test_unreachable_replica_falls_back_to_primary(self, setup_test_db):
+        """Case: reads still work when no replica can be reached"""
+        client = PostgresClient(
+            get_settings().test_database_url,
+            replicas=ReplicaConfig(
+                urls=["postgresql+psycopg://postgres@/nowhere?host=/nonexistent"]
+            ),
+        )
+        try:
+            assert UserRepository(client).get_by_email("fallback@mail.com") is None
+            assert client.replicas.replicas[0].lag_seconds is None
+        finally:
+            client.close()
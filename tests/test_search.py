@@ -0,0 +1,121 @@
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import text
+
+from app.core.pagination import decode_search_cursor, encode_search_cursor
+from app.respositories.user_repository import UserRepository, search_statement
+
+NAMES = {
+    "ann@mail.com": "Ann Marsh",
+    "anna.smith@mail.com": "Anna Smith",
+    "joe@annex.io": "Joe Brown",
+    "zed@mail.com": "Hannah Annwood",
+    "bob@mail.com": "Bob Stone",
+    "an_x@mail.com": "Under Score",
+}
+
+
+@pytest.fixture
+def repo(test_client):
+    repo = UserRepository(test_client)
+    repo.insert_many(
+        [
+            {
+                "id": uuid4(),
+                "email": email,
+                "full_name": full_name,
+                "is_active": True,
+                "hashed_password": "not-a-hash",
+            }
+            for email, full_name in NAMES.items()
+        ]
+    )
+    return repo
+
+
+def explain(db_connection, query: str) -> str:
+    db_connection.execute(text("SET LOCAL enable_seqscan = off"))
+    compiled = search_statement(query, 20).compile(dialect=db_connection.dialect)
+    plan = db_connection.exec_driver_sql(f"EXPLAIN {compiled}", compiled.params)
+    return "\n".join(plan.scalars())
+
+
+@pytest.mark.unit
+class TestSearchCursor:
+    """Test search continuation cursors"""
+
+    def test_roundtrip(self):
+        """Case: a cursor decodes back to its (rank, sort_key, id) keyset"""
+        user_id = uuid4()
+        cursor = encode_search_cursor(2, "ann@mail.com", user_id)
+        assert decode_search_cursor(cursor) == (2, "ann@mail.com", user_id)
+
+    @pytest.mark.parametrize("cursor", ["", "not-a-cursor", "WzEsIDJd"])
+    def test_invalid_cursor(self, cursor):
+        """Case: malformed cursors raise ValueError"""
+        with pytest.raises(ValueError):
+            decode_search_cursor(cursor)
+
+
+@pytest.mark.integration
+@pytest.mark.repository
+class TestUserSearch:
+    """Test ranked user search"""
+
+    def test_ranked_substring_matches(self, repo):
+        """Case: exact, email prefix, name prefix, email and name substrings"""
+        rows = repo.search("ANN@mail.com")
+        assert [row.email for row in rows] == ["ann@mail.com"]
+
+        rows = repo.search("ann")
+        assert [(row.rank, row.email) for row in rows] == [
+            (1, "ann@mail.com"),
+            (1, "anna.smith@mail.com"),
+            (2, "zed@mail.com"),
+            (3, "joe@annex.io"),
+        ]
+
+    def test_short_query_matches_email_prefix(self, repo):
+        """Case: under 3 characters only email prefixes match, in email order"""
+        rows = repo.search("An")
+        assert [row.email for row in rows] == [
+            "an_x@mail.com",
+            "ann@mail.com",
+            "anna.smith@mail.com",
+        ]
+
+    def test_like_wildcards_are_literal(self, repo):
+        """Case: % and _ in the query match themselves"""
+        assert [row.email for row in repo.search("an_")] == ["an_x@mail.com"]
+        assert repo.search("%") == []
+
+    @pytest.mark.parametrize("query", ["an", "ann"])
+    def test_keyset_continuation(self, repo, query):
+        """Case: paging with cursors returns every match once, in order"""
+        expected = [row.email for row in repo.search(query, limit=100)]
+        emails, after = [], None
+        while True:
+            rows = repo.search(query, limit=1, after=after)
+            if not rows:
+                break
+            emails.append(rows[0].email)
+            after = decode_search_cursor(
+                encode_search_cursor(rows[0].rank, rows[0].sort_key, rows[0].id)
+            )
+        assert emails == expected
+
+    def test_prefix_search_uses_lower_email_index(self, db_connection):
+        """Case: short queries are answered from ix_user_lower_email"""
+        assert "ix_user_lower_email" in explain(db_connection, "an")
+
+    def test_substring_search_uses_trigram_indexes(self, db_connection):
+        """Case: longer queries are answered from the pg_trgm GIN indexes"""
+        indexes = db_connection.execute(
+            text("SELECT indexname FROM pg_indexes WHERE indexname LIKE '%_trgm'")
+        ).scalars()
+        if not list(indexes):
+            pytest.skip("pg_trgm is not available on this server")
+        plan = explain(db_connection, "annex")
+        assert "ix_user_email_trgm" in plan
+        assert "ix_user_full_name_trgm" in plan
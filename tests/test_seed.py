@@ -0,0 +1,65 @@
+from datetime import datetime, timezone
+from uuid import uuid4
+
+import pytest
+from sqlmodel import col, delete, select
+
+from app.config.settings import get_settings
+from app.core.security import verify_password
+from app.db.bulk_seed import build_batch, name_pools, seed_email, seed_users_copy
+from app.models.user import User
+
+
+@pytest.mark.unit
+class TestBuildBatch:
+    """Test the COPY rows generated by the seeding engine"""
+
+    def test_rows_are_deterministic_and_unique(self):
+        """Case: emails and names follow the index, ids are fresh UUIDs"""
+        first, last = name_pools(size=3)
+        base_time = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+        batch = build_batch(10, 5, "t", "$2b$04$hash", base_time, first, last)
+        rows = [line.split("\t") for line in batch.splitlines()]
+
+        assert len(rows) == 5
+        assert [row[1] for row in rows] == [seed_email("t", i) for i in range(10, 15)]
+        assert rows[0][1] == "t-000000010@seed.example.com"
+        assert len({row[0] for row in rows}) == 5
+        assert rows[0][2] == f"{first[10 % 3]} {last[10 // 3 % 3]}"
+        assert all(row[4] == "$2b$04$hash" for row in rows)
+        assert [row[5] for row in rows] == sorted(row[5] for row in rows)
+        assert name_pools(size=3) == (first, last)
+
+
+@pytest.mark.integration
+class TestSeedUsersCopy:
+    """Test loading users with COPY from parallel workers"""
+
+    def test_loads_and_continues_numbering(self, committing_client):
+        """Case: a second run with the same prefix appends instead of colliding"""
+        prefix = f"t{uuid4().hex[:8]}"
+        url = get_settings().test_database_url
+        try:
+            report = seed_users_copy(
+                url, count=25, batch_size=10, workers=2, prefix=prefix, rounds=4
+            )
+            again = seed_users_copy(
+                url, count=5, batch_size=10, workers=1, prefix=prefix, rounds=4
+            )
+
+            assert report.rows == 25
+            assert again.rows == 5
+            assert report.rows_per_second > 0
+            with committing_client.get_session_context() as session:
+                users = session.exec(
+                    select(User).where(col(User.email).startswith(prefix))
+                ).all()
+            assert sorted(user.email for user in users) == [
+                seed_email(prefix, i) for i in range(30)
+            ]
+            assert verify_password("password123", users[0].hashed_password)
+        finally:
+            with committing_client.get_session_context() as session:
+                session.exec(delete(User).where(col(User.email).startswith(prefix)))
+                session.commit()
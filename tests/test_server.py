@@ -0,0 +1,74 @@
+import os
+
+import pytest
+from sqlalchemy import text
+
+from app.config.settings import get_settings
+from app.db.database import get_test_postgres_client, get_user_cache, reset_after_fork
+from app.server import WORKER_CLASS, build_options, prepare_metrics_dir
+
+
+def backend_pid(client) -> int:
+    with client.engine.connect() as connection:
+        return connection.execute(text("SELECT pg_backend_pid()")).scalar_one()
+
+
+@pytest.mark.unit
+class TestServerOptions:
+    """Test the gunicorn configuration of the launcher"""
+
+    def test_options_from_settings(self, monkeypatch):
+        """Case: preloaded uvicorn workers, recycled after max requests"""
+        monkeypatch.setattr(get_settings(), "port", 9000)
+        monkeypatch.setattr(get_settings(), "server_max_requests", 500)
+
+        options = build_options(workers=3)
+
+        assert options["bind"] == "0.0.0.0:9000"
+        assert options["workers"] == 3
+        assert options["worker_class"] == WORKER_CLASS
+        assert options["preload_app"]
+        assert options["max_requests"] == 500
+        assert callable(options["post_fork"])
+
+    def test_metrics_dir_is_emptied(self, monkeypatch, tmp_path):
+        """Case: counters of a previous run are not added to this one"""
+        (tmp_path / "counter_123.db").write_bytes(b"stale")
+        (tmp_path / "notes.txt").write_text("kept")
+        monkeypatch.setenv("PROMETHEUS_MULTIPROC_DIR", str(tmp_path))
+
+        assert prepare_metrics_dir() == str(tmp_path)
+        assert [path.name for path in tmp_path.iterdir()] == ["notes.txt"]
+
+
+@pytest.mark.integration
+class TestResetAfterFork:
+    """Test that forked workers build their own clients"""
+
+    def test_child_builds_its_own_pool(self, setup_test_db):
+        """Case: the child connects on its own and leaves the parent's
+        pooled connection open"""
+        parent = get_test_postgres_client()
+        parent_cache = get_user_cache()
+        pooled = backend_pid(parent)
+
+        pid = os.fork()
+        if pid == 0:
+            code = 1
+            try:
+                reset_after_fork()
+                child = get_test_postgres_client()
+                fresh = child is not parent and get_user_cache() is not parent_cache
+                code = 0 if fresh and backend_pid(child) != pooled else 2
+            finally:
+                os._exit(code)
+
+        _, status = os.waitpid(pid, 0)
+        assert os.waitstatus_to_exitcode(status) == 0
+        # The child did not close the parent's pooled connection
+        with parent.engine.connect() as connection:
+            alive = connection.execute(
+                text("SELECT count(*) FROM pg_stat_activity WHERE pid = :pid"),
+                {"pid": pooled},
+            ).scalar_one()
+        assert alive == 1
@@ -0,0 +1,65 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from sqlalchemy import text
+
+from app.core.lazy import lazy_singleton
+from app.db.migrations import (
+    SchemaRevisionError,
+    check_schema_revision,
+    expected_heads,
+)
+
+
+@pytest.mark.unit
+class TestLazySingleton:
+    """Test clients built on first use"""
+
+    def test_concurrent_first_calls_build_once(self):
+        """Case: racing first calls share one instance"""
+        builds = []
+        barrier = threading.Barrier(8)
+
+        @lazy_singleton
+        def get_value() -> object:
+            builds.append(1)
+            time.sleep(0.01)
+            return object()
+
+        def first_call() -> object:
+            barrier.wait()
+            return get_value()
+
+        assert not get_value.is_built()
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            values = list(pool.map(lambda _: first_call(), range(8)))
+
+        assert len(builds) == 1
+        assert len({id(value) for value in values}) == 1
+        get_value.cache_clear()
+        assert get_value() is not values[0]
+
+
+@pytest.mark.integration
+class TestSchemaCheck:
+    """Test the startup check against the Alembic head"""
+
+    def test_heads_read_from_versions(self):
+        """Case: the head is the revision no other revision builds on"""
+        assert expected_heads() == {"d9f2b6c4e8a1"}
+
+    def test_migrated_database_is_at_head(self, db_connection):
+        """Case: the test database, cloned from the migrated template, passes"""
+        assert check_schema_revision(db_connection, "strict")
+
+    def test_outdated_database(self, db_connection, caplog):
+        """Case: an older revision is logged, or refused in strict mode"""
+        db_connection.execute(text("UPDATE alembic_version SET version_num = 'old'"))
+
+        assert not check_schema_revision(db_connection, "warn")
+        assert "alembic upgrade head" in caplog.text
+        with pytest.raises(SchemaRevisionError, match="'old'"):
+            check_schema_revision(db_connection, "strict")
+        assert check_schema_revision(db_connection, "off")
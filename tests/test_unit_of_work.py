@@ -0,0 +1,66 @@
+import pytest
+from sqlmodel import select
+
+from app.db.instrumentation import track_request_db_stats
+from app.db.unit_of_work import UnitOfWork
+from app.models.user import User
+from app.respositories.user_repository import UserRepository
+from app.schemas.user import UserCreate
+
+
+@pytest.fixture
+def cleanup_email(committing_client):
+    email = "uow-commit@mail.com"
+    yield email
+    with committing_client.get_session_context() as session:
+        for user in session.exec(select(User).where(User.email == email)).all():
+            session.delete(user)
+        session.commit()
+
+
+@pytest.mark.integration
+class TestUnitOfWork:
+    """Test the request-scoped unit of work"""
+
+    def test_repository_calls_share_one_checkout(
+        self, committing_client, cleanup_email
+    ):
+        """Case: several repository calls use one connection and commit once"""
+        with track_request_db_stats() as stats:
+            with UnitOfWork(committing_client) as uow:
+                repo = UserRepository(uow)
+                user = repo.register(
+                    UserCreate(email=cleanup_email, password="pass-0001"),
+                    hashed_password="hashed",
+                )
+                repo.update(user, full_name="Updated name")
+                assert repo.get_by_email(cleanup_email).full_name == "Updated name"
+
+        assert stats.checkouts == 1
+        assert UserRepository(committing_client).get_by_email(cleanup_email) is not None
+
+    def test_rolls_back_on_error(self, test_client):
+        """Case: nothing is committed when the request fails"""
+        with pytest.raises(RuntimeError):
+            with UnitOfWork(test_client) as uow:
+                UserRepository(uow).register(
+                    UserCreate(email="uow-rollback@mail.com", password="pass-0001"),
+                    hashed_password="hashed",
+                )
+                raise RuntimeError("request failed")
+
+        assert UserRepository(test_client).get_by_email("uow-rollback@mail.com") is None
+
+    def test_after_commit_callbacks(self, test_client):
+        """Case: callbacks run once committed and are dropped on rollback"""
+        calls = []
+        with UnitOfWork(test_client) as uow:
+            uow.after_commit(lambda: calls.append("committed"))
+            assert calls == []
+        assert calls == ["committed"]
+
+        with pytest.raises(RuntimeError):
+            with UnitOfWork(test_client) as uow:
+                uow.after_commit(lambda: calls.append("rolled back"))
+                raise RuntimeError("request failed")
+        assert calls == ["committed"]
@@ -0,0 +1,183 @@
+import json
+import os
+import time
+from uuid import uuid4
+
+import pytest
+
+from app.core.cache import MISS, TTLLRUCache
+from app.db.unit_of_work import UnitOfWork
+from app.respositories.cached_user_repository import (
+    CachedUserRepository,
+    apply_invalidation,
+    email_key,
+    id_key,
+    instance_id,
+    invalidation_payload,
+)
+from app.respositories.user_repository import UserRepository
+from app.schemas.user import UserCreate
+
+
+@pytest.mark.unit
+class TestTTLLRUCache:
+    """Test the in-process TTL/LRU cache"""
+
+    def test_hit_and_miss_counters(self):
+        """Case: lookups are counted as hits or misses"""
+        cache = TTLLRUCache(maxsize=10, ttl_seconds=60, negative_ttl_seconds=60)
+
+        assert cache.get("a") is MISS
+        cache.set("a", {"id": 1})
+
+        assert cache.get("a") == {"id": 1}
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+
+    def test_negative_caching(self):
+        """Case: None is cached as a miss, distinct from MISS"""
+        cache = TTLLRUCache(maxsize=10, ttl_seconds=60, negative_ttl_seconds=60)
+        cache.set("missing", None)
+
+        assert cache.get("missing") is None
+        assert cache.stats()["negative_hits"] == 1
+
+    def test_lru_eviction(self):
+        """Case: the least recently used entry is evicted over maxsize"""
+        cache = TTLLRUCache(maxsize=2, ttl_seconds=60, negative_ttl_seconds=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert cache.get("b") is MISS
+        assert cache.get("a") == 1
+        assert cache.stats()["evictions"] == 1
+
+    def test_fill_after_invalidation_is_dropped(self):
+        """Case: a value read before an invalidation is not cached"""
+        cache = TTLLRUCache(maxsize=10, ttl_seconds=60, negative_ttl_seconds=60)
+        generation = cache.generation
+
+        cache.invalidate("other")
+        cache.set("a", "old row", generation)
+        cache.set("b", "new row", cache.generation)
+
+        assert cache.get("a") is MISS
+        assert cache.get("b") == "new row"
+
+    def test_ttl_expiry(self):
+        """Case: entries expire after their TTL"""
+        cache = TTLLRUCache(maxsize=10, ttl_seconds=0.01, negative_ttl_seconds=0)
+        cache.set("a", 1)
+        cache.set("missing", None)
+        time.sleep(0.02)
+
+        assert cache.get("a") is MISS
+        assert cache.get("missing") is MISS
+        assert cache.stats()["expirations"] == 1
+
+
+@pytest.mark.unit
+class TestCacheInvalidation:
+    """Test NOTIFY based invalidation messages"""
+
+    def test_remote_invalidation_drops_keys(self):
+        """Case: a message from another worker drops id and email keys"""
+        cache = TTLLRUCache(maxsize=10, ttl_seconds=60, negative_ttl_seconds=60)
+        user_id = uuid4()
+        cache.set(id_key(user_id), {"id": user_id})
+        cache.set(email_key("user@mail.com"), None)
+        payload = json.dumps(
+            {
+                "origin": "another-worker",
+                "keys": [["id", str(user_id)], ["email", "user@mail.com"]],
+            }
+        )
+
+        apply_invalidation(cache, payload)
+
+        assert cache.get(id_key(user_id)) is MISS
+        assert cache.get(email_key("user@mail.com")) is MISS
+
+    def test_own_messages_are_ignored(self):
+        """Case: a worker skips the messages it published itself"""
+        cache = TTLLRUCache(maxsize=10, ttl_seconds=60, negative_ttl_seconds=60)
+        cache.set(email_key("user@mail.com"), None)
+
+        apply_invalidation(cache, invalidation_payload([email_key("user@mail.com")]))
+
+        assert json.loads(invalidation_payload([]))["origin"] == instance_id()
+        assert cache.get(email_key("user@mail.com")) is None
+
+    def test_forked_sibling_messages_are_applied(self):
+        """Case: a process forked after the id was made publishes its own"""
+        cache = TTLLRUCache(maxsize=10, ttl_seconds=60, negative_ttl_seconds=60)
+        cache.set(email_key("user@mail.com"), None)
+        instance_id()
+        read_end, write_end = os.pipe()
+
+        pid = os.fork()
+        if pid == 0:
+            try:
+                os.close(read_end)
+                payload = invalidation_payload([email_key("user@mail.com")])
+                os.write(write_end, payload.encode())
+            finally:
+                os._exit(0)
+
+        os.close(write_end)
+        with os.fdopen(read_end) as pipe:
+            payload = pipe.read()
+        os.waitpid(pid, 0)
+        apply_invalidation(cache, payload)
+
+        assert json.loads(payload)["origin"] != instance_id()
+        assert cache.get(email_key("user@mail.com")) is MISS
+
+
+@pytest.mark.integration
+class TestCachedWrites:
+    """Test local invalidation of the cached repository"""
+
+    def test_invalidated_after_commit(self, test_client):
+        """Case: keys are dropped once the unit of work commits, not before"""
+        cache = TTLLRUCache(maxsize=10, ttl_seconds=60, negative_ttl_seconds=60)
+        user = UserRepository(test_client).register(
+            UserCreate(email="cache-commit@mail.com", password="pass-0001"),
+            hashed_password="hashed",
+        )
+        CachedUserRepository(UserRepository(test_client), cache).get_by_id(user.id)
+
+        with UnitOfWork(test_client) as uow:
+            repo = CachedUserRepository(UserRepository(uow), cache)
+            repo.patch(user.id, {"full_name": "Renamed"})
+            # Not committed yet: other requests still read the old row
+            assert cache.get(id_key(user.id)) is not MISS
+
+        assert cache.get(id_key(user.id)) is MISS
+        repo = CachedUserRepository(UserRepository(test_client), cache)
+        assert repo.get_by_id(user.id).full_name == "Renamed"
+
+    def test_update_during_a_fill_wins(self, test_client):
+        """Case: a row read before a concurrent update is not cached"""
+        cache = TTLLRUCache(maxsize=10, ttl_seconds=60, negative_ttl_seconds=60)
+        user = UserRepository(test_client).register(
+            UserCreate(email="cache-race@mail.com", password="pass-0001"),
+            hashed_password="hashed",
+        )
+
+        class RacingRepository(UserRepository):
+            def get_by_id(self, user_id):
+                old = super().get_by_id(user_id)
+                # Another request renames the user and commits meanwhile
+                CachedUserRepository(UserRepository(test_client), cache).patch(
+                    user_id, {"full_name": "Renamed"}
+                )
+                return old
+
+        CachedUserRepository(RacingRepository(test_client), cache).get_by_id(user.id)
+
+        assert cache.get(id_key(user.id)) is MISS
+        repo = CachedUserRepository(UserRepository(test_client), cache)
+        assert repo.get_by_id(user.id).full_name == "Renamed"
@@ -0,0 +1,195 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from uuid import uuid4
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.exc import DataError
+from sqlmodel import select
+
+from app.clients.async_postgres_client import AsyncPostgresClient
+from app.config.settings import get_settings
+from app.core.batching import BatchWriter
+from app.core.hashing import PasswordHasher
+from app.db.database import build_pool_config
+from app.models.user import User
+from app.respositories.cached_user_repository import (
+    commit_registrations,
+    commit_registrations_async,
+)
+from app.respositories.user_repository import UserRepository
+from app.schemas.user import UserCreate
+from app.services.user_service import UserService
+from tests.batching import group_busy
+
+CONCURRENT_SIGNUPS = 8
+
+
+def registration_rows(names: list[str]) -> list[dict]:
+    return [
+        {
+            "id": uuid4(),
+            "email": f"row{index}@mail.com",
+            "full_name": name,
+            "is_active": True,
+            "hashed_password": "not-a-hash",
+        }
+        for index, name in enumerate(names)
+    ]
+
+
+@pytest.fixture
+def hasher():
+    hasher = PasswordHasher(max_workers=2, max_pending=CONCURRENT_SIGNUPS, rounds=4)
+    yield hasher
+    hasher.shutdown()
+
+
+@pytest.fixture
+def cleanup_email(committing_client):
+    email = "race@mail.com"
+    yield email
+    with committing_client.get_session_context() as session:
+        for user in session.exec(select(User).where(User.email == email)).all():
+            session.delete(user)
+        session.commit()
+
+
+@pytest.mark.integration
+class TestRegisterUser:
+    """Test single round-trip registration"""
+
+    def test_duplicate_email_conflicts(self, test_client, hasher):
+        """Case: the second registration of an email answers 409"""
+        user_service = UserService(UserRepository(test_client), hasher)
+        payload = UserCreate(email="duplicate@mail.com", password="pass-0001")
+
+        user = user_service.register_user(payload)
+        assert user.id is not None
+        assert user.create_at is not None
+
+        with pytest.raises(HTTPException) as exc_info:
+            user_service.register_user(payload)
+        assert exc_info.value.status_code == 409
+
+    def test_concurrent_signups_for_same_email(
+        self, committing_client, hasher, cleanup_email
+    ):
+        """Case: concurrent sign-ups create one user, the rest get 409, no 500"""
+        user_service = UserService(UserRepository(committing_client), hasher)
+        payload = UserCreate(email=cleanup_email, password="pass-0001")
+        barrier = threading.Barrier(CONCURRENT_SIGNUPS)
+
+        def signup():
+            barrier.wait()
+            try:
+                user_service.register_user(payload)
+                return 201
+            except HTTPException as exc:
+                return exc.status_code
+
+        with ThreadPoolExecutor(max_workers=CONCURRENT_SIGNUPS) as pool:
+            outcomes = list(pool.map(lambda _: signup(), range(CONCURRENT_SIGNUPS)))
+
+        assert sorted(outcomes) == [201] + [409] * (CONCURRENT_SIGNUPS - 1)
+        with committing_client.get_session_context() as session:
+            users = session.exec(select(User).where(User.email == cleanup_email)).all()
+        assert len(users) == 1
+
+
+@pytest.mark.integration
+class TestGroupCommit:
+    """Test registrations batched into one INSERT and transaction"""
+
+    def test_concurrent_signups_share_one_batch(self, test_client, hasher):
+        """Case: one batch, each caller gets its own user or its own 409"""
+        UserService(UserRepository(test_client), hasher).register_user(
+            UserCreate(email="taken@mail.com", password="pass-0001")
+        )
+        writer = BatchWriter(commit_registrations, window_seconds=0.2)
+        user_service = UserService(
+            UserRepository(test_client),
+            hasher,
+            submit_registration=partial(writer.submit, group=test_client),
+        )
+        emails = ["new1@mail.com", "new2@mail.com", "new1@mail.com", "taken@mail.com"]
+        barrier = threading.Barrier(len(emails))
+
+        def signup(email):
+            barrier.wait()
+            try:
+                return user_service.register_user(
+                    UserCreate(email=email, password="pass-0001")
+                ).email
+            except HTTPException as exc:
+                return exc.status_code
+
+        held = partial(writer.submit, None, group=test_client)
+        with group_busy(writer, held, [None]):
+            with ThreadPoolExecutor(max_workers=len(emails)) as pool:
+                outcomes = list(pool.map(signup, emails))
+
+        # The held batch, then one for the four sign-ups
+        assert writer.stats()["batches"] == 2
+        assert outcomes[1] == "new2@mail.com"
+        assert sorted([outcomes[0], outcomes[2]], key=str) == [409, "new1@mail.com"]
+        assert outcomes[3] == 409
+
+    def test_rejected_row_fails_alone(self, test_client):
+        """Case: a row the database rejects does not fail its batch-mates"""
+        # Postgres text cannot hold NUL characters
+        rows = registration_rows(["First User", "Bad\x00Name", "Third User"])
+
+        results = commit_registrations(test_client, rows)
+
+        assert [user.email for user in (results[0], results[2])] == [
+            "row0@mail.com",
+            "row2@mail.com",
+        ]
+        assert isinstance(results[1], DataError)
+        repo = UserRepository(test_client)
+        assert repo.existing_emails([row["email"] for row in rows]) == {
+            "row0@mail.com",
+            "row2@mail.com",
+        }
+
+    @pytest.mark.parametrize("db_mode", ["async"])
+    async def test_rejected_row_fails_alone_async(self, test_client, db_mode):
+        """Case: the same, for the batches of the event-loop routes"""
+        client = AsyncPostgresClient(
+            get_settings().test_database_url, pool=build_pool_config()
+        )
+        rows = registration_rows(["First User", "Bad\x00Name", "Third User"])
+        try:
+            results = await commit_registrations_async(client, rows)
+        finally:
+            await client.close()
+
+        assert results[0].email == "row0@mail.com"
+        assert isinstance(results[1], DataError)
+        assert results[2].email == "row2@mail.com"
+
+
+@pytest.mark.router
+@pytest.mark.integration
+class TestRegistrationEndpoint:
+    """Test POST /users/"""
+
+    @pytest.mark.parametrize("group_commit", [False, True])
+    def test_register_then_conflict(
+        self, api_client, setup_test_db, monkeypatch, group_commit
+    ):
+        """Case: a new email is registered and readable, the same one again
+        answers 409, with or without group commit"""
+        monkeypatch.setattr(get_settings(), "registration_group_commit", group_commit)
+        payload = {"email": "endpoint@mail.com", "password": "pass-0001"}
+
+        response = api_client.post("/users/", json=payload)
+        assert response.status_code == 200
+        assert "hashed_password" not in response.json()
+        user_id = response.json()["id"]
+        fetched = api_client.get(f"/users/{user_id}")
+        assert fetched.json()["email"] == "endpoint@mail.com"
+
+        assert api_client.post("/users/", json=payload).status_code == 409
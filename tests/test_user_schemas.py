@@ -1,7 +1,11 @@
+import json
+from datetime import datetime, timezone
+from uuid import uuid4
+
 import pytest
 from pydantic import ValidationError
 
-from app.schemas.user import UserCreate
+from app.schemas.user import UserCreate, UserRead, user_read_rows_adapter
 
 
 class TestUserCreate:
@@ -66,3 +70,22 @@ class TestUserCreate:
 
         user = UserCreate(**data)
         assert user.email == "testuser@mail.com"
+
+
+class TestUserReadRows:
+    """Test to validate the UserRead row fast path"""
+
+    def test_dump_matches_user_read(self):
+        """Case: rows serialize like UserRead, extra columns dropped"""
+        row = {
+            "id": uuid4(),
+            "email": "testuser@mail.com",
+            "full_name": None,
+            "is_active": True,
+            "create_at": datetime.now(timezone.utc),
+        }
+
+        dumped = json.loads(user_read_rows_adapter.dump_json([row]))
+
+        assert dumped == [json.loads(UserRead(**row).model_dump_json())]
+        assert "create_at" not in dumped[0]
@@ -0,0 +1,123 @@
+from datetime import datetime, timezone
+from uuid import uuid4
+
+import pytest
+from pydantic import ValidationError
+
+from app.core.conditional import if_match_versions, user_etag
+from app.respositories.user_repository import UserRepository
+from app.schemas.user import userUpdate
+
+# Writes of a test share one transaction, hence one now(): users are created
+# in the past so that a PATCH visibly moves their version
+CREATED = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def user(test_client):
+    repo = UserRepository(test_client)
+    user_id = uuid4()
+    repo.insert_many(
+        [
+            {
+                "id": user_id,
+                "email": "patch@mail.com",
+                "full_name": "Patch Me",
+                "is_active": True,
+                "hashed_password": "not-a-hash",
+                "create_at": CREATED,
+            }
+        ]
+    )
+    return repo.get_by_id(user_id)
+
+
+@pytest.mark.unit
+@pytest.mark.schema
+class TestUserUpdateSchema:
+    """Test the PATCH body"""
+
+    def test_only_sent_fields_are_set(self):
+        """Case: omitted fields are left out of the update"""
+        assert userUpdate(full_name="New Name").model_dump(exclude_unset=True) == {
+            "full_name": "New Name"
+        }
+        assert userUpdate(full_name=None).model_dump(exclude_unset=True) == {
+            "full_name": None
+        }
+
+    @pytest.mark.parametrize(
+        "body", [{"is_active": None}, {"email": "x@mail.com"}, {"full_name": "abc"}]
+    )
+    def test_invalid_bodies(self, body):
+        """Case: null is_active, unknown fields and short names are rejected"""
+        with pytest.raises(ValidationError):
+            userUpdate.model_validate(body)
+
+    def test_etag_round_trip(self):
+        """Case: a user ETag parses back to the version it was built from"""
+        version = datetime(2025, 5, 4, 3, 2, 1, 123456, tzinfo=timezone.utc)
+        etag = user_etag(CREATED, version)
+        assert if_match_versions(f'W/"1", {etag}') == [version]
+        assert if_match_versions("*") is None
+
+
+@pytest.mark.router
+@pytest.mark.integration
+class TestPatchUser:
+    """Test PATCH /users/{id}"""
+
+    def test_patch_changes_only_sent_fields(self, api_client, user):
+        """Case: one field changes, the others stay, a new ETag is returned"""
+        response = api_client.patch(f"/users/{user.id}", json={"is_active": False})
+
+        assert response.status_code == 200
+        assert response.json()["is_active"] is False
+        assert response.json()["full_name"] == "Patch Me"
+        assert response.headers["ETag"] != user_etag(user.create_at, user.update_at)
+        fetched = api_client.get(f"/users/{user.id}")
+        assert fetched.headers["ETag"] == response.headers["ETag"]
+
+    def test_if_match(self, api_client, user):
+        """Case: the current ETag applies the change, a stale one answers 412"""
+        etag = api_client.get(f"/users/{user.id}").headers["ETag"]
+
+        response = api_client.patch(
+            f"/users/{user.id}",
+            json={"full_name": "First Writer"},
+            headers={"If-Match": etag},
+        )
+        assert response.status_code == 200
+
+        response = api_client.patch(
+            f"/users/{user.id}",
+            json={"full_name": "Second Writer"},
+            headers={"If-Match": etag},
+        )
+        assert response.status_code == 412
+        assert api_client.get(f"/users/{user.id}").json()["full_name"] == "First Writer"
+
+    def test_weak_if_match_never_matches(self, api_client, user):
+        """Case: If-Match compares strongly, W/ tags fail"""
+        etag = api_client.get(f"/users/{user.id}").headers["ETag"]
+        response = api_client.patch(
+            f"/users/{user.id}",
+            json={"full_name": "Weak Writer"},
+            headers={"If-Match": f"W/{etag}"},
+        )
+        assert response.status_code == 412
+
+    def test_unknown_user(self, api_client, setup_test_db):
+        """Case: patching a missing user is a 404, with or without If-Match"""
+        for headers in ({}, {"If-Match": '"1"'}):
+            response = api_client.patch(
+                f"/users/{uuid4()}", json={"full_name": "Nobody Here"}, headers=headers
+            )
+            assert response.status_code == 404
+
+    def test_empty_patch_returns_user(self, api_client, user):
+        """Case: an empty body changes nothing and returns the user"""
+        response = api_client.patch(f"/users/{user.id}", json={})
+        assert response.status_code == 200
+        assert response.json()["email"] == user.email
+        assert response.headers["ETag"] == user_etag(CREATED, None)